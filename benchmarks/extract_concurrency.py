@@ -0,0 +1,228 @@
+"""
+Extract endpoint concurrency benchmark.
+
+Compares the previous sync search, which FastAPI runs on its 40 token
+threadpool, against the async ``SemanticSearchService.asearch`` pipeline.
+OpenAI, Pinecone and Redis are replaced by fakes with fixed latencies so the
+numbers only reflect how many searches a single worker keeps in flight.
+
+Usage::
+
+    python -m benchmarks.extract_concurrency --requests 400
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import anyio
+import anyio.to_thread
+
+from metrics import CacheStats
+from operations.memory_cache import MemoryCache
+from operations.search_cache import SearchResultCache
+from operations.semantic_search_service import SemanticSearchService
+from vector_stores import PineconeVectorStore
+
+FASTAPI_THREADPOOL_TOKENS = 40
+
+
+class InFlight:
+    """Track the number of searches in flight."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def exit(self):
+        self.current -= 1
+
+
+class FakeIndex:
+    """Pinecone index answering after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def query(self, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(
+            matches=[SimpleNamespace(id="p", score=0.9, metadata={"text": "paragraph"})]
+        )
+
+
+class FakeEmbeddings:
+    """OpenAI embeddings client answering after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return [0.0] * 8
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return [0.0] * 8
+
+
+class FakeRedis:
+    """Redis client that always misses after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def get(self, key):
+        time.sleep(self.latency)
+
+    def set(self, *args, **kwargs):
+        time.sleep(self.latency)
+
+
+class FakeAsyncRedis(FakeRedis):
+    """Asyncio Redis client that always misses after a fixed latency."""
+
+    async def get(self, key):  # type: ignore[override]
+        await asyncio.sleep(self.latency)
+
+    async def set(self, *args, **kwargs):  # type: ignore[override]
+        await asyncio.sleep(self.latency)
+
+    def pipeline(self, **kwargs):
+        return FakeAsyncPipeline(self.latency)
+
+
+class FakeAsyncPipeline:
+    """Asyncio Redis pipeline sent in one round-trip after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def set(self, *args, **kwargs):
+        return None
+
+    def sadd(self, *args, **kwargs):
+        return None
+
+    def expire(self, *args, **kwargs):
+        return None
+
+    async def execute(self):
+        await asyncio.sleep(self.latency)
+        return []
+
+
+def sync_search(index, embeddings, redis_client, search_term, file_id) -> list:
+    """Previous blocking search pipeline."""
+    search_key = f"{search_term}_{file_id}"
+    if redis_client.get(search_key) is not None:
+        return json.loads(redis_client.get(search_key))
+    vector = embeddings.embed_query(search_term)
+    result = index.query(vector=vector, top_k=5, filter={"file_id": file_id})
+    match_texts = [
+        {"score": match.score, "text": match.metadata.get("text")}
+        for match in result.matches
+        if match.score >= 0.8
+    ]
+    if match_texts:
+        redis_client.set(search_key, json.dumps(match_texts))
+    return match_texts
+
+
+async def run_sync(args) -> tuple[float, int]:
+    """Run the sync pipeline the way FastAPI runs a sync route."""
+    limiter = anyio.CapacityLimiter(FASTAPI_THREADPOOL_TOKENS)
+    index = FakeIndex(args.pinecone_latency)
+    embeddings = FakeEmbeddings(args.embedding_latency)
+    redis_client = FakeRedis(args.redis_latency)
+    in_flight = InFlight()
+
+    def search(idx):
+        in_flight.enter()
+        try:
+            sync_search(index, embeddings, redis_client, f"query {idx}", "file")
+        finally:
+            in_flight.exit()
+
+    async def handle(idx):
+        await anyio.to_thread.run_sync(search, idx, limiter=limiter)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as group:
+        for idx in range(args.requests):
+            group.start_soon(handle, idx)
+    return time.perf_counter() - start, in_flight.peak
+
+
+async def run_async(args) -> tuple[float, int]:
+    """Run the async pipeline."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=args.io_threads)
+    )
+    settings = SimpleNamespace(
+        embedding_namespace="benchmark",
+        openai_embeddings_model="benchmark",
+        openai_embeddings_dimensions=None,
+        redis_cache_exp=60,
+        search_negative_cache_exp=60,
+        search_stale_grace=60,
+    )
+    search_cache = SearchResultCache(
+        settings,  # type: ignore[arg-type]
+        FakeAsyncRedis(args.redis_latency),  # type: ignore[arg-type]
+        MemoryCache(0),
+        CacheStats("memory", "redis"),
+    )
+    service = SemanticSearchService(
+        settings,  # type: ignore[arg-type]
+        PineconeVectorStore(
+            FakeIndex(args.pinecone_latency), "benchmark"  # type: ignore[arg-type]
+        ),
+        FakeEmbeddings(args.embedding_latency),  # type: ignore[arg-type]
+        search_cache,
+    )
+    in_flight = InFlight()
+
+    async def handle(idx):
+        in_flight.enter()
+        try:
+            await service.asearch(f"query {idx}", "file")
+        finally:
+            in_flight.exit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handle(idx) for idx in range(args.requests)))
+    return time.perf_counter() - start, in_flight.peak
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--embedding-latency", type=float, default=0.15)
+    parser.add_argument("--pinecone-latency", type=float, default=0.03)
+    parser.add_argument("--redis-latency", type=float, default=0.001)
+    parser.add_argument("--io-threads", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'pipeline':<8} {'seconds':>8} {'req/s':>8} {'peak in flight':>15}")
+    for name, runner in (("sync", run_sync), ("async", run_async)):
+        elapsed, peak = asyncio.run(runner(args))
+        print(f"{name:<8} {elapsed:>8.2f} {args.requests / elapsed:>8.1f} {peak:>15}")
+
+
+if __name__ == "__main__":
+    main()
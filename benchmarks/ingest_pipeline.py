@@ -0,0 +1,153 @@
+"""
+Ingestion pipeline benchmark.
+
+Compares the previous ingestion, which embedded the whole document before
+upserting any of it, against the streaming ``IngestPipeline``. OpenAI and
+the vector store are replaced by fakes whose latency grows with the batch
+size, so the numbers only reflect how well the stages overlap. Both runs
+upsert up to ``--max-in-flight`` batches at once, and the default latencies
+give the embedding and upsert stages about the same total time, so a full
+overlap halves the sequential time.
+
+Vectors held are measured, not derived: a vector is held from the moment
+its embedding is returned until its upsert completes, whether it waits in
+a queue, the upsert batcher or an in-flight request.
+
+Usage::
+
+    python -m benchmarks.ingest_pipeline --paragraphs 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from loguru import logger
+
+from operations.ingest_pipeline import IngestPipeline
+from operations.upsert_batcher import UpsertBatcher
+
+
+class HeldVectors:
+    """Count of embedded vectors not upserted yet and its peak."""
+
+    def __init__(self):
+        self.held = 0
+        self.peak = 0
+
+    def add(self, count: int):
+        self.held += count
+        self.peak = max(self.peak, self.held)
+
+    def release(self, count: int):
+        self.held -= count
+
+
+class FakeEmbeddings:
+    """OpenAI embeddings client answering after a per text latency."""
+
+    def __init__(self, latency: float, dimensions: int, held: HeldVectors):
+        self.latency = latency
+        self.dimensions = dimensions
+        self.held = held
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency * len(texts))
+        self.held.add(len(texts))
+        return [[0.0] * self.dimensions for _ in texts]
+
+
+class FakeVectorStore:
+    """Vector store answering after a per vector latency."""
+
+    def __init__(self, latency: float, held: HeldVectors):
+        self.latency = latency
+        self.held = held
+
+    async def upsert(self, vectors):
+        await asyncio.sleep(self.latency * len(vectors))
+        self.held.release(len(vectors))
+
+
+def format_payload(paragraphs, embeddings):
+    """Build vector records."""
+    return [
+        {"id": vid, "values": values, "metadata": {"text": text}}
+        for (vid, text), values in zip(paragraphs, embeddings)
+    ]
+
+
+async def run_sequential(args) -> tuple[float, int]:
+    """Embed the whole document, then upsert it in chunks."""
+    held = HeldVectors()
+    embeddings = FakeEmbeddings(args.embedding_latency, args.dimensions, held)
+    store = FakeVectorStore(args.upsert_latency, held)
+    semaphore = asyncio.Semaphore(args.max_in_flight)
+    paragraphs = [(str(idx), f"paragraph {idx}") for idx in range(args.paragraphs)]
+
+    async def upsert(batch):
+        async with semaphore:
+            await store.upsert(batch)
+
+    start = time.perf_counter()
+    texts = [text for _, text in paragraphs]
+    payload = format_payload(paragraphs, await embeddings.aembed_documents(texts))
+    await asyncio.gather(
+        *(
+            upsert(payload[idx : idx + args.batch_size])
+            for idx in range(0, len(payload), args.batch_size)
+        )
+    )
+    return time.perf_counter() - start, held.peak
+
+
+async def run_pipelined(args) -> tuple[float, int]:
+    """Stream batches through the ingestion pipeline."""
+    held = HeldVectors()
+    batcher = UpsertBatcher(
+        FakeVectorStore(args.upsert_latency, held),  # type: ignore[arg-type]
+        args.batch_size,
+        args.max_bytes,
+        args.max_in_flight,
+        max_retries=0,
+    )
+    pipeline = IngestPipeline(
+        FakeEmbeddings(  # type: ignore[arg-type]
+            args.embedding_latency, args.dimensions, held
+        ),
+        batcher,
+        args.batch_size,
+        args.queue_size,
+    )
+    paragraphs = ((str(idx), f"paragraph {idx}") for idx in range(args.paragraphs))
+
+    start = time.perf_counter()
+    await pipeline.run(paragraphs, format_payload)
+    return time.perf_counter() - start, held.peak
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=2)
+    parser.add_argument("--max-bytes", type=int, default=1_500_000)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--embedding-latency", type=float, default=0.0002)
+    parser.add_argument("--upsert-latency", type=float, default=0.0008)
+    args = parser.parse_args()
+    logger.disable("operations")
+
+    embed_seconds = args.paragraphs * args.embedding_latency
+    upsert_seconds = args.paragraphs * args.upsert_latency / args.max_in_flight
+    print(f"stage time: embedding {embed_seconds:.2f}s, upsert {upsert_seconds:.2f}s")
+    print(f"{'pipeline':<10} {'seconds':>8} {'max vectors held':>17}")
+    for name, runner in (("sequential", run_sequential), ("pipelined", run_pipelined)):
+        elapsed, held = asyncio.run(runner(args))
+        print(f"{name:<10} {elapsed:>8.2f} {held:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+IVF index recall benchmark.
+
+Measures recall@k and query latency of the inverted file vector index for
+a range of `nprobe` values against exact search over the same vectors.
+Vectors are drawn around random topic centroids and spread over many files,
+queries are drawn the same way but not indexed and are searched across all
+files. The index is built in small batches like per file ingestion would,
+with the `nlist`, `nprobe` and segment limits of the settings by default.
+
+Usage::
+
+    python -m benchmarks.ivf_recall --rows 50000 --nprobe 16 32 64 128
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.vector_quantization import clustered_vectors, recall
+from settings import Settings
+from vector_stores import IVFVectorStore
+from vector_stores.local_store import top_k_indices
+
+DEFAULTS = {name: field.default for name, field in Settings.model_fields.items()}
+
+
+async def run(args: argparse.Namespace):
+    """
+    Build the index and query it.
+
+    :param args: command line arguments
+    :return: None
+    """
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rng, args.rows + args.queries, args.dims, args.noise)
+    matrix, queries = vectors[: args.rows], vectors[args.rows :]
+
+    start = time.perf_counter()
+    expected = [top_k_indices(matrix @ query, args.top_k) for query in queries]
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = IVFVectorStore(directory, args.nlist, 1, args.max_segments)
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            await store.upsert(
+                [
+                    {
+                        "id": str(row),
+                        "values": matrix[row].tolist(),
+                        "metadata": {"text": "", "file_id": f"file-{row % 500}"},
+                    }
+                    for row in range(offset, min(offset + args.batch, args.rows))
+                ]
+            )
+        print(
+            f"indexed {args.rows} vectors in {time.perf_counter() - start:.1f}s, "
+            f"nlist={args.nlist}, {store.metrics()['segments']} segments"
+        )
+        print(f"{'search':<12} {'ms/query':>9} {'recall@k':>9}")
+        print(f"{'exact':<12} {exact_ms:>9.2f} {1.0:>9.3f}")
+
+        for nprobe in sorted(set(args.nprobe) | {DEFAULTS["vector_ivf_nprobe"]}):
+            results = []
+            start = time.perf_counter()
+            for query in queries:
+                matches = await store.query_all(
+                    query.tolist(), args.top_k, nprobe=nprobe
+                )
+                results.append(np.array([int(match.id) for match in matches]))
+            elapsed = (time.perf_counter() - start) / args.queries * 1000
+            marker = " (default)" if nprobe == DEFAULTS["vector_ivf_nprobe"] else ""
+            print(
+                f"{'nprobe=' + str(nprobe):<12} {elapsed:>9.2f} "
+                f"{recall(results, expected):>9.3f}{marker}"
+            )
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--nlist", type=int, default=DEFAULTS["vector_ivf_nlist"])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32, 128])
+    parser.add_argument(
+        "--max-segments", type=int, default=DEFAULTS["vector_ivf_max_segments"]
+    )
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Vector quantization benchmark.
+
+Measures memory, query latency and recall@k of an int8 quantized matrix
+against exact float32 search, with and without rescoring the
+top candidates on float32 rows. Vectors are drawn around random topic
+centroids so neighbours are meaningfully closer than the rest, queries are
+perturbed copies of stored vectors.
+
+Usage::
+
+    python -m benchmarks.vector_quantization --rows 20000 --dims 1536
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vector_stores.local_store import normalize_rows, top_k_indices
+from vector_stores.quantization import approximate_scores, quantize, rescored_matches
+
+
+def clustered_vectors(
+    rng: np.random.Generator, rows: int, dims: int, noise_scale: float = 0.8
+) -> np.ndarray:
+    """
+    Unit vectors grouped around random topic centroids.
+
+    :param rng: random generator
+    :param rows: number of vectors
+    :param dims: vector dimensions
+    :param noise_scale: spread of vectors around their topic centroid
+    :return: float32 matrix of unit rows
+    """
+    centroids = rng.normal(size=(max(rows // 100, 1), dims)).astype(np.float32)
+    topics = rng.integers(len(centroids), size=rows)
+    noise = rng.normal(scale=noise_scale, size=(rows, dims)).astype(np.float32)
+    return normalize_rows(centroids[topics] + noise)
+
+
+def timed(search, queries: np.ndarray) -> tuple[list[np.ndarray], float]:
+    """
+    Run a search per query.
+
+    :param search: callable returning the top rows of a query
+    :param queries: query vectors
+    :return: top rows per query and mean milliseconds per query
+    """
+    start = time.perf_counter()
+    results = [np.asarray(search(query)) for query in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def recall(results: list[np.ndarray], expected: list[np.ndarray]) -> float:
+    """
+    Mean fraction of the exact top k found.
+
+    :param results: top rows per query
+    :param expected: exact top rows per query
+    :return: recall@k
+    """
+    hits = [
+        len(np.intersect1d(got, want)) / len(want)
+        for got, want in zip(results, expected)
+    ]
+    return float(np.mean(hits))
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = clustered_vectors(rng, args.rows, args.dims)
+    picks = rng.integers(args.rows, size=args.queries)
+    queries = normalize_rows(
+        matrix[picks] + rng.normal(scale=0.05, size=(args.queries, args.dims))
+    ).astype(np.float32)
+
+    expected, exact_ms = timed(
+        lambda query: top_k_indices(matrix @ query, args.top_k), queries
+    )
+
+    print(f"{'storage':<16} {'MB':>8} {'ms/query':>9} {'recall@k':>9}")
+    print(f"{'float32':<16} {matrix.nbytes / 1e6:>8.1f} {exact_ms:>9.2f} {1.0:>9.3f}")
+
+    for quantization in ("int8",):
+        quantized = quantize(matrix, quantization)
+        megabytes = quantized.nbytes / 1e6
+
+        results, elapsed = timed(
+            lambda query: top_k_indices(
+                approximate_scores(quantized, query), args.top_k
+            ),
+            queries,
+        )
+        print(
+            f"{quantization:<16} {megabytes:>8.1f} {elapsed:>9.2f} "
+            f"{recall(results, expected):>9.3f}"
+        )
+
+        results, elapsed = timed(
+            lambda query: [
+                row
+                for row, _ in rescored_matches(
+                    matrix, quantized, list(query), args.top_k, args.rescore_factor
+                )
+            ],
+            queries,
+        )
+        print(
+            f"{quantization + ' rescored':<16} {megabytes:>8.1f} {elapsed:>9.2f} "
+            f"{recall(results, expected):>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
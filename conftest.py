@@ -1,5 +1,7 @@
 """Configuration tests module."""
 
+import uuid
+
 import numpy as np
 import pytest
 from fastapi.testclient import TestClient
@@ -9,15 +11,20 @@ from sqlalchemy.pool import StaticPool
 
 from database import Base
 from dependencies import (
+    get_async_redis_client,
     get_current_user,
     get_db_session,
     get_gcp_client,
     get_llm_embedding_client,
-    get_pinecone_index,
+    get_query_embedding_memory_cache,
     get_redis_client,
+    get_search_memory_cache,
+    get_vector_store,
 )
 from main import create_app
+from models.user import User
 from settings import get_settings
+from vector_stores import PineconeVectorStore
 
 engine = create_engine(
     "sqlite:///:memory:",
@@ -50,6 +57,15 @@ def override_gcp_client():
     return MockGCPClient()
 
 
+def override_get_current_user():
+    """Overridden get_current_user app dependency."""
+    return User(
+        id=uuid.UUID("d4c3b2a1-0f9e-4d8c-b7a6-f5e4d3c2b1a0"),
+        username="test-user",
+        hashed_password="",
+    )
+
+
 def override_get_pinecone_index():
     """Overridden get_pinecone_index app dependency."""
 
@@ -66,6 +82,13 @@ def override_get_pinecone_index():
     return MockPineconeIndex()
 
 
+def override_get_vector_store():
+    """Overridden get_vector_store app dependency."""
+    return PineconeVectorStore(
+        override_get_pinecone_index(), "sample-embedding-name-space"
+    )
+
+
 def override_get_llm_embedding_client():
     """Overridden get_llm_embedding_client app dependency."""
 
@@ -73,12 +96,16 @@ def override_get_llm_embedding_client():
 
         @staticmethod
         async def aembed_documents(texts):
-            return [np.random.rand(1536)]
+            return [np.random.rand(1536) for _ in texts]
 
         @staticmethod
         def embed_query(text):
             return np.random.rand(1536)
 
+        @staticmethod
+        async def aembed_query(text):
+            return np.random.rand(1536)
+
     return MockOpenAIEmbeddings()
 
 
@@ -95,9 +122,77 @@ def override_get_redis_client():
         def set(*args, **kwargs):
             return None
 
+        @staticmethod
+        def xadd(*args, **kwargs):
+            return b"0-1"
+
     return MockRedisClient()
 
 
+def override_get_async_redis_client():
+    """Overridden get_async_redis_client app dependency."""
+
+    class MockAsyncPipeline:
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
+        @staticmethod
+        def set(*args, **kwargs):
+            return None
+
+        @staticmethod
+        def sadd(*args, **kwargs):
+            return None
+
+        @staticmethod
+        def expire(*args, **kwargs):
+            return None
+
+        @staticmethod
+        async def execute():
+            return []
+
+    class MockAsyncRedisClient:
+
+        @staticmethod
+        async def get(key):
+            return None
+
+        @staticmethod
+        async def mget(keys):
+            return [None] * len(keys)
+
+        @staticmethod
+        async def set(*args, **kwargs):
+            return True
+
+        @staticmethod
+        async def exists(*keys):
+            return 0
+
+        @staticmethod
+        async def smembers(key):
+            return set()
+
+        @staticmethod
+        async def delete(*keys):
+            return 0
+
+        @staticmethod
+        async def eval(*args):
+            return 1
+
+        @staticmethod
+        def pipeline(*args, **kwargs):
+            return MockAsyncPipeline()
+
+    return MockAsyncRedisClient()
+
+
 def override_get_settings():
     """Overridden get_settings app dependency."""
 
@@ -112,9 +207,52 @@ def override_get_settings():
         db_url = ""
         gcp_storage_exp_minutes = 15
         pinecone_api_key = ""
+        vector_store_backend = "pinecone"
         embedding_chunk_size = 200
+        embedding_request_max_tokens = 50000
+        embedding_batch_wait_ms = 5
+        openai_embedding_rpm = 3000
+        openai_embedding_tpm = 1000000
+        embedding_rate_max_retries = 2
+        embedding_rate_backoff_base = 0
+        embedding_rate_backoff_max = 0
+        ingest_worker_concurrency = 2
+        ingest_visibility_timeout = 60
+        ingest_max_attempts = 2
+        ingest_poll_block_ms = 10
+        ingest_job_status_exp = 60
+        ingest_idempotency_exp = 60
+        ingest_job_progress_interval = 0.01
+        ingest_job_poll_interval = 0.01
+        ingest_job_max_wait = 1
+        ingest_job_stream_timeout = 1
+        chunk_min_tokens = 1
+        chunk_max_tokens = 512
+        ingest_queue_size = 2
+        upsert_batch_max_vectors = 100
+        upsert_batch_max_bytes = 1000000
+        upsert_max_in_flight = 2
+        upsert_max_retries = 1
         embedding_namespace = "sample-embedding-name-space"
         redis_cache_exp = 15
+        openai_embeddings_model = "text-embedding-ada-002"
+        openai_embeddings_dimensions = None
+        query_embedding_cache_size = 100
+        extract_batch_max_items = 5
+        extract_batch_concurrency = 2
+        extract_max_files = 3
+        search_memory_cache_size = 100
+        search_negative_cache_exp = 5
+        search_stale_grace = 15
+        search_xfetch_beta = 1.0
+        single_flight_lease = 1
+        single_flight_wait = 0.2
+        single_flight_poll_interval = 0.01
+        search_memory_cache_ttl = 15
+        search_memory_cache_max_bytes = 100000
+        query_embedding_cache_exp = 15
+        document_embedding_store = "redis"
+        document_embedding_exp = 15
 
     return MockSettings()
 
@@ -142,7 +280,7 @@ def client(db_session):
     def override_get_db():
         yield db_session
 
-    app = create_app(disable_limiter=True)
+    app = create_app(disable_limiter=True, disable_warmup=True)
     app.dependency_overrides[get_db_session] = override_get_db
     app.dependency_overrides[get_settings] = override_get_settings
     with TestClient(app) as test_client:
@@ -159,13 +297,17 @@ def login_client(db_session):
     def override_get_db():
         yield db_session
 
-    app = create_app(disable_limiter=True)
+    get_search_memory_cache.cache_clear()
+    get_query_embedding_memory_cache.cache_clear()
+
+    app = create_app(disable_limiter=True, disable_warmup=True)
     app.dependency_overrides[get_db_session] = override_get_db
-    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_settings] = override_get_settings
     app.dependency_overrides[get_gcp_client] = override_gcp_client
-    app.dependency_overrides[get_pinecone_index] = override_get_pinecone_index
+    app.dependency_overrides[get_vector_store] = override_get_vector_store
     app.dependency_overrides[get_redis_client] = override_get_redis_client
+    app.dependency_overrides[get_async_redis_client] = override_get_async_redis_client
     app.dependency_overrides[get_llm_embedding_client] = (
         override_get_llm_embedding_client
     )
@@ -1,12 +1,109 @@
 """Database module."""
 
+from functools import lru_cache
+
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
 
+from metrics import PoolStats, register_metrics
 from models.user import Base
 from settings import Settings, get_settings
 
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records connection checkout wait times."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        with pool_stats.measure_checkout():
+            return super()._do_get()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        pool_stats.record_release()
+        super()._do_return_conn(record)
+
+
+@lru_cache
+def _build_engine(
+    db_url: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_recycle: int,
+    pool_timeout: float,
+) -> Engine:
+    """
+    Build the process wide database engine.
+
+    :param db_url: database URL
+    :param pool_size: number of connections kept open in the pool
+    :param max_overflow: number of connections allowed above pool size
+    :param pool_recycle: seconds after which a connection is recycled
+    :param pool_timeout: seconds to wait for a connection before giving up
+    :return: database engine
+    """
+    engine = create_engine(
+        db_url,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+    )
+
+    def engine_metrics() -> dict:
+        pool = engine.pool
+        return {
+            "size": pool.size(),  # type: ignore[attr-defined]
+            "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+            "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+            "overflow": pool.overflow(),  # type: ignore[attr-defined]
+            **pool_stats.snapshot(),
+        }
+
+    register_metrics("database", engine_metrics)
+    return engine
+
+
+def get_engine(settings: Settings) -> Engine:
+    """
+    Get the pooled database engine shared by the worker process.
+
+    :param settings: Application settings
+    :return: database engine
+    """
+    return _build_engine(
+        settings.db_url,
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_pool_recycle,
+        settings.db_pool_timeout,
+    )
+
+
+def init_db(settings: Settings):
+    """
+    Create database tables, run once on startup or as a migration step.
+
+    :param settings: Application settings
+    :return: None
+    """
+    Base.metadata.create_all(get_engine(settings))
+
+
+@lru_cache
+def _build_session_maker(engine: Engine) -> sessionmaker:
+    """
+    Build a session maker bound to the given engine.
+
+    :param engine: database engine
+    :return: session factory
+    """
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
 
 def session_factory(settings: Settings = Depends(get_settings)):
     """
@@ -15,9 +112,7 @@ def session_factory(settings: Settings = Depends(get_settings)):
     :param settings: Application settings dependency
     :return: session factory
     """
-    engine = create_engine(settings.db_url, pool_pre_ping=True)
-    Base.metadata.create_all(engine)
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return _build_session_maker(get_engine(settings))
 
 
 def get_db_session(session: sessionmaker = Depends(session_factory)):
@@ -31,3 +126,7 @@ def get_db_session(session: sessionmaker = Depends(session_factory)):
         yield db
     finally:
         db.close()
+
+
+if __name__ == "__main__":
+    init_db(get_settings())
@@ -1,26 +1,51 @@
 """Dependencies module."""
 
+from contextlib import contextmanager
 from functools import lru_cache
+from typing import Generator
 
 import jwt
 import redis  # type: ignore[import-untyped]
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from google.cloud import storage  # type: ignore[attr-defined]
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from langchain_openai import OpenAIEmbeddings
 from pinecone import Pinecone
-from pinecone.grpc import PineconeGRPC
 from sqlalchemy.orm import Session
 
 from database import get_db_session
+from metrics import CacheStats, Counters, register_metrics
 from models.user import User
+from operations.embedding_batcher import EmbeddingBatcher, EmbeddingBatcherState
+from operations.embedding_cache import QueryEmbeddingCache
+from operations.embedding_scheduler import EmbeddingScheduler
+from operations.embedding_store import (
+    EmbeddingStore,
+    RedisEmbeddingStore,
+    SQLiteEmbeddingStore,
+)
+from operations.ingest_queue import IngestQueue
+from operations.job_status import JobStatusStore
+from operations.memory_cache import MemoryCache
+from operations.search_cache import SearchResultCache
+from operations.single_flight import SingleFlight, SingleFlightState
+from pinecone_client import get_pinecone_registry, is_transport_failure
+from redis_client import get_async_redis_pool, get_redis_pool
 from settings import Settings, get_settings
+from vector_stores import (
+    IVFVectorStore,
+    LocalVectorStore,
+    PineconeVectorStore,
+    ShardVectorStore,
+    VectorStore,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     settings: Settings = Depends(get_settings),
     session: Session = Depends(get_db_session),
@@ -92,17 +117,107 @@ def get_gcp_client(settings: Settings = Depends(get_settings)):
     return get_gcp_storage_client(settings.bucket_name)
 
 
-def get_pinecone_index(settings: Settings = Depends(get_settings)) -> Pinecone.Index:
+def get_pinecone_index(
+    settings: Settings = Depends(get_settings),
+) -> Generator[Pinecone.Index, None, None]:
     """
-    Get Pinecone index.
+    Get Pinecone index from the shared client registry.
+
+    The channel is replaced when the request fails on a broken transport.
 
     :param settings: Application settings dependency
-    :return: Pinecone index instance
+    :yield: Pinecone index instance
     """
-    pc = PineconeGRPC(
-        api_key=settings.pinecone_api_key, pool_threads=settings.pinecone_pool_count
-    )
-    return pc.Index(host=settings.pinecone_host)
+    registry = get_pinecone_registry(settings)
+    index = registry.get_index()
+
+    try:
+        yield index
+    except Exception as exc:
+        if is_transport_failure(exc):
+            registry.reconnect(index)
+        raise
+
+
+@lru_cache
+def get_local_vector_store() -> LocalVectorStore:
+    """
+    Get the process wide in-memory vector store.
+
+    :return: local vector store
+    """
+    return LocalVectorStore()
+
+
+@lru_cache
+def get_shard_vector_store(
+    directory: str, residency_bytes: int, quantization: str, rescore_factor: int
+) -> ShardVectorStore:
+    """
+    Get the process wide memory-mapped shard vector store.
+
+    :param directory: directory holding the shards
+    :param residency_bytes: bytes of shards kept mapped
+    :param quantization: quantization of shards written
+    :param rescore_factor: candidates rescored per requested match
+    :return: shard vector store
+    """
+    store = ShardVectorStore(directory, residency_bytes, quantization, rescore_factor)
+    register_metrics("vector_shards", store.metrics)
+    return store
+
+
+@lru_cache
+def get_ivf_vector_store(
+    directory: str, nlist: int, nprobe: int, max_segments: int
+) -> IVFVectorStore:
+    """
+    Get the process wide inverted file vector index.
+
+    :param directory: directory holding the index
+    :param nlist: number of lists trained
+    :param nprobe: lists scanned per query
+    :param max_segments: segments allowed before compaction
+    :return: inverted file vector store
+    """
+    store = IVFVectorStore(directory, nlist, nprobe, max_segments)
+    register_metrics("vector_ivf", store.metrics)
+    return store
+
+
+def get_vector_store(
+    settings: Settings = Depends(get_settings),
+) -> Generator[VectorStore, None, None]:
+    """
+    Get the vector store of the configured backend.
+
+    :param settings: Application settings dependency
+    :yield: vector store
+    """
+    if settings.vector_store_backend == "local":
+        yield get_local_vector_store()
+        return
+
+    if settings.vector_store_backend == "shard":
+        yield get_shard_vector_store(
+            settings.vector_shard_directory,
+            settings.vector_shard_residency_bytes,
+            settings.vector_shard_quantization,
+            settings.vector_shard_rescore_factor,
+        )
+        return
+
+    if settings.vector_store_backend == "ivf":
+        yield get_ivf_vector_store(
+            settings.vector_ivf_directory,
+            settings.vector_ivf_nlist,
+            settings.vector_ivf_nprobe,
+            settings.vector_ivf_max_segments,
+        )
+        return
+
+    with contextmanager(get_pinecone_index)(settings) as index:
+        yield PineconeVectorStore(index, settings.embedding_namespace)
 
 
 def get_llm_embedding_client(
@@ -123,14 +238,261 @@ def get_llm_embedding_client(
 
 def get_redis_client(settings: Settings = Depends(get_settings)):
     """
-    Get Redis client.
+    Get Redis client backed by the shared connection pool.
 
     :param settings: Application settings dependency
     :return: Redis client
     """
-    client = redis.Redis(
-        host=settings.redis_host,
-        port=settings.redis_port,
-        db=settings.redis_cache_db,
+    return redis.Redis(connection_pool=get_redis_pool(settings))
+
+
+def get_ingest_queue(
+    settings: Settings = Depends(get_settings),
+    redis_client: redis.Redis = Depends(get_redis_client),
+) -> IngestQueue:
+    """
+    Get the ingestion job queue producer.
+
+    :param settings: Application settings dependency
+    :param redis_client: Redis client dependency
+    :return: ingestion job queue
+    """
+    return IngestQueue(settings, redis_client)
+
+
+def get_async_redis_client(settings: Settings = Depends(get_settings)):
+    """
+    Get asyncio Redis client backed by the shared connection pool.
+
+    :param settings: Application settings dependency
+    :return: asyncio Redis client
+    """
+    return aioredis.Redis(connection_pool=get_async_redis_pool(settings))
+
+
+@lru_cache
+def get_embedding_batcher_state() -> EmbeddingBatcherState:
+    """
+    Get the process wide document embedding micro-batcher state.
+
+    :return: embedding micro-batcher state
+    """
+    state = EmbeddingBatcherState()
+    register_metrics("embedding_batcher", state.stats.snapshot)
+    return state
+
+
+@lru_cache
+def get_embedding_scheduler_stats() -> Counters:
+    """
+    Get the process wide document embedding scheduler counters.
+
+    :return: scheduler counters
+    """
+    stats = Counters("requests", "tokens", "paced", "throttled", "failures")
+    register_metrics("embedding_scheduler", stats.snapshot)
+    return stats
+
+
+def get_embedding_scheduler(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+    embedding_client: OpenAIEmbeddings = Depends(get_llm_embedding_client),
+) -> EmbeddingScheduler:
+    """
+    Get document embedding scheduler pacing requests under the rate limits.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :param embedding_client: OpenAI embeddings client dependency
+    :return: embedding scheduler
+    """
+    return EmbeddingScheduler(
+        settings, redis_client, embedding_client, get_embedding_scheduler_stats()
+    )
+
+
+def get_embedding_batcher(
+    settings: Settings = Depends(get_settings),
+    embedding_client: EmbeddingScheduler = Depends(get_embedding_scheduler),
+) -> EmbeddingBatcher:
+    """
+    Get document embedding micro-batcher shared by concurrent ingestion jobs.
+
+    :param settings: Application settings dependency
+    :param embedding_client: rate limited embedding scheduler dependency
+    :return: embedding micro-batcher
+    """
+    return EmbeddingBatcher(settings, embedding_client, get_embedding_batcher_state())
+
+
+def get_job_status_store(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+) -> JobStatusStore:
+    """
+    Get the ingestion job status store.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :return: job status store
+    """
+    return JobStatusStore(
+        redis_client, settings.ingest_job_status_exp, settings.ingest_job_poll_interval
     )
-    return client
+
+
+@lru_cache
+def get_query_embedding_memory_cache(maxsize: int) -> MemoryCache:
+    """
+    Get the process wide in-memory query embedding cache.
+
+    :param maxsize: maximum number of cached embeddings
+    :return: in-memory cache
+    """
+    return MemoryCache(maxsize)
+
+
+@lru_cache
+def get_query_embedding_stats() -> CacheStats:
+    """
+    Get the process wide query embedding cache statistics.
+
+    :return: cache statistics
+    """
+    stats = CacheStats("memory", "redis")
+    register_metrics("query_embedding_cache", stats.snapshot)
+    return stats
+
+
+def get_query_embedding_cache(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+) -> QueryEmbeddingCache:
+    """
+    Get query embedding cache.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :return: query embedding cache
+    """
+    return QueryEmbeddingCache(
+        settings,
+        redis_client,
+        get_query_embedding_memory_cache(settings.query_embedding_cache_size),
+        get_query_embedding_stats(),
+    )
+
+
+@lru_cache
+def get_search_memory_cache(maxsize: int, ttl: float, max_bytes: int) -> MemoryCache:
+    """
+    Get the process wide in-memory search result cache.
+
+    :param maxsize: maximum number of cached search results
+    :param ttl: seconds a search result stays in memory
+    :param max_bytes: maximum serialized size of the cached search results
+    :return: in-memory cache
+    """
+    return MemoryCache(maxsize, ttl=ttl, max_bytes=max_bytes)
+
+
+@lru_cache
+def get_search_cache_stats() -> CacheStats:
+    """
+    Get the process wide search result cache statistics.
+
+    :return: cache statistics
+    """
+    stats = CacheStats("memory", "redis")
+    register_metrics("search_cache", stats.snapshot)
+    return stats
+
+
+def get_search_cache(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+) -> SearchResultCache:
+    """
+    Get search result cache.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :return: search result cache
+    """
+    memory_cache = get_search_memory_cache(
+        settings.search_memory_cache_size,
+        settings.search_memory_cache_ttl,
+        settings.search_memory_cache_max_bytes,
+    )
+    return SearchResultCache(
+        settings, redis_client, memory_cache, get_search_cache_stats()
+    )
+
+
+@lru_cache
+def get_single_flight_state() -> SingleFlightState:
+    """
+    Get the process wide single-flight state.
+
+    :return: single-flight state
+    """
+    state = SingleFlightState()
+    register_metrics("single_flight", state.stats.snapshot)
+    return state
+
+
+def get_single_flight(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+) -> SingleFlight:
+    """
+    Get search request coalescing.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :return: single-flight request coalescing
+    """
+    return SingleFlight(settings, redis_client, get_single_flight_state())
+
+
+@lru_cache
+def get_sqlite_embedding_store(
+    path: str, model: str, dimensions: int | None
+) -> SQLiteEmbeddingStore:
+    """
+    Get the process wide SQLite document embedding store.
+
+    :param path: SQLite database file path
+    :param model: embeddings model name
+    :param dimensions: embeddings dimensions, None for the model default
+    :return: document embedding store
+    """
+    return SQLiteEmbeddingStore(path, model, dimensions)
+
+
+def get_document_embedding_store(
+    settings: Settings = Depends(get_settings),
+    redis_client: aioredis.Redis = Depends(get_async_redis_client),
+) -> EmbeddingStore | None:
+    """
+    Get the document embedding store configured by `document_embedding_store`.
+
+    :param settings: Application settings dependency
+    :param redis_client: asyncio Redis client dependency
+    :return: document embedding store or None when disabled
+    """
+    model = settings.openai_embeddings_model
+    dimensions = settings.openai_embeddings_dimensions
+
+    if settings.document_embedding_store == "redis":
+        return RedisEmbeddingStore(
+            redis_client, model, dimensions, settings.document_embedding_exp
+        )
+
+    if settings.document_embedding_store == "sqlite":
+        return get_sqlite_embedding_store(
+            settings.document_embedding_store_path, model, dimensions
+        )
+
+    return None
@@ -1,32 +1,72 @@
 """Main module."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+from database import get_engine, init_db
+from pinecone_client import get_pinecone_registry
 from rate_limit_config import limiter
+from redis_client import get_async_redis_pool, get_redis_pool
 from routers import router
 from settings import get_settings
 
 
-def create_app(disable_limiter=False):
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize shared resources on startup and release them on shutdown.
+
+    :param app: FastAPI application instance.
+    :yield: None
+    """
+    settings = get_settings()
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.io_thread_pool_size)
+    )
+
+    use_pinecone = settings.vector_store_backend == "pinecone"
+
+    if app.state.warmup:
+        init_db(settings)
+        if use_pinecone:
+            await asyncio.to_thread(get_pinecone_registry(settings).start)
+
+    yield
+
+    if app.state.warmup:
+        if use_pinecone:
+            get_pinecone_registry(settings).close()
+        get_redis_pool(settings).disconnect()
+        await get_async_redis_pool(settings).aclose()
+        get_engine(settings).dispose()
+
+
+def create_app(disable_limiter=False, disable_warmup=False):
     """
     Create FastAPI application.
 
     :param disable_limiter: Boolean value to enable/disable rate limiting.
+    :param disable_warmup: Boolean value to skip startup resource initialization.
     :return: FastAPI application instance.
     """
     app = FastAPI(
         title="AI File Search Service",
         description="AI File Search Service",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     if disable_limiter:
         limiter.enabled = False
 
     app.state.limiter = limiter
+    app.state.warmup = not disable_warmup
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
     app.include_router(router.api_router)
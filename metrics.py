@@ -0,0 +1,193 @@
+"""Metrics module."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]):
+    """
+    Register a metrics provider exposed through the metrics endpoint.
+
+    :param name: metrics section name
+    :param provider: callable returning a dictionary of metrics
+    :return: None
+    """
+    _providers[name] = provider
+
+
+def unregister_metrics(name: str):
+    """
+    Remove a metrics provider, unknown names are ignored.
+
+    :param name: metrics section name
+    :return: None
+    """
+    _providers.pop(name, None)
+
+
+def collect_metrics() -> dict:
+    """
+    Collect metrics from every registered provider.
+
+    :return: metrics grouped by section name
+    """
+    return {name: provider() for name, provider in _providers.items()}
+
+
+class PoolStats:
+    """Connection pool checkout statistics."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.releases = 0
+        self.failures = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @contextmanager
+    def measure_checkout(self):
+        """
+        Measure the time spent waiting for a pooled connection.
+
+        :yield: None
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.waiting -= 1
+                if failed:
+                    self.failures += 1
+                else:
+                    self.checkouts += 1
+                self.wait_seconds_total += elapsed
+                self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+
+    def record_release(self):
+        """
+        Record a connection returned to the pool.
+
+        :return: None
+        """
+        with self._lock:
+            self.releases += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get a point in time copy of the statistics.
+
+        :return: statistics dictionary
+        """
+        with self._lock:
+            attempts = self.checkouts + self.failures
+            return {
+                "checkouts": self.checkouts,
+                "in_use": self.checkouts - self.releases,
+                "failures": self.failures,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / attempts if attempts else 0.0
+                ),
+            }
+
+
+class CacheStats:
+    """Cache hit and miss counters per cache tier."""
+
+    def __init__(self, *tiers: str):
+        """
+        Initialize counters.
+
+        :param tiers: cache tier names, fastest first
+        """
+        self._lock = threading.Lock()
+        self.tiers = tiers
+        self.hits = dict.fromkeys(tiers, 0)
+        self.misses = 0
+
+    def record_hit(self, tier: str):
+        """
+        Record a cache hit.
+
+        :param tier: cache tier name that served the hit
+        :return: None
+        """
+        with self._lock:
+            self.hits[tier] += 1
+
+    def record_miss(self):
+        """
+        Record a miss on every cache tier.
+
+        :return: None
+        """
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self) -> dict:
+        """
+        Get a point in time copy of the statistics.
+
+        :return: statistics dictionary
+        """
+        with self._lock:
+            lookups = sum(self.hits.values()) + self.misses
+            return {
+                **{f"{tier}_hits": hits for tier, hits in self.hits.items()},
+                "misses": self.misses,
+                "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+            }
+
+
+class Counters:
+    """Named event counters."""
+
+    def __init__(self, *names: str):
+        """
+        Initialize counters.
+
+        :param names: counter names
+        """
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(names, 0)
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Increment a counter.
+
+        :param name: counter name
+        :param value: increment value
+        :return: None
+        """
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        Get a point in time copy of the counters.
+
+        :return: counters dictionary
+        """
+        with self._lock:
+            return dict(self.counts)
@@ -1,8 +1,9 @@
 """API Requests module."""
 
 from datetime import datetime, timedelta
+from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class UserRegisterRequest(BaseModel):
@@ -13,10 +14,16 @@ class UserRegisterRequest(BaseModel):
 
 
 class ExtractRequest(BaseModel):
-    """Extract API request model."""
+    """Extract API request model, searching one file, a list of files or all files."""
 
     query_text: str = Field(default=..., description="Query texts")
-    file_id: str = Field(default=..., description="File id")
+    file_id: Optional[str] = Field(default=None, description="File id")
+    file_ids: Optional[list[str]] = Field(
+        default=None, min_length=1, description="File ids searched together"
+    )
+    all_files: bool = Field(
+        default=False, description="Search every file processed for the user"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -24,6 +31,57 @@ class ExtractRequest(BaseModel):
                 {
                     "query_text": "building, floors and walls",
                     "file_id": "東京都建築安全条例.json",
+                },
+                {
+                    "query_text": "building, floors and walls",
+                    "file_ids": ["東京都建築安全条例.json", "建築基準法.json"],
+                },
+                {"query_text": "building, floors and walls", "all_files": True},
+            ]
+        }
+    }
+
+    @model_validator(mode="after")
+    def check_single_scope(self) -> "ExtractRequest":
+        """
+        Validate exactly one of file_id, file_ids and all_files is given.
+
+        :return: validated request
+        """
+        scopes = [self.file_id is not None, self.file_ids is not None, self.all_files]
+        if sum(scopes) != 1:
+            raise ValueError("Exactly one of file_id, file_ids or all_files required")
+        return self
+
+
+class BatchExtractItem(BaseModel):
+    """Batch Extract API request item model."""
+
+    query_text: str = Field(default=..., description="Query texts")
+    file_id: str = Field(default=..., description="File id")
+
+
+class BatchExtractRequest(BaseModel):
+    """Batch Extract API request model."""
+
+    items: list[BatchExtractItem] = Field(
+        default=..., min_length=1, description="Query texts and file ids"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "items": [
+                        {
+                            "query_text": "building, floors and walls",
+                            "file_id": "東京都建築安全条例.json",
+                        },
+                        {
+                            "query_text": "fire escape stairs",
+                            "file_id": "東京都建築安全条例.json",
+                        },
+                    ]
                 }
             ]
         }
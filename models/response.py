@@ -35,3 +35,46 @@ class BaseDataResponse(BaseModel):
     """Base Data Response model."""
 
     data: Optional[list]
+
+
+class BatchExtractItemResponse(BaseModel):
+    """Batch Extract item Response model."""
+
+    query_text: str
+    file_id: str
+    data: Optional[list]
+    error: Optional[str]
+
+
+class BatchExtractResponse(BaseModel):
+    """Batch Extract Response model."""
+
+    data: list[BatchExtractItemResponse]
+
+
+class MetricsResponse(BaseModel):
+    """Metrics Response model."""
+
+    data: dict
+
+
+class IngestJobResponse(BaseModel):
+    """Queued ingestion job Response model."""
+
+    job_id: str
+    file_id: str
+    duplicate: bool = False
+
+
+class IngestJobStatusResponse(BaseModel):
+    """Ingestion job status Response model."""
+
+    job_id: str
+    file_id: str
+    content_version: Optional[str] = None
+    state: str
+    attempt: int
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+    progress: dict
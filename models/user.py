@@ -2,7 +2,7 @@
 
 import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import DeclarativeBase
 
@@ -25,3 +25,16 @@ class User(Base):
     )
     username = Column(String(100), unique=True, index=True)
     hashed_password = Column(String(100), nullable=False)
+
+
+class UserFile(Base):
+    """Database model for files processed for a user"""
+
+    __tablename__ = "user_file"
+    __table_args__ = (UniqueConstraint("user_id", "file_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(
+        PG_UUID(as_uuid=True), ForeignKey("user.id"), index=True, nullable=False
+    )
+    file_id = Column(String(255), nullable=False)
@@ -0,0 +1,112 @@
+"""Cache keys module."""
+
+import hashlib
+import unicodedata
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a query text so equivalent queries share cache entries.
+
+    :param text: query text
+    :return: NFKC normalized, case folded text with collapsed whitespace
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def text_digest(text: str) -> str:
+    """
+    Fixed length digest of a text.
+
+    :param text: text to hash
+    :return: sha256 hex digest
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_cache_key(model: str, dimensions: int | None, text: str) -> str:
+    """
+    Cache key of a query embedding.
+
+    :param model: embeddings model name
+    :param dimensions: embeddings dimensions, None for the model default
+    :param text: normalized query text
+    :return: cache key
+    """
+    return f"emb:{model}:{dimensions or 'default'}:{text_digest(text)}"
+
+
+def document_embedding_key(model: str, dimensions: int | None, text: str) -> str:
+    """
+    Store key of a document paragraph embedding.
+
+    :param model: embeddings model name
+    :param dimensions: embeddings dimensions, None for the model default
+    :param text: paragraph text, not normalized
+    :return: store key
+    """
+    return f"docemb:{model}:{dimensions or 'default'}:{text_digest(text)}"
+
+
+def search_cache_key(
+    namespace: str | None,
+    model: str,
+    dimensions: int | None,
+    text: str,
+    file_id: str,
+) -> str:
+    """
+    Fixed length cache key of a search result.
+
+    :param namespace: vector index namespace
+    :param model: embeddings model name
+    :param dimensions: embeddings dimensions, None for the model default
+    :param text: normalized query text
+    :param file_id: file id searched
+    :return: cache key
+    """
+    digest = text_digest(f"{text}\0{file_id}")
+    return f"search:{namespace}:{model}:{dimensions or 'default'}:{digest}"
+
+
+def search_file_index_key(namespace: str | None, file_id: str) -> str:
+    """
+    Key of the set of cache keys of search results of a file.
+
+    :param namespace: vector index namespace
+    :param file_id: file id searched
+    :return: index key
+    """
+    return f"search:file:{namespace}:{text_digest(file_id)}"
+
+
+def embedding_rate_key(model: str, window: int) -> str:
+    """
+    Key of the embedding requests and tokens used in a rate limit window.
+
+    :param model: embeddings model name
+    :param window: minutes since the epoch
+    :return: rate limit key
+    """
+    return f"ratelimit:emb:{model}:{window}"
+
+
+def ingest_job_key(job_id: str) -> str:
+    """
+    Key of the status of an ingestion job.
+
+    :param job_id: ingestion job id
+    :return: job status key
+    """
+    return f"ingest:job:{job_id}"
+
+
+def ingest_idempotency_key(user_id: str, key: str) -> str:
+    """
+    Fixed length key mapping an ingestion request to its job.
+
+    :param user_id: id of the user queueing the job
+    :param key: client idempotency key, or file id and content version
+    :return: idempotency key
+    """
+    return f"ingest:idem:{user_id}:{text_digest(key)}"
@@ -0,0 +1,152 @@
+"""Token budgeted paragraph chunking module."""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import tiktoken
+
+# Encoding of the OpenAI embedding models.
+ENCODING_NAME = "cl100k_base"
+# Splits after sentence ending punctuation and line breaks, keeping both.
+SENTENCE_PATTERN = re.compile(r"(?<=[。．！？!?\n])|(?<=[.;:]\s)")
+
+
+class Chunk(NamedTuple):
+    """Embedded text covering the OCR paragraphs `start` to `end`, exclusive."""
+
+    text: str
+    start: int
+    end: int
+
+
+@lru_cache
+def get_encoding() -> tiktoken.Encoding:
+    """
+    Get the tokenizer of the embedding models, loaded once.
+
+    :return: tiktoken encoding
+    """
+    return tiktoken.get_encoding(ENCODING_NAME)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Count the embedding tokens of a text.
+
+    CJK characters take one to three tokens each depending on how common
+    they are, so texts are counted with the tokenizer rather than by length.
+
+    :param text: text
+    :return: token count
+    """
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def _split_long(text: str, max_tokens: int) -> list[str]:
+    """
+    Split a sentence over the budget into pieces of whole characters.
+
+    Each piece holds the characters of the next `max_tokens` tokens, a
+    character spread over several tokens is kept whole in the next piece.
+
+    :param text: sentence text
+    :param max_tokens: token budget per piece
+    :return: pieces within the budget
+    """
+    encoding = get_encoding()
+    pieces = []
+    while estimate_tokens(text) > max_tokens:
+        tokens = encoding.encode(text, disallowed_special=())[:max_tokens]
+        head = encoding.decode_bytes(tokens).decode("utf-8", errors="ignore")
+        cut = max(len(head), 1)
+        # Tokens of a piece encoded alone can differ from those in context.
+        while cut > 1 and estimate_tokens(text[:cut]) > max_tokens:
+            cut -= 1
+        pieces.append(text[:cut])
+        text = text[cut:]
+    pieces.append(text)
+    return pieces
+
+
+def split_paragraph(text: str, max_tokens: int) -> list[str]:
+    """
+    Split a paragraph over the budget on sentence boundaries.
+
+    Sentences are packed greedily, sentences over the budget on their own
+    are split between characters.
+
+    :param text: paragraph text
+    :param max_tokens: token budget per piece
+    :return: pieces within the budget
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    sentences = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        if sentence:
+            sentences.extend(_split_long(sentence, max_tokens))
+
+    pieces: list[str] = []
+    current = ""
+    for sentence in sentences:
+        if current and estimate_tokens(current + sentence) > max_tokens:
+            pieces.append(current)
+            current = ""
+        current += sentence
+    pieces.append(current)
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def _merge(first: Chunk, second: Chunk, max_tokens: int) -> Chunk | None:
+    """
+    Join two consecutive chunks.
+
+    :param first: earlier chunk
+    :param second: later chunk
+    :param max_tokens: maximum chunk size
+    :return: joined chunk, None when over the budget
+    """
+    text = f"{first.text}\n{second.text}"
+    if estimate_tokens(text) > max_tokens:
+        return None
+    return Chunk(text, first.start, second.end)
+
+
+def chunk_paragraphs(
+    paragraphs: list[str], min_tokens: int, max_tokens: int
+) -> list[Chunk]:
+    """
+    Merge small paragraphs and split large ones into chunks within a budget.
+
+    A chunk under `min_tokens` is joined with the next paragraph by a line
+    break as long as the result stays within `max_tokens`, so headers are
+    embedded together with the text they introduce. A small last chunk is
+    joined with the one before it.
+
+    :param paragraphs: OCR paragraph texts in document order
+    :param min_tokens: chunks under this size are merged with a neighbour
+    :param max_tokens: maximum chunk size
+    :return: chunks in document order
+    """
+    pieces = [
+        Chunk(piece, idx, idx + 1)
+        for idx, paragraph in enumerate(paragraphs)
+        for piece in split_paragraph(paragraph, max_tokens)
+    ]
+
+    chunks: list[Chunk] = []
+    for piece in pieces:
+        if chunks and estimate_tokens(chunks[-1].text) < min_tokens:
+            merged = _merge(chunks[-1], piece, max_tokens)
+            if merged:
+                chunks[-1] = merged
+                continue
+        chunks.append(piece)
+
+    if len(chunks) > 1 and estimate_tokens(chunks[-1].text) < min_tokens:
+        merged = _merge(chunks[-2], chunks[-1], max_tokens)
+        if merged:
+            chunks[-2:] = [merged]
+    return chunks
@@ -0,0 +1,153 @@
+"""Cross-job document embedding micro-batching module."""
+
+import asyncio
+
+from langchain_openai import OpenAIEmbeddings
+from loguru import logger
+
+from metrics import Counters
+from operations.chunker import estimate_tokens
+from operations.embedding_scheduler import EmbeddingScheduler
+from settings import Settings
+
+# Texts of one caller and the future receiving their embeddings.
+PendingCall = tuple[list[str], asyncio.Future]
+
+
+class EmbeddingBatcherState:
+    """Process wide embedding micro-batcher state."""
+
+    def __init__(self):
+        """Initialize state and counters."""
+        self.pending = []
+        self.items = 0
+        self.tokens = 0
+        self.timer = None
+        self.sending = set()
+        self.stats = Counters(
+            "calls",
+            "requests",
+            "texts",
+            "deduplicated",
+            "full_flushes",
+            "timer_flushes",
+            "failures",
+        )
+
+
+class EmbeddingBatcher:
+    """
+    Collect document embedding calls of concurrent ingestion jobs.
+
+    Texts of every call made inside the worker process are held for up to
+    `embedding_batch_wait_ms` milliseconds and sent to OpenAI in one request,
+    sooner once `embedding_chunk_size` texts or `embedding_request_max_tokens`
+    estimated tokens are waiting. Each caller awaits a future receiving the
+    embeddings of its own texts, or the error of the shared request. Texts
+    repeated across calls of a request are embedded once.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        embedding_client: OpenAIEmbeddings | EmbeddingScheduler,
+        state: EmbeddingBatcherState,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param embedding_client: OpenAI embedding client or its rate limited scheduler
+        :param state: process wide embedding micro-batcher state
+        """
+        self.embedding_client = embedding_client
+        self.max_wait = settings.embedding_batch_wait_ms / 1000
+        self.max_items = settings.embedding_chunk_size
+        self.max_tokens = settings.embedding_request_max_tokens
+        self.state = state
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed texts together with the texts of concurrent callers.
+
+        :param texts: document texts
+        :return: embedding per text
+        """
+        if not texts:
+            return []
+
+        state = self.state
+        tokens = sum(estimate_tokens(text) for text in texts)
+        if state.pending and (
+            state.items + len(texts) > self.max_items
+            or state.tokens + tokens > self.max_tokens
+        ):
+            self._flush("full_flushes")
+
+        future = asyncio.get_running_loop().create_future()
+        state.pending.append((texts, future))
+        state.items += len(texts)
+        state.tokens += tokens
+        state.stats.increment("calls")
+
+        if state.items >= self.max_items or state.tokens >= self.max_tokens:
+            self._flush("full_flushes")
+        elif state.timer is None:
+            state.timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush, "timer_flushes"
+            )
+        return await future
+
+    def _flush(self, reason: str):
+        """
+        Send the waiting calls in one request.
+
+        :param reason: counter of the flush cause
+        :return: None
+        """
+        state = self.state
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        calls, state.pending = state.pending, []
+        state.items = state.tokens = 0
+        if not calls:
+            return
+
+        state.stats.increment(reason)
+        task = asyncio.get_running_loop().create_task(self._send(calls))
+        # Held until done, the event loop only keeps weak task references.
+        state.sending.add(task)
+        task.add_done_callback(state.sending.discard)
+
+    async def _send(self, calls: list[PendingCall]):
+        """
+        Embed the texts of many calls and hand each call its embeddings.
+
+        :param calls: waiting calls
+        :return: None
+        """
+        texts = [text for call_texts, _ in calls for text in call_texts]
+        unique = list(dict.fromkeys(texts))
+        self.state.stats.increment("requests")
+        self.state.stats.increment("texts", len(unique))
+        self.state.stats.increment("deduplicated", len(texts) - len(unique))
+
+        try:
+            vectors = await self.embedding_client.aembed_documents(unique)
+        except asyncio.CancelledError:
+            for _, future in calls:
+                future.cancel()
+            raise
+        except Exception as exc:
+            self.state.stats.increment("failures")
+            logger.warning(f"Embedding request of {len(calls)} calls failed: {exc}")
+            for _, future in calls:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        embedded = dict(zip(unique, vectors))
+        for call_texts, future in calls:
+            if not future.done():
+                future.set_result([embedded[text] for text in call_texts])
@@ -0,0 +1,178 @@
+"""Query embedding cache module."""
+
+import numpy as np
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from metrics import CacheStats
+from operations.cache_keys import embedding_cache_key
+from operations.memory_cache import MemoryCache
+from settings import Settings
+
+
+def pack_vector(vector) -> bytes:
+    """
+    Pack an embedding as float32 bytes.
+
+    :param vector: embedding values
+    :return: packed float32 bytes
+    """
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def unpack_vector(data: bytes) -> np.ndarray:
+    """
+    Unpack float32 bytes into an embedding.
+
+    :param data: packed float32 bytes
+    :return: embedding as float32 array
+    """
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class QueryEmbeddingCache:
+    """Two tier query embedding cache, in-process LRU in front of Redis."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: aioredis.Redis,
+        memory_cache: MemoryCache,
+        stats: CacheStats,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: asyncio Redis client
+        :param memory_cache: process wide in-memory cache of embeddings
+        :param stats: process wide cache statistics
+        """
+        self.settings = settings
+        self.redis_client = redis_client
+        self.memory_cache = memory_cache
+        self.stats = stats
+
+    def key(self, text: str) -> str:
+        """
+        Cache key of a normalized query text.
+
+        :param text: normalized query text
+        :return: cache key
+        """
+        return embedding_cache_key(
+            self.settings.openai_embeddings_model,
+            self.settings.openai_embeddings_dimensions,
+            text,
+        )
+
+    async def get(self, text: str) -> np.ndarray | None:
+        """
+        Get a cached query embedding.
+
+        :param text: normalized query text
+        :return: embedding or None on a miss
+        """
+        key = self.key(text)
+
+        vector = self.memory_cache.get(key)
+        if vector is not None:
+            self.stats.record_hit("memory")
+            return vector
+
+        try:
+            data = await self.redis_client.get(key)
+        except RedisError as exc:
+            logger.warning(f"Query embedding cache unavailable: {exc}")
+            data = None
+
+        if data is None:
+            self.stats.record_miss()
+            return None
+
+        vector = unpack_vector(data)
+        self.memory_cache.set(key, vector)
+        self.stats.record_hit("redis")
+        return vector
+
+    async def set(self, text: str, vector) -> np.ndarray:
+        """
+        Cache a query embedding in both tiers.
+
+        :param text: normalized query text
+        :param vector: embedding values
+        :return: embedding as float32 array
+        """
+        key = self.key(text)
+        data = pack_vector(vector)
+        packed = unpack_vector(data)
+        self.memory_cache.set(key, packed)
+
+        try:
+            await self.redis_client.set(
+                key, data, ex=self.settings.query_embedding_cache_exp
+            )
+        except RedisError as exc:
+            logger.warning(f"Query embedding cache unavailable: {exc}")
+
+        return packed
+
+    async def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """
+        Get cached query embeddings of many texts with at most one Redis MGET.
+
+        :param texts: normalized query texts
+        :return: embedding or None per text
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = [self.memory_cache.get(key) for key in keys]
+        for vector in vectors:
+            if vector is not None:
+                self.stats.record_hit("memory")
+
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        try:
+            values = await self.redis_client.mget([keys[idx] for idx in missing])
+        except RedisError as exc:
+            logger.warning(f"Query embedding cache unavailable: {exc}")
+            values = [None] * len(missing)
+
+        for idx, data in zip(missing, values):
+            if data is None:
+                self.stats.record_miss()
+                continue
+
+            vectors[idx] = unpack_vector(data)
+            self.memory_cache.set(keys[idx], vectors[idx])
+            self.stats.record_hit("redis")
+
+        return vectors
+
+    async def set_many(self, texts: list[str], vectors: list) -> list[np.ndarray]:
+        """
+        Cache many query embeddings in both tiers with one Redis pipeline.
+
+        :param texts: normalized query texts
+        :param vectors: embedding values per text
+        :return: embeddings as float32 arrays
+        """
+        keys = [self.key(text) for text in texts]
+        packed_data = [pack_vector(vector) for vector in vectors]
+        packed_vectors = [unpack_vector(data) for data in packed_data]
+
+        for key, packed in zip(keys, packed_vectors):
+            self.memory_cache.set(key, packed)
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in zip(keys, packed_data):
+                    pipe.set(key, data, ex=self.settings.query_embedding_cache_exp)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Query embedding cache unavailable: {exc}")
+
+        return packed_vectors
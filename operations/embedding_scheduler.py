@@ -0,0 +1,160 @@
+"""Rate limited document embedding scheduling module."""
+
+import asyncio
+import random
+import time
+
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from langchain_openai import OpenAIEmbeddings
+from loguru import logger
+from openai import RateLimitError
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from metrics import Counters
+from operations.cache_keys import embedding_rate_key
+from operations.chunker import estimate_tokens
+from settings import Settings
+
+RATE_WINDOW_SECONDS = 60
+# Takes a request and its tokens from the window budget when both fit, a
+# request is always let through an unused window so oversized ones still run.
+ACQUIRE_BUDGET_SCRIPT = """
+local used = redis.call("hmget", KEYS[1], "requests", "tokens")
+local requests = tonumber(used[1] or "0")
+local tokens = tonumber(used[2] or "0")
+local cost = tonumber(ARGV[1])
+if requests > 0 and (
+    requests >= tonumber(ARGV[2]) or tokens + cost > tonumber(ARGV[3])
+) then
+    return 0
+end
+redis.call("hincrby", KEYS[1], "requests", 1)
+redis.call("hincrby", KEYS[1], "tokens", cost)
+redis.call("expire", KEYS[1], ARGV[4])
+return 1
+"""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff delay with full jitter.
+
+    :param attempt: retry number, starting at 0
+    :param base: delay cap of the first retry
+    :param cap: maximum delay
+    :return: seconds to wait
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class EmbeddingScheduler:
+    """
+    Pace document embedding requests under the OpenAI rate limits.
+
+    Requests and estimated tokens are counted per minute in Redis, shared
+    by every worker. A request waits for the next minute once it would take
+    the minute over `openai_embedding_rpm` requests or `openai_embedding_tpm`
+    tokens. Requests throttled by OpenAI anyway are retried after a jittered
+    exponential backoff, honouring the Retry-After header. Without Redis
+    requests are sent unpaced and only the backoff applies.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: aioredis.Redis,
+        embedding_client: OpenAIEmbeddings,
+        stats: Counters,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: asyncio Redis client
+        :param embedding_client: OpenAI embedding client
+        :param stats: process wide scheduler counters
+        """
+        self.settings = settings
+        self.redis_client = redis_client
+        self.embedding_client = embedding_client
+        self.stats = stats
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed texts once the rate budget allows, retrying throttled requests.
+
+        :param texts: document texts
+        :return: embedding per text
+        """
+        tokens = sum(estimate_tokens(text) for text in texts)
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            try:
+                return await self.embedding_client.aembed_documents(texts)
+            except RateLimitError as exc:
+                if attempt >= self.settings.embedding_rate_max_retries:
+                    self.stats.increment("failures")
+                    raise
+                delay = max(
+                    self._retry_after(exc),
+                    backoff_delay(
+                        attempt,
+                        self.settings.embedding_rate_backoff_base,
+                        self.settings.embedding_rate_backoff_max,
+                    ),
+                )
+                self.stats.increment("throttled")
+                logger.warning(
+                    f"Embedding request of {len(texts)} texts throttled, "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _acquire(self, tokens: int):
+        """
+        Wait until a request of `tokens` fits the budget of the current minute.
+
+        :param tokens: estimated request tokens
+        :return: None
+        """
+        while True:
+            now = time.time()
+            window = int(now // RATE_WINDOW_SECONDS)
+            try:
+                acquired = await self.redis_client.eval(  # type: ignore[misc]
+                    ACQUIRE_BUDGET_SCRIPT,
+                    1,
+                    embedding_rate_key(self.settings.openai_embeddings_model, window),
+                    str(tokens),
+                    str(self.settings.openai_embedding_rpm),
+                    str(self.settings.openai_embedding_tpm),
+                    str(2 * RATE_WINDOW_SECONDS),
+                )
+            except RedisError as exc:
+                logger.warning(f"Embedding rate budget unavailable: {exc}")
+                return
+            if acquired:
+                self.stats.increment("requests")
+                self.stats.increment("tokens", tokens)
+                return
+
+            # Spread the waiting workers over the start of the next window.
+            delay = (window + 1) * RATE_WINDOW_SECONDS - now + random.uniform(0, 1)
+            self.stats.increment("paced")
+            logger.debug(f"Embedding rate budget spent, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_after(exc: RateLimitError) -> float:
+        """
+        Seconds OpenAI asks to wait before retrying.
+
+        :param exc: rate limit error
+        :return: Retry-After seconds, 0 when absent
+        """
+        try:
+            return float(exc.response.headers.get("retry-after", 0))
+        except (AttributeError, ValueError):
+            return 0.0
@@ -0,0 +1,223 @@
+"""Content addressed document embedding store module."""
+
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from operations.cache_keys import document_embedding_key
+from operations.embedding_cache import pack_vector, unpack_vector
+
+
+class EmbeddingStore(ABC):
+    """
+    Document embeddings addressed by model, dimensions and text content.
+
+    Paragraphs repeated across files and revisions are embedded once, a
+    batch of texts is looked up in one round-trip. Lookups fail open: an
+    unavailable store reports misses and drops writes.
+    """
+
+    def __init__(self, model: str, dimensions: int | None):
+        """
+        Initialize the store.
+
+        :param model: embeddings model name
+        :param dimensions: embeddings dimensions, None for the model default
+        """
+        self.model = model
+        self.dimensions = dimensions
+
+    def key(self, text: str) -> str:
+        """
+        Store key of a paragraph text.
+
+        :param text: paragraph text
+        :return: store key
+        """
+        return document_embedding_key(self.model, self.dimensions, text)
+
+    @abstractmethod
+    async def _get_many(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Read packed embeddings.
+
+        :param keys: store keys
+        :return: packed embedding or None per key
+        """
+
+    @abstractmethod
+    async def _set_many(self, items: dict[str, bytes]):
+        """
+        Write packed embeddings.
+
+        :param items: packed embeddings by store key
+        :return: None
+        """
+
+    async def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """
+        Get the stored embeddings of many texts.
+
+        :param texts: paragraph texts
+        :return: embedding or None per text
+        """
+        values = await self._get_many([self.key(text) for text in texts])
+        return [unpack_vector(data) if data is not None else None for data in values]
+
+    async def set_many(self, texts: list[str], vectors: list):
+        """
+        Store the embeddings of many texts.
+
+        :param texts: paragraph texts
+        :param vectors: embedding values per text
+        :return: None
+        """
+        await self._set_many(
+            {
+                self.key(text): pack_vector(vector)
+                for text, vector in zip(texts, vectors)
+            }
+        )
+
+
+class RedisEmbeddingStore(EmbeddingStore):
+    """Embedding store in Redis, shared by every worker."""
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        model: str,
+        dimensions: int | None,
+        expiry: int,
+    ):
+        """
+        Inject class dependencies.
+
+        :param redis_client: asyncio Redis client
+        :param model: embeddings model name
+        :param dimensions: embeddings dimensions, None for the model default
+        :param expiry: seconds an embedding is kept
+        """
+        super().__init__(model, dimensions)
+        self.redis_client = redis_client
+        self.expiry = expiry
+
+    async def _get_many(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Read packed embeddings with one MGET.
+
+        :param keys: store keys
+        :return: packed embedding or None per key
+        """
+        try:
+            return await self.redis_client.mget(keys)
+        except RedisError as exc:
+            logger.warning(f"Document embedding store unavailable: {exc}")
+            return [None] * len(keys)
+
+    async def _set_many(self, items: dict[str, bytes]):
+        """
+        Write packed embeddings with one pipeline.
+
+        :param items: packed embeddings by store key
+        :return: None
+        """
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in items.items():
+                    pipe.set(key, data, ex=self.expiry)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Document embedding store unavailable: {exc}")
+
+
+class SQLiteEmbeddingStore(EmbeddingStore):
+    """
+    Embedding store in a SQLite file on local disk.
+
+    Suited to a single host, worker processes share the file in WAL mode.
+    """
+
+    def __init__(self, path: str, model: str, dimensions: int | None):
+        """
+        Open the store, creating the file and table when missing.
+
+        :param path: SQLite database file path
+        :param model: embeddings model name
+        :param dimensions: embeddings dimensions, None for the model default
+        """
+        super().__init__(model, dimensions)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embedding (key TEXT PRIMARY KEY, value BLOB)"
+        )
+        self._connection.commit()
+
+    def _read(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Read packed embeddings, blocking.
+
+        :param keys: store keys
+        :return: packed embedding or None per key
+        """
+        found: dict[str, bytes] = {}
+        with self._lock:
+            # Stay under SQLite's limit of bound parameters per statement.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(
+                    self._connection.execute(
+                        f"SELECT key, value FROM embedding WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                )
+        return [found.get(key) for key in keys]
+
+    def _write(self, items: dict[str, bytes]):
+        """
+        Write packed embeddings in one transaction, blocking.
+
+        :param items: packed embeddings by store key
+        :return: None
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embedding (key, value) VALUES (?, ?)",
+                items.items(),
+            )
+
+    async def _get_many(self, keys: list[str]) -> list[bytes | None]:
+        """
+        Read packed embeddings.
+
+        :param keys: store keys
+        :return: packed embedding or None per key
+        """
+        try:
+            return await asyncio.to_thread(self._read, keys)
+        except sqlite3.Error as exc:
+            logger.warning(f"Document embedding store unavailable: {exc}")
+            return [None] * len(keys)
+
+    async def _set_many(self, items: dict[str, bytes]):
+        """
+        Write packed embeddings.
+
+        :param items: packed embeddings by store key
+        :return: None
+        """
+        try:
+            await asyncio.to_thread(self._write, items)
+        except sqlite3.Error as exc:
+            logger.warning(f"Document embedding store unavailable: {exc}")
@@ -0,0 +1,226 @@
+"""Streaming paragraph ingestion pipeline module."""
+
+import asyncio
+import time
+from typing import Callable, Iterable, Iterator
+
+from langchain_openai import OpenAIEmbeddings
+from loguru import logger
+
+from metrics import Counters
+from operations.chunker import estimate_tokens
+from operations.embedding_batcher import EmbeddingBatcher
+from operations.embedding_store import EmbeddingStore
+from operations.upsert_batcher import UpsertBatcher
+
+# Marks the end of a stage's output.
+_DONE = None
+
+# Vector id and text of a paragraph.
+Paragraph = tuple[str, str]
+FormatPayload = Callable[[list[Paragraph], list[list[float]]], list[dict]]
+
+
+def pack_requests(
+    paragraphs: Iterable[Paragraph], max_items: int, max_tokens: int | None = None
+) -> Iterator[list[Paragraph]]:
+    """
+    Lazily pack paragraphs into embedding requests.
+
+    A request is closed once it holds `max_items` paragraphs or the next
+    paragraph would take its estimated tokens over `max_tokens`, a paragraph
+    over the budget on its own is sent alone.
+
+    :param paragraphs: vector ids and texts of paragraphs, may be a generator
+    :param max_items: maximum paragraphs per request
+    :param max_tokens: maximum estimated tokens per request, None for no limit
+    :return: iterator of paragraph batches
+    """
+    batch: list[Paragraph] = []
+    tokens = 0
+    for paragraph in paragraphs:
+        cost = estimate_tokens(paragraph[1]) if max_tokens is not None else 0
+        if batch and (
+            len(batch) == max_items
+            or (max_tokens is not None and tokens + cost > max_tokens)
+        ):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(paragraph)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+class IngestPipeline:
+    """
+    Embed and upsert paragraphs in batches streamed through bounded queues.
+
+    Paragraph batches flow from the producer to the embedding stage, which
+    formats the embedded batch into vector records, and on to the upsert
+    stage, which packs the records into upsert batches. Stages run
+    concurrently so the next batch is embedded while the previous ones are
+    upserted, and bounded queues hold producers back once a slower stage
+    falls behind, keeping at most `queue_size` batches waiting between two
+    stages.
+
+    Embedding requests are packed by paragraph count and, with
+    `request_max_tokens`, by estimated tokens so long chunks do not push a
+    request over the provider's limit.
+
+    With an embedding store, paragraphs embedded before are read from it and
+    only unknown texts are sent to the embedding client.
+    """
+
+    def __init__(
+        self,
+        embedding_client: OpenAIEmbeddings | EmbeddingBatcher,
+        batcher: UpsertBatcher,
+        batch_size: int,
+        queue_size: int,
+        embedding_store: EmbeddingStore | None = None,
+        request_max_tokens: int | None = None,
+    ):
+        """
+        Inject class dependencies.
+
+        :param embedding_client: OpenAI embedding client
+        :param batcher: upsert batcher of the vector store
+        :param batch_size: paragraphs embedded per request
+        :param queue_size: batches waiting between two stages
+        :param embedding_store: content addressed store of known embeddings
+        :param request_max_tokens: estimated tokens embedded per request
+        """
+        self.embedding_client = embedding_client
+        self.batcher = batcher
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.embedding_store = embedding_store
+        self.request_max_tokens = request_max_tokens
+        self.stats = Counters(
+            "batches", "paragraphs", "embedding_store_hits", "embedding_store_misses"
+        )
+        self.embed_seconds = 0.0
+
+    async def _produce(self, paragraphs: Iterable[Paragraph], output: asyncio.Queue):
+        """
+        Feed paragraph batches to the embedding stage.
+
+        :param paragraphs: vector ids and texts of paragraphs
+        :param output: embedding stage queue
+        :return: None
+        """
+        for batch in pack_requests(
+            paragraphs, self.batch_size, self.request_max_tokens
+        ):
+            await output.put(batch)
+        await output.put(_DONE)
+
+    async def _embed(
+        self,
+        format_payload: FormatPayload,
+        source: asyncio.Queue,
+        output: asyncio.Queue,
+    ):
+        """
+        Embed paragraph batches and format them into vector records.
+
+        :param format_payload: callable building vector records from paragraphs and embeddings
+        :param source: embedding stage queue
+        :param output: upsert stage queue
+        :return: None
+        """
+        while (batch := await source.get()) is not _DONE:
+            start = time.perf_counter()
+            embeddings = await self._embed_texts([text for _, text in batch])
+            self.embed_seconds += time.perf_counter() - start
+            self.stats.increment("batches")
+            self.stats.increment("paragraphs", len(batch))
+            await output.put(format_payload(batch, embeddings))
+        await output.put(_DONE)
+
+    async def _embed_texts(self, texts: list[str]) -> list:
+        """
+        Embed texts, reusing stored embeddings and storing new ones.
+
+        :param texts: paragraph texts
+        :return: embedding per text
+        """
+        if self.embedding_store is None:
+            return await self.embedding_client.aembed_documents(texts)
+
+        embeddings = [
+            stored.tolist() if stored is not None else None
+            for stored in await self.embedding_store.get_many(texts)
+        ]
+        missing = list(
+            dict.fromkeys(
+                text for text, embedding in zip(texts, embeddings) if embedding is None
+            )
+        )
+        self.stats.increment("embedding_store_hits", len(texts) - len(missing))
+        self.stats.increment("embedding_store_misses", len(missing))
+        if not missing:
+            return embeddings
+
+        vectors = await self.embedding_client.aembed_documents(missing)
+        await self.embedding_store.set_many(missing, vectors)
+        embedded = dict(zip(missing, vectors))
+        return [
+            embedded[text] if embedding is None else embedding
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+    async def _upsert(self, source: asyncio.Queue):
+        """
+        Upsert vector records through the batcher.
+
+        :param source: upsert stage queue
+        :return: None
+        """
+        try:
+            while (records := await source.get()) is not _DONE:
+                await self.batcher.add(records)
+            await self.batcher.flush()
+        finally:
+            self.batcher.cancel()
+
+    async def run(
+        self,
+        paragraphs: Iterable[Paragraph],
+        format_payload: FormatPayload,
+    ) -> dict:
+        """
+        Embed and upsert paragraphs, stopping every stage when one fails.
+
+        Batches upserted before a failure stay in the vector store.
+
+        :param paragraphs: vector ids and texts of paragraphs, may be a generator
+        :param format_payload: callable building vector records from paragraphs and embeddings
+        :return: pipeline statistics
+        """
+        start = time.perf_counter()
+        to_embed: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_upsert: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [
+            asyncio.create_task(self._produce(paragraphs, to_embed)),
+            asyncio.create_task(self._embed(format_payload, to_embed, to_upsert)),
+            asyncio.create_task(self._upsert(to_upsert)),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            upserted = self.batcher.stats.snapshot()["vectors"]
+            logger.warning(f"Ingestion stopped after {upserted} vectors")
+            raise
+
+        return {
+            **self.stats.snapshot(),
+            "embed_seconds": self.embed_seconds,
+            "elapsed_seconds": time.perf_counter() - start,
+            "upsert": self.batcher.snapshot(),
+        }
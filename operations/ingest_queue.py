@@ -0,0 +1,354 @@
+"""Redis Streams ingestion job queue module."""
+
+import json
+import uuid
+from typing import NamedTuple
+
+import redis  # type: ignore[import-untyped]
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from fastapi import HTTPException
+from loguru import logger
+from redis.exceptions import (  # type: ignore[import-untyped]
+    RedisError,
+    ResponseError,
+    WatchError,
+)
+
+from operations.cache_keys import ingest_idempotency_key, ingest_job_key
+from operations.job_status import JobStatusStore, new_job_status
+from settings import Settings
+
+INGEST_STREAM = "ingest:jobs"
+DEAD_LETTER_STREAM = "ingest:jobs:dead"
+CONSUMER_GROUP = "ingest-workers"
+
+
+class Delivery(NamedTuple):
+    """Job delivered to a consumer, pending until acknowledged."""
+
+    message_id: str
+    job: dict
+
+
+def _decode(value: bytes | str) -> str:
+    """
+    Decode a Redis reply value.
+
+    :param value: reply value
+    :return: string value
+    """
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _delivery(message_id: bytes | str, fields: dict) -> Delivery:
+    """
+    Parse a stream entry into a delivery.
+
+    :param message_id: stream entry id
+    :param fields: stream entry fields
+    :return: delivery
+    """
+    payload = fields.get(b"job", fields.get("job"))
+    return Delivery(_decode(message_id), json.loads(_decode(payload)))
+
+
+class QueuedJob(NamedTuple):
+    """Job id answered to an ingestion request."""
+
+    job_id: str
+    duplicate: bool
+
+
+class IngestQueue:
+    """
+    Producer side of the ingestion job queue.
+
+    Requests are deduplicated per user on an idempotency key, the client
+    `Idempotency-Key` header or else the file id and content version of its
+    OCR results. A request whose key maps to a queued, running or done job
+    attaches to that job for `ingest_idempotency_exp` seconds, a failed or
+    expired job is replaced by a new one.
+    """
+
+    def __init__(self, settings: Settings, redis_client: redis.Redis):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: Redis client
+        """
+        self.redis_client = redis_client
+        self.status_expiry = settings.ingest_job_status_exp
+        self.idempotency_expiry = settings.ingest_idempotency_exp
+
+    def enqueue(
+        self,
+        file_id: str,
+        user_id: str,
+        content_version: str,
+        idempotency_key: str | None = None,
+    ) -> QueuedJob:
+        """
+        Add an ingestion job of a file, or get the job of an identical request.
+
+        The idempotency key is watched, so the key, the `queued` status and
+        the stream entry of a new job are written together only when no
+        concurrent request claimed the key first.
+
+        :param file_id: file id whose OCR results are ingested
+        :param user_id: id of the user queueing the job
+        :param content_version: digest of the OCR results texts
+        :param idempotency_key: client idempotency key
+        :return: queued job id, and whether it was queued by an earlier request
+        """
+        key = ingest_idempotency_key(
+            user_id, idempotency_key or f"{file_id}:{content_version}"
+        )
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "file_id": file_id, "attempt": 1}
+        status = new_job_status(job_id, file_id, user_id, content_version)
+        try:
+            with self.redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        pipe.watch(key)
+                        existing = self._existing_job(
+                            pipe, key, file_id, content_version
+                        )
+                        if existing is not None:
+                            logger.info(
+                                f"Ingestion of file {file_id} attached to job {existing}"
+                            )
+                            return QueuedJob(existing, True)
+                        pipe.multi()
+                        pipe.set(key, job_id, ex=self.idempotency_expiry)
+                        pipe.set(
+                            ingest_job_key(job_id),
+                            json.dumps(status),
+                            ex=self.status_expiry,
+                        )
+                        pipe.xadd(INGEST_STREAM, {"job": json.dumps(job)})
+                        pipe.execute()
+                        break
+                    except WatchError:
+                        # Claimed by a concurrent request, attach to its job.
+                        continue
+        except RedisError as exc:
+            logger.error(f"Ingestion queue unavailable: {exc}")
+            raise HTTPException(
+                status_code=503, detail="Ingestion queue unavailable, try again later"
+            ) from exc
+        logger.info(f"Queued ingestion job {job_id} of file {file_id}")
+        return QueuedJob(job_id, False)
+
+    @staticmethod
+    def _existing_job(pipe, key: str, file_id: str, content_version: str) -> str | None:
+        """
+        Get the job an idempotency key maps to, when it can be attached to.
+
+        :param pipe: pipeline watching the idempotency key
+        :param key: idempotency key
+        :param file_id: file id of the request
+        :param content_version: content version of the request
+        :return: job id, None when missing, expired or failed
+        """
+        job_id = pipe.get(key)
+        if job_id is None:
+            return None
+        job_id = _decode(job_id)
+        data = pipe.get(ingest_job_key(job_id))
+        if data is None:
+            return None
+        status = json.loads(data)
+        if (status["file_id"], status.get("content_version")) != (
+            file_id,
+            content_version,
+        ):
+            raise HTTPException(
+                status_code=409,
+                detail="Idempotency-Key already used for another file",
+            )
+        return None if status["state"] == "failed" else job_id
+
+
+class IngestConsumer:
+    """
+    Consumer side of the ingestion job queue.
+
+    Jobs are read through a Redis Streams consumer group and stay pending
+    until acknowledged, so a job is delivered at least once. A job left
+    pending longer than `ingest_visibility_timeout` seconds, because its
+    worker died, is claimed by the next worker asking for jobs. Running
+    jobs are kept visible by `extend`. A failed job is queued again up to
+    `ingest_max_attempts` deliveries, then moved to the dead letter stream
+    and its status marked `failed`.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: aioredis.Redis,
+        name: str,
+        status_store: JobStatusStore,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: asyncio Redis client
+        :param name: consumer name, unique per worker process
+        :param status_store: ingestion job status store
+        """
+        self.settings = settings
+        self.redis_client = redis_client
+        self.name = name
+        self.status_store = status_store
+        self.visibility_ms = int(settings.ingest_visibility_timeout * 1000)
+
+    async def ensure_group(self):
+        """
+        Create the stream and its consumer group when missing.
+
+        :return: None
+        """
+        try:
+            await self.redis_client.xgroup_create(
+                INGEST_STREAM, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def receive(self, count: int) -> list[Delivery]:
+        """
+        Get up to `count` jobs, reclaiming expired ones before reading new ones.
+
+        :param count: maximum number of jobs
+        :return: delivered jobs
+        """
+        claimed = await self.redis_client.xautoclaim(
+            INGEST_STREAM,
+            CONSUMER_GROUP,
+            self.name,
+            min_idle_time=self.visibility_ms,
+            start_id="0-0",
+            count=count,
+        )
+        reclaimed = [_delivery(*entry) for entry in claimed[1] if entry[1]]
+        if reclaimed:
+            return await self._drop_exhausted(reclaimed)
+
+        streams = await self.redis_client.xreadgroup(
+            CONSUMER_GROUP,
+            self.name,
+            {INGEST_STREAM: ">"},
+            count=count,
+            block=self.settings.ingest_poll_block_ms,
+        )
+        return [
+            _delivery(message_id, fields)
+            for _, entries in streams or []
+            for message_id, fields in entries
+        ]
+
+    async def _drop_exhausted(self, deliveries: list[Delivery]) -> list[Delivery]:
+        """
+        Dead letter reclaimed jobs delivered too many times.
+
+        Jobs whose worker died never reach `retry`, their delivery count
+        stops jobs crashing every worker from circulating forever.
+
+        :param deliveries: reclaimed jobs
+        :return: jobs still to run
+        """
+        kept = []
+        for delivery in deliveries:
+            pending = await self.redis_client.xpending_range(
+                INGEST_STREAM,
+                CONSUMER_GROUP,
+                min=delivery.message_id,
+                max=delivery.message_id,
+                count=1,
+            )
+            delivered = pending[0]["times_delivered"] if pending else 1
+            if delivered > self.settings.ingest_max_attempts:
+                await self._dead_letter(delivery, "visibility timeout expired")
+            else:
+                logger.warning(f"Reclaimed ingestion job {delivery.job['job_id']}")
+                kept.append(delivery)
+        return kept
+
+    async def extend(self, message_id: str):
+        """
+        Reset the idle time of a running job so it is not reclaimed.
+
+        :param message_id: stream entry id
+        :return: None
+        """
+        await self.redis_client.xclaim(
+            INGEST_STREAM,
+            CONSUMER_GROUP,
+            self.name,
+            min_idle_time=0,
+            message_ids=[message_id],
+            justid=True,
+        )
+
+    async def ack(self, message_id: str):
+        """
+        Acknowledge a finished job and drop it from the stream.
+
+        :param message_id: stream entry id
+        :return: None
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(INGEST_STREAM, CONSUMER_GROUP, message_id)
+            pipe.xdel(INGEST_STREAM, message_id)
+            await pipe.execute()
+
+    async def retry(self, delivery: Delivery, error: str):
+        """
+        Queue a failed job again, or dead letter it after its last attempt.
+
+        :param delivery: failed job
+        :param error: failure description
+        :return: None
+        """
+        if delivery.job["attempt"] >= self.settings.ingest_max_attempts:
+            await self._dead_letter(delivery, error)
+            return
+
+        job = {**delivery.job, "attempt": delivery.job["attempt"] + 1}
+        # Written before the job is queued again, another worker may pick it
+        # up and mark it running as soon as it is added to the stream.
+        await self.status_store.update(
+            job["job_id"], state="queued", attempt=job["attempt"], error=error
+        )
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xadd(INGEST_STREAM, {"job": json.dumps(job)})
+            pipe.xack(INGEST_STREAM, CONSUMER_GROUP, delivery.message_id)
+            pipe.xdel(INGEST_STREAM, delivery.message_id)
+            await pipe.execute()
+        logger.warning(
+            f"Ingestion job {job['job_id']} failed, queued attempt {job['attempt']}"
+        )
+
+    async def _dead_letter(self, delivery: Delivery, error: str):
+        """
+        Move a job to the dead letter stream.
+
+        :param delivery: abandoned job
+        :param error: failure description
+        :return: None
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                DEAD_LETTER_STREAM, {"job": json.dumps(delivery.job), "error": error}
+            )
+            pipe.xack(INGEST_STREAM, CONSUMER_GROUP, delivery.message_id)
+            pipe.xdel(INGEST_STREAM, delivery.message_id)
+            await pipe.execute()
+        await self.status_store.update(
+            delivery.job["job_id"], state="failed", error=error
+        )
+        logger.error(f"Ingestion job {delivery.job['job_id']} abandoned: {error}")
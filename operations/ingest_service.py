@@ -0,0 +1,274 @@
+"""Ingestion service module."""
+
+import time
+from contextlib import contextmanager
+
+from langchain_openai import OpenAIEmbeddings
+from loguru import logger
+
+from operations.chunker import chunk_paragraphs
+from operations.embedding_batcher import EmbeddingBatcher
+from operations.embedding_store import EmbeddingStore
+from operations.ingest_pipeline import IngestPipeline
+from operations.ocr_service import OCRService
+from operations.search_cache import SearchResultCache
+from operations.upsert_batcher import UpsertBatcher
+from settings import Settings
+from vector_stores import VectorStore
+from vector_stores.ids import paragraph_ids
+
+
+class IngestProgress:
+    """
+    Counts and stage timings of an ingestion, readable while it runs.
+
+    Embedding and upsert overlap in the ingestion pipeline, their timings
+    are the seconds spent in embedding requests and in upsert batches.
+    """
+
+    def __init__(self):
+        """Initialize counts and timings."""
+        self.stage = None
+        self.stages = {}
+        self.counts = {}
+        self.pipeline = None
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Time a stage.
+
+        :param stage: stage name
+        :yield: None
+        """
+        self.stage = stage
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage] = time.perf_counter() - start
+
+    def snapshot(self) -> dict:
+        """
+        Get a point in time copy of the progress.
+
+        :return: progress dictionary
+        """
+        counts = dict(self.counts)
+        stages = dict(self.stages)
+        if self.pipeline is not None:
+            counts["embedded"] = self.pipeline.stats.snapshot()["paragraphs"]
+            counts["upserted"] = self.pipeline.batcher.stats.snapshot()["vectors"]
+            stages["embedding"] = self.pipeline.embed_seconds
+            stages["upsert"] = sum(self.pipeline.batcher.batch_seconds)
+        return {"stage": self.stage, "stages": stages, **counts}
+
+
+class IngestService:
+    """Embed the OCR results of a file into the vector store."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        vector_store: VectorStore,
+        embedding_client: OpenAIEmbeddings | EmbeddingBatcher,
+        embedding_store: EmbeddingStore | None = None,
+        progress: IngestProgress | None = None,
+        search_cache: SearchResultCache | None = None,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param vector_store: vector store dependency
+        :param embedding_client: OpenAI embedding dependency
+        :param embedding_store: document embedding store dependency
+        :param progress: progress updated by the ingestion
+        :param search_cache: search result cache whose results of the file are invalidated
+        """
+        self.settings = settings
+        self.vector_store = vector_store
+        self.embedding_client = embedding_client
+        self.embedding_store = embedding_store
+        self.progress = progress or IngestProgress()
+        self.search_cache = search_cache
+
+    @staticmethod
+    def format_pinecone_payload(
+        paragraphs, embeddings, filename, spans=None
+    ) -> list[dict]:
+        """
+        Formats th tests with its embeddings and metadata.
+
+        :param paragraphs: vector ids and texts of paragraphs type list[tuple[str, str]]
+        :param embeddings: list of embeddings
+        :param filename: filename as file_id
+        :param spans: OCR paragraph range of each vector id type dict[str, tuple[int, int]]
+        :return: list of objects ready for pinecone upsert
+        """
+        index_payload = []
+        for (vector_id, txt), embedding in zip(paragraphs, embeddings):
+            metadata = {"text": txt, "file_id": filename}
+            if spans and vector_id in spans:
+                metadata["paragraph_start"], metadata["paragraph_end"] = spans[
+                    vector_id
+                ]
+            index_payload.append(
+                {"id": vector_id, "values": embedding, "metadata": metadata}
+            )
+
+        return index_payload
+
+    async def ingest(self, file_id: str):
+        """
+        Embed the OCR results of a queued file.
+
+        :param file_id: file id whose OCR results are ingested
+        :return: None
+        """
+        with self.progress.measure("ocr_load"):
+            ocr_result = OCRService.process_ocr(file_id)
+            extracted_texts = OCRService.get_ocr_texts_results(ocr_result or {})
+
+        if not extracted_texts:
+            logger.error(f"No texts extracted from file {file_id}")
+            return
+
+        await self.embed_save_job(extracted_texts, file_id)
+
+    async def _moved_records(
+        self, vector_ids: list[str], spans: dict[str, tuple[int, int]], filename: str
+    ) -> list[dict]:
+        """
+        Get the stored vectors whose paragraph range differs from the new one.
+
+        :param vector_ids: ids of vectors already stored
+        :param spans: OCR paragraph range of each vector id
+        :param filename: filename as file_id
+        :return: vector records carrying their new paragraph range
+        """
+        if not vector_ids:
+            return []
+
+        moved = []
+        for record in await self.vector_store.fetch(vector_ids, filename):
+            start, end = spans[record["id"]]
+            metadata = record["metadata"]
+            if (metadata.get("paragraph_start"), metadata.get("paragraph_end")) != (
+                start,
+                end,
+            ):
+                metadata = {**metadata, "paragraph_start": start, "paragraph_end": end}
+                moved.append({**record, "metadata": metadata})
+        return moved
+
+    async def embed_save_job(self, extracted_texts: list[str], filename: str):
+        """
+        Embeds the extracted texts and save it to the vector store asynchronously.
+
+        Paragraphs are first regrouped into chunks within a token budget,
+        small paragraphs merged with their neighbours and large ones split on
+        sentence boundaries, each vector recording the range of OCR
+        paragraphs it covers in its `paragraph_start` and `paragraph_end`
+        metadata.
+
+        Vector ids are derived from the chunk contents, so processing a
+        file again only embeds and upserts new or changed chunks and
+        deletes the vectors of chunks no longer in the file. Unchanged
+        chunks whose paragraph range moved are upserted again with their
+        stored values and the new range. Texts are embedded and upserted in
+        batches streamed through an ingestion pipeline, the next batch is
+        embedded while the previous ones are upserted in batches bounded by
+        count and size, stores rewriting a whole file on every write hold
+        them back and write the file once at the end. Embedding and upsert
+        errors are raised so the job is retried. Counts and stage timings are
+        kept in `progress`. Once done, cached search results of the file are
+        invalidated when any of its vectors changed.
+
+        :param extracted_texts: list of extracted texts type list[str]
+        :param filename: filename
+        :return: None
+        """
+        with self.progress.measure("chunking"):
+            chunks = chunk_paragraphs(
+                extracted_texts,
+                self.settings.chunk_min_tokens,
+                self.settings.chunk_max_tokens,
+            )
+            vector_ids = paragraph_ids(filename, [chunk.text for chunk in chunks])
+            spans = {
+                vector_id: (chunk.start, chunk.end)
+                for vector_id, chunk in zip(vector_ids, chunks)
+            }
+            stored = set(await self.vector_store.list_ids(filename))
+            changed = [
+                (vector_id, chunk.text)
+                for vector_id, chunk in zip(vector_ids, chunks)
+                if vector_id not in stored
+            ]
+            removed = sorted(stored.difference(vector_ids))
+            moved = await self._moved_records(
+                [vector_id for vector_id in vector_ids if vector_id in stored],
+                spans,
+                filename,
+            )
+        self.progress.counts.update(
+            paragraphs=len(extracted_texts),
+            chunks=len(chunks),
+            unchanged=len(chunks) - len(changed),
+            moved=len(moved),
+        )
+
+        upserts = self.vector_store.buffered()
+        batcher = UpsertBatcher(
+            upserts,
+            self.settings.upsert_batch_max_vectors,
+            self.settings.upsert_batch_max_bytes,
+            self.settings.upsert_max_in_flight,
+            self.settings.upsert_max_retries,
+        )
+        pipeline = IngestPipeline(
+            self.embedding_client,
+            batcher,
+            self.settings.embedding_chunk_size,
+            self.settings.ingest_queue_size,
+            self.embedding_store,
+            self.settings.embedding_request_max_tokens,
+        )
+        self.progress.pipeline = pipeline
+        self.progress.stage = "embedding"
+
+        logger.info(
+            f"Embedding and upserting {len(changed)} of {len(chunks)} "
+            f"chunks from {len(extracted_texts)} extracted texts..."
+        )
+        try:
+            stats = await pipeline.run(
+                changed,
+                lambda paragraphs, embeddings: IngestService.format_pinecone_payload(
+                    paragraphs, embeddings, filename, spans
+                ),
+            )
+
+            if moved:
+                await batcher.add(moved)
+                await batcher.flush()
+        finally:
+            # Batches upserted before a failure are written too.
+            with self.progress.measure("flush"):
+                await upserts.flush()
+
+        if removed:
+            # Deleted only once the new paragraphs are searchable.
+            with self.progress.measure("delete"):
+                await self.vector_store.delete(removed, filename)
+        self.progress.counts["deleted"] = len(removed)
+
+        if self.search_cache is not None and (changed or removed or moved):
+            await self.search_cache.invalidate_file(filename)
+
+        stats["chunks"] = len(chunks)
+        stats["unchanged"] = len(chunks) - len(changed)
+        stats["moved"] = len(moved)
+        stats["deleted"] = len(removed)
+        logger.info(f"Done processing job: {stats}")
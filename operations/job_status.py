@@ -0,0 +1,137 @@
+"""Ingestion job status module."""
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator
+
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from operations.cache_keys import ingest_job_key
+
+TERMINAL_STATES = ("done", "failed")
+
+
+def new_job_status(
+    job_id: str, file_id: str, user_id: str, content_version: str | None = None
+) -> dict:
+    """
+    Status of a job just queued.
+
+    :param job_id: ingestion job id
+    :param file_id: file id whose OCR results are ingested
+    :param user_id: id of the user who queued the job
+    :param content_version: digest of the ingested OCR results texts
+    :return: job status
+    """
+    now = time.time()
+    return {
+        "job_id": job_id,
+        "file_id": file_id,
+        "content_version": content_version,
+        "user_id": user_id,
+        "state": "queued",
+        "attempt": 1,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "progress": {},
+    }
+
+
+class JobStatusStore:
+    """
+    Ingestion job statuses in Redis, written by workers and read by the API.
+
+    A status moves from `queued` to `running` and ends `done` or `failed`,
+    a failed attempt queued again goes back to `queued` with its error.
+    Statuses expire `expiry` seconds after their last update. Writes fail
+    open so an unavailable store never fails a job.
+    """
+
+    def __init__(self, redis_client: aioredis.Redis, expiry: int, poll_interval: float):
+        """
+        Inject class dependencies.
+
+        :param redis_client: asyncio Redis client
+        :param expiry: seconds a status is kept after its last update
+        :param poll_interval: seconds between reads while waiting on a job
+        """
+        self.redis_client = redis_client
+        self.expiry = expiry
+        self.poll_interval = poll_interval
+
+    async def get(self, job_id: str) -> dict | None:
+        """
+        Get the status of a job.
+
+        :param job_id: ingestion job id
+        :return: job status, None when unknown or expired
+        """
+        data = await self.redis_client.get(ingest_job_key(job_id))
+        return json.loads(data) if data is not None else None
+
+    async def update(self, job_id: str, **fields):
+        """
+        Update fields of a job status.
+
+        The status is read, updated and written back without a lock, callers
+        must not update the same job concurrently.
+
+        :param job_id: ingestion job id
+        :param fields: status fields to set
+        :return: None
+        """
+        try:
+            status = await self.get(job_id)
+            if status is None:
+                logger.warning(f"Status of ingestion job {job_id} not found")
+                return
+            status.update(fields, updated_at=time.time())
+            await self.redis_client.set(
+                ingest_job_key(job_id), json.dumps(status), ex=self.expiry
+            )
+        except RedisError as exc:
+            logger.warning(f"Ingestion job status unavailable: {exc}")
+
+    async def wait(self, job_id: str, timeout: float) -> dict | None:
+        """
+        Wait up to `timeout` seconds for a job to finish.
+
+        :param job_id: ingestion job id
+        :param timeout: maximum seconds to wait
+        :return: latest job status, None when unknown or expired
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            status = await self.get(job_id)
+            if (
+                status is None
+                or status["state"] in TERMINAL_STATES
+                or time.monotonic() >= deadline
+            ):
+                return status
+            await asyncio.sleep(self.poll_interval)
+
+    async def watch(self, job_id: str, timeout: float) -> AsyncIterator[dict]:
+        """
+        Yield the status of a job each time it changes, until it finishes.
+
+        :param job_id: ingestion job id
+        :param timeout: maximum seconds to watch
+        :return: iterator of job statuses
+        """
+        deadline = time.monotonic() + timeout
+        last_update = None
+        while time.monotonic() < deadline:
+            status = await self.get(job_id)
+            if status is None:
+                return
+            if status["updated_at"] != last_update:
+                last_update = status["updated_at"]
+                yield status
+            if status["state"] in TERMINAL_STATES:
+                return
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,93 @@
+"""In-process memory cache module."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class MemoryCache:
+    """Bounded least recently used in-process cache with optional TTL."""
+
+    def __init__(
+        self, maxsize: int, ttl: float | None = None, max_bytes: int | None = None
+    ):
+        """
+        Initialize cache.
+
+        :param maxsize: maximum number of entries kept
+        :param ttl: seconds an entry stays valid, None to keep until evicted
+        :param max_bytes: maximum total size of the entries, None for no limit
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.size_bytes -= size
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+
+        :param key: cache key
+        :return: cached value or None when missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = 0, ttl: float | None = None):
+        """
+        Cache a value, evicting least recently used entries over capacity.
+
+        :param key: cache key
+        :param value: value to cache
+        :param size: size of the value in bytes, counted against max_bytes
+        :param ttl: seconds the entry stays valid, defaults to the cache TTL
+        :return: None
+        """
+        if self.maxsize <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+            self._entries[key] = (value, expires_at, size)
+            self.size_bytes += size
+
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self.size_bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: Hashable):
+        """
+        Remove a cached value.
+
+        :param key: cache key
+        :return: None
+        """
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
@@ -1,46 +1,30 @@
 """OCR Service module."""
 
-import asyncio
 import json
 import time
-import uuid
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
-from langchain_core.exceptions import LangChainException
-from langchain_openai import OpenAIEmbeddings
 from loguru import logger
-from pinecone import Pinecone
 
+from operations.cache_keys import text_digest
 from settings import Settings
 
 
 class OCRService:
     """OCR Service class."""
 
-    def __init__(
-        self,
-        settings: Settings,
-        url: str,
-        pinecone_index: Pinecone.Index,
-        embedding_client: OpenAIEmbeddings,
-        background_tasks: BackgroundTasks,
-    ):
+    def __init__(self, settings: Settings, url: str):
         """
         Inject class dependencies.
 
         :param settings: Application settings
         :param url: request payload URL to be processed
-        :param pinecone_index: Pinecone index dependency
-        :param embedding_client: OpenAI embedding dependency
         """
         self.url = url
         self.settings = settings
-        self.embedding_client = embedding_client
-        self.pinecone_index = pinecone_index
-        self.background_task = background_tasks
 
     @staticmethod
     def process_ocr(filename: str) -> dict:
@@ -81,33 +65,14 @@ class OCRService:
 
         return texts
 
-    @staticmethod
-    def format_pinecone_payload(extracted_texts, embeddings, filename) -> list[dict]:
-        """
-        Formats th tests with its embeddings and metadata.
-
-        :param extracted_texts: list of extracted texts type list[str]
-        :param embeddings: list of embeddings
-        :param filename: filename as file_id
-        :return: list of objects ready for pinecone upsert
+    def process_url(self) -> tuple[str, str]:
         """
-        index_payload = []
-        for txt, embedding in zip(extracted_texts, embeddings):
-            index_payload.append(
-                {
-                    "id": str(uuid.uuid4()),
-                    "values": embedding,
-                    "metadata": {"text": txt, "file_id": filename},
-                }
-            )
+        Validate a request payload URL and the OCR results of its file.
 
-        return index_payload
+        The texts are embedded by an ingestion worker once the file is queued.
 
-    def process_url(self):
-        """
-        OCR API that processes request payload URLs embeddings asynchronously.
-
-        :return: None
+        :return: file id the texts are embedded under, and content version
+            digest of the texts
         """
         filename = self.get_filename_from_url(self.url)
         ocr_result = self.process_ocr(filename)
@@ -124,47 +89,7 @@ class OCRService:
             logger.error("No texts extracted from file")
             raise HTTPException(status_code=400, detail="No texts extracted from file.")
 
-        self.background_task.add_task(self.embed_save_job, extracted_texts, filename)
-
-    async def embed_save_job(self, extracted_texts: list[str], filename: str):
-        """
-        Embeds the extracted texts and save it to a pinecone vector database asynchronously.
-
-        :param extracted_texts: list of extracted texts type list[str]
-        :param filename: filename
-        :return: None
-        """
-
-        try:
-            logger.info("Embedding extracted texts...")
-            embeddings = await self.embedding_client.aembed_documents(extracted_texts)
-        except LangChainException as exc:
-            logger.error("Exception while embedding extracted texts: %s", exc)
-            return
-
-        index_payload = OCRService.format_pinecone_payload(
-            extracted_texts, embeddings, filename
-        )
-
-        logger.info("Upserting to database")
-        async_results = []
-        for idx in range(0, len(index_payload), self.settings.embedding_chunk_size):
-            async_results.append(
-                self.pinecone_index.upsert(
-                    vectors=index_payload[
-                        idx : idx + self.settings.embedding_chunk_size - 1
-                    ],
-                    namespace=self.settings.embedding_namespace,
-                    async_req=True,
-                )
-            )
-
-        logger.info("Waiting for async task results...")
-        response = await asyncio.gather(
-            *(asyncio.to_thread(async_result.result) for async_result in async_results)
-        )
-        logger.info(response)
-        logger.info("Done processing job")
+        return filename, text_digest("\0".join(extracted_texts))
 
     def get_filename_from_url(self, signed_url: str) -> str:
         """
@@ -0,0 +1,329 @@
+"""Search result cache module."""
+
+import json
+import math
+import random
+import time
+from typing import NamedTuple
+
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from metrics import CacheStats
+from operations.cache_keys import search_file_index_key
+from operations.memory_cache import MemoryCache
+from settings import Settings
+
+
+class CachedResults(NamedTuple):
+    """Cached search results with the time and cost of computing them."""
+
+    results: list[dict]
+    computed_at: float
+    delta: float
+
+
+class SearchResultCache:
+    """
+    Two tier search result cache, in-process TTL-LRU in front of Redis.
+
+    Entries outlive `redis_cache_exp` by a stale grace window so they can be
+    served while one caller refreshes them, and hot entries are refreshed
+    early with probabilistic (XFetch) expiry. Empty results are cached too,
+    for the shorter `search_negative_cache_exp`, without a grace window and
+    in Redis only. Cache keys are indexed by the files searched so ingesting
+    a file invalidates its results, the memory tier of other processes keeps
+    serving them for up to its TTL.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: aioredis.Redis,
+        memory_cache: MemoryCache,
+        stats: CacheStats,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: asyncio Redis client
+        :param memory_cache: process wide in-memory cache of search results
+        :param stats: process wide cache statistics
+        """
+        self.settings = settings
+        self.redis_client = redis_client
+        self.memory_cache = memory_cache
+        self.stats = stats
+
+    @staticmethod
+    def _loads(data: bytes) -> CachedResults:
+        """
+        Deserialize a cache entry.
+
+        :param data: serialized cache entry
+        :return: cached search results
+        """
+        entry = json.loads(data)
+        return CachedResults(entry["results"], entry["computed_at"], entry["delta"])
+
+    @staticmethod
+    def _dumps(entry: CachedResults) -> str:
+        """
+        Serialize a cache entry.
+
+        :param entry: cached search results
+        :return: serialized cache entry
+        """
+        return json.dumps(entry._asdict())
+
+    def _ttl(self, results: list[dict]) -> int:
+        """
+        Seconds cached search results stay fresh.
+
+        :param results: search results
+        :return: fresh period in seconds
+        """
+        if not results:
+            return self.settings.search_negative_cache_exp
+        return self.settings.redis_cache_exp
+
+    def _redis_exp(self, results: list[dict]) -> int:
+        """
+        Redis expiry covering the fresh period and the stale grace window.
+
+        :param results: search results
+        :return: expiry in seconds
+        """
+        if not results:
+            return self._ttl(results)
+        return self._ttl(results) + self.settings.search_stale_grace
+
+    def _expired(self, entry: CachedResults) -> bool:
+        """
+        Whether an entry is past its stale grace window.
+
+        :param entry: cached search results
+        :return: True when the entry must not be served
+        """
+        age = time.time() - entry.computed_at
+        return age >= self._redis_exp(entry.results)
+
+    def should_refresh(self, entry: CachedResults) -> bool:
+        """
+        Whether a served entry should be recomputed in the background.
+
+        Stale entries are always refreshed, fresh entries are refreshed early
+        with a probability growing as expiry nears and with computation cost.
+
+        :param entry: cached search results
+        :return: True when the entry should be refreshed
+        """
+        expiry = entry.computed_at + self._ttl(entry.results)
+        # 1 - random() is in (0, 1], keeping the logarithm finite.
+        early = (
+            -entry.delta
+            * self.settings.search_xfetch_beta
+            * math.log(1.0 - random.random())
+        )
+        return time.time() + early >= expiry
+
+    async def get(self, key: str) -> CachedResults | None:
+        """
+        Get cached search results with at most one Redis round-trip.
+
+        :param key: search cache key
+        :return: cached search results or None on a miss
+        """
+        entry = self.memory_cache.get(key)
+        if entry is not None and not self._expired(entry):
+            self.stats.record_hit("memory")
+            return entry
+
+        try:
+            data = await self.redis_client.get(key)
+        except RedisError as exc:
+            logger.warning(f"Search result cache unavailable: {exc}")
+            data = None
+
+        entry = self._loads(data) if data is not None else None
+        if entry is None or self._expired(entry):
+            self.stats.record_miss()
+            return None
+
+        self._remember(key, entry, data)
+        self.stats.record_hit("redis")
+        return entry
+
+    async def peek(self, key: str) -> CachedResults | None:
+        """
+        Read cached search results from Redis without recording statistics.
+
+        The memory tier is skipped so results written by other workers are
+        seen, Redis errors are raised to the caller.
+
+        :param key: search cache key
+        :return: cached search results or None when missing or expired
+        """
+        data = await self.redis_client.get(key)
+        entry = self._loads(data) if data is not None else None
+        if entry is None or self._expired(entry):
+            return None
+        return entry
+
+    async def get_many(self, keys: list[str]) -> list[CachedResults | None]:
+        """
+        Get cached search results of many keys with at most one Redis MGET.
+
+        :param keys: search cache keys
+        :return: cached search results or None per key
+        """
+        entries = []
+        for key in keys:
+            entry = self.memory_cache.get(key)
+            if entry is not None and not self._expired(entry):
+                self.stats.record_hit("memory")
+                entries.append(entry)
+            else:
+                entries.append(None)
+
+        missing = [idx for idx, entry in enumerate(entries) if entry is None]
+        if not missing:
+            return entries
+
+        try:
+            values = await self.redis_client.mget([keys[idx] for idx in missing])
+        except RedisError as exc:
+            logger.warning(f"Search result cache unavailable: {exc}")
+            values = [None] * len(missing)
+
+        for idx, data in zip(missing, values):
+            entry = self._loads(data) if data is not None else None
+            if entry is None or self._expired(entry):
+                self.stats.record_miss()
+                continue
+
+            entries[idx] = entry
+            self._remember(keys[idx], entry, data)
+            self.stats.record_hit("redis")
+
+        return entries
+
+    def _remember(self, key: str, entry: CachedResults, data: bytes | str):
+        """
+        Keep a non-empty cache entry in the memory tier.
+
+        Empty results stay in Redis only, where `invalidate_file` reaches them.
+
+        :param key: search cache key
+        :param entry: cached search results
+        :param data: serialized cache entry
+        :return: None
+        """
+        if entry.results:
+            self.memory_cache.set(key, entry, size=len(data))
+
+    def _index_files(self, pipe, key: str, file_ids: list[str] | None):
+        """
+        Queue the indexing of a cache key under each file it searched.
+
+        An index lives as long as the longest lived entry it holds.
+
+        :param pipe: Redis pipeline
+        :param key: search cache key
+        :param file_ids: file ids searched
+        :return: None
+        """
+        for file_id in file_ids or ():
+            index_key = search_file_index_key(
+                self.settings.embedding_namespace, file_id
+            )
+            pipe.sadd(index_key, key)
+            pipe.expire(
+                index_key,
+                self.settings.redis_cache_exp + self.settings.search_stale_grace,
+            )
+
+    def _new_entry(
+        self, results: list[dict], delta: float
+    ) -> tuple[CachedResults, str]:
+        """
+        Build and serialize a cache entry computed now.
+
+        :param results: search results
+        :param delta: seconds spent computing the results
+        :return: cache entry and its serialized form
+        """
+        entry = CachedResults(results, time.time(), delta)
+        return entry, self._dumps(entry)
+
+    async def set(
+        self,
+        key: str,
+        results: list[dict],
+        delta: float = 0.0,
+        file_ids: list[str] | None = None,
+    ):
+        """
+        Cache search results with one Redis pipeline.
+
+        :param key: search cache key
+        :param results: search results
+        :param delta: seconds spent computing the results
+        :param file_ids: file ids searched, indexing the results for invalidation
+        :return: None
+        """
+        await self.set_many(
+            {key: results}, delta, {key: file_ids} if file_ids else None
+        )
+
+    async def set_many(
+        self,
+        entries: dict[str, list[dict]],
+        delta: float = 0.0,
+        file_ids: dict[str, list[str]] | None = None,
+    ):
+        """
+        Cache many search results with one Redis pipeline.
+
+        :param entries: search results by search cache key
+        :param delta: seconds spent computing each search result
+        :param file_ids: file ids searched by search cache key
+        :return: None
+        """
+        if not entries:
+            return
+
+        serialized = {}
+        for key, results in entries.items():
+            entry, data = self._new_entry(results, delta)
+            self._remember(key, entry, data)
+            serialized[key] = data
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in serialized.items():
+                    pipe.set(key, data, ex=self._redis_exp(entries[key]))
+                    self._index_files(pipe, key, (file_ids or {}).get(key))
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Search result cache unavailable: {exc}")
+
+    async def invalidate_file(self, file_id: str):
+        """
+        Delete the cached results of searches of a file.
+
+        Called once a file's vectors are written, so searches made before
+        are computed again instead of missing new paragraphs or citing
+        deleted ones.
+
+        :param file_id: file id
+        :return: None
+        """
+        index_key = search_file_index_key(self.settings.embedding_namespace, file_id)
+        try:
+            keys = await self.redis_client.smembers(index_key)  # type: ignore[misc]
+            await self.redis_client.delete(index_key, *keys)
+        except RedisError as exc:
+            logger.warning(f"Search result cache unavailable: {exc}")
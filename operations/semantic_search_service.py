@@ -1,15 +1,23 @@
 """Semantic search service."""
 
-import json
+import asyncio
 import logging
+import time
+from typing import Awaitable, Callable
 
-import redis  # type: ignore[import-untyped]
 from fastapi import HTTPException
 from langchain_core.exceptions import LangChainException
 from langchain_openai import OpenAIEmbeddings
-from pinecone import Pinecone
 
+from operations.cache_keys import normalize_query, search_cache_key
+from operations.embedding_cache import QueryEmbeddingCache
+from operations.search_cache import SearchResultCache
+from operations.single_flight import SingleFlight
 from settings import Settings
+from vector_stores import VectorMatch, VectorStore
+
+SEARCH_TOP_K = 5
+MIN_MATCH_SCORE = 0.8
 
 
 class SemanticSearchService:
@@ -18,67 +26,351 @@ class SemanticSearchService:
     def __init__(
         self,
         settings: Settings,
-        pinecone_index: Pinecone.Index,
+        vector_store: VectorStore,
         embedding_client: OpenAIEmbeddings,
-        redis_client: redis.Redis,
+        search_cache: SearchResultCache,
+        embedding_cache: QueryEmbeddingCache | None = None,
+        single_flight: SingleFlight | None = None,
     ):
         """
         Inject class dependencies.
 
         :param settings: Application settings
-        :param pinecone_index: Pinecone index dependency
+        :param vector_store: vector store dependency
         :param embedding_client: OpenAI embedding client dependency
-        :param redis_client: Redis client dependency
+        :param search_cache: search result cache dependency
+        :param embedding_cache: query embedding cache dependency
+        :param single_flight: request coalescing dependency
         """
         self.settings = settings
-        self.pinecone_index = pinecone_index
+        self.vector_store = vector_store
         self.embedding_client = embedding_client
-        self.redis_client = redis_client
+        self.search_cache = search_cache
+        self.embedding_cache = embedding_cache
+        self.single_flight = single_flight
 
-    def search(self, search_term: str, file_id: str) -> list[dict]:
+    async def aembed_query(self, search_term: str) -> list[float]:
         """
-        Perform semantic search on pinecone index based from search term and file id.
+        Embed a search term, reusing cached embeddings of the normalized text.
 
         :param search_term: request payload search query text
-        :param file_id: request payload file id
-        :return: matching paragraphs texts from pinecone vector search
+        :return: search term embedding
+        """
+        query = normalize_query(search_term)
+
+        if self.embedding_cache is not None:
+            cached = await self.embedding_cache.get(query)
+            if cached is not None:
+                return cached.tolist()
+
+        try:
+            embedding = await self.embedding_client.aembed_query(query)
+        except LangChainException as exc:
+            logging.error("Exception raised during embedding: %s", exc)
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+        if self.embedding_cache is not None:
+            await self.embedding_cache.set(query, embedding)
+
+        return list(embedding)
+
+    async def aembed_queries(self, search_terms: list[str]) -> dict[str, list[float]]:
         """
-        search_key = f"{search_term}_{file_id}"
+        Embed many search terms, embedding cache misses in a single request.
 
-        if self.redis_client.get(search_key) is not None:
-            response_data = self.redis_client.get(search_key)
-            return json.loads(response_data)  # type:ignore[arg-type]
+        :param search_terms: search query texts
+        :return: embeddings by normalized search term
+        """
+        queries = list(dict.fromkeys(normalize_query(term) for term in search_terms))
+        embeddings = {}
+
+        if self.embedding_cache is not None:
+            cached = await self.embedding_cache.get_many(queries)
+            embeddings = {
+                query: vector.tolist()
+                for query, vector in zip(queries, cached)
+                if vector is not None
+            }
+
+        missing = [query for query in queries if query not in embeddings]
+        if not missing:
+            return embeddings
 
         try:
-            term_embedding = self.embedding_client.embed_query(search_term)
+            vectors = await self.embedding_client.aembed_documents(missing)
         except LangChainException as exc:
             logging.error("Exception raised during embedding: %s", exc)
             raise HTTPException(status_code=503, detail=str(exc)) from exc
 
-        result = self.pinecone_index.query(
-            filter={"file_id": {"$eq": file_id}},
-            vector=term_embedding,
-            top_k=5,
-            include_values=False,
-            namespace=self.settings.embedding_namespace,
-            include_metadata=True,
+        if self.embedding_cache is not None:
+            await self.embedding_cache.set_many(missing, vectors)
+
+        embeddings.update(zip(missing, (list(vector) for vector in vectors)))
+        return embeddings
+
+    def search_key(self, search_term: str, file_id: str) -> str:
+        """
+        Search result cache key of the normalized search term.
+
+        :param search_term: search query text
+        :param file_id: file id
+        :return: search cache key
+        """
+        return search_cache_key(
+            self.settings.embedding_namespace,
+            self.settings.openai_embeddings_model,
+            self.settings.openai_embeddings_dimensions,
+            normalize_query(search_term),
+            file_id,
         )
 
+    @staticmethod
+    def _match_texts(matches: list[VectorMatch], with_file_id: bool) -> list[dict]:
+        """
+        Keep the texts of matches scored above the minimum score.
+
+        :param matches: vector store matches
+        :param with_file_id: include the file id each text belongs to
+        :return: matching paragraphs texts
+        """
         match_texts = []
 
-        for text in result.matches:
-            metadata = text.metadata
-            if text.score >= 0.8:
-                match_texts.append(
-                    {
-                        "score": text.score,
-                        "text": metadata.get("text"),
-                    }
+        for match in matches:
+            if match.score >= MIN_MATCH_SCORE:
+                match_text = {"score": match.score, "text": match.metadata.get("text")}
+                if with_file_id:
+                    match_text["file_id"] = match.metadata.get("file_id")
+                match_texts.append(match_text)
+
+        return match_texts
+
+    async def aquery_index(
+        self, term_embedding: list[float], file_id: str
+    ) -> list[dict]:
+        """
+        Query the vector index for paragraphs of a file matching an embedding.
+
+        :param term_embedding: search term embedding
+        :param file_id: file id
+        :return: matching paragraphs texts from vector search
+        """
+        matches = await self.vector_store.query(
+            term_embedding, file_id, top_k=SEARCH_TOP_K
+        )
+        return self._match_texts(matches, with_file_id=False)
+
+    async def aquery_files(
+        self, term_embedding: list[float], file_ids: list[str]
+    ) -> list[dict]:
+        """
+        Query the vector index for paragraphs of many files matching an embedding.
+
+        :param term_embedding: search term embedding
+        :param file_ids: file ids
+        :return: matching paragraphs texts with their file ids, best first
+        """
+        matches = await self.vector_store.query_files(
+            term_embedding, file_ids, top_k=SEARCH_TOP_K
+        )
+        return self._match_texts(matches, with_file_id=True)
+
+    async def asearch(self, search_term: str, file_id: str) -> list[dict]:
+        """
+        Perform semantic search on the vector store based from search term and file id.
+
+        :param search_term: request payload search query text
+        :param file_id: request payload file id
+        :return: matching paragraphs texts from vector search
+        """
+        return await self._cached_search(
+            search_term,
+            self.search_key(search_term, file_id),
+            lambda term_embedding: self.aquery_index(term_embedding, file_id),
+            [file_id],
+        )
+
+    async def asearch_files(self, search_term: str, file_ids: list[str]) -> list[dict]:
+        """
+        Perform one semantic search across many files.
+
+        The search term is embedded once and the vector store merges the
+        best matches of every file.
+
+        :param search_term: request payload search query text
+        :param file_ids: file ids to search
+        :return: matching paragraphs texts with their file ids, best first
+        """
+        file_ids = sorted(set(file_ids))
+        if not file_ids:
+            return []
+
+        # The leading separator keeps file lists apart from single file keys.
+        files_key = "".join(f"\0{file_id}" for file_id in file_ids)
+        return await self._cached_search(
+            search_term,
+            self.search_key(search_term, files_key),
+            lambda term_embedding: self.aquery_files(term_embedding, file_ids),
+            file_ids,
+        )
+
+    async def _cached_search(
+        self,
+        search_term: str,
+        search_key: str,
+        query: Callable[[list[float]], Awaitable[list[dict]]],
+        file_ids: list[str],
+    ) -> list[dict]:
+        """
+        Serve search results from the cache or compute them once across workers.
+
+        :param search_term: search query text
+        :param search_key: search cache key
+        :param query: coroutine function querying the vector index with an embedding
+        :param file_ids: file ids searched
+        :return: matching paragraphs texts from vector search
+        """
+        cached = await self.search_cache.get(search_key)
+        if cached is not None:
+            if self.single_flight is not None and self.search_cache.should_refresh(
+                cached
+            ):
+                self.single_flight.refresh_in_background(
+                    search_key,
+                    lambda: self._compute_search(
+                        search_term, search_key, query, file_ids
+                    ),
+                    lambda: self._outdated(search_key, cached.computed_at),
                 )
+            return cached.results
+
+        if self.single_flight is None:
+            return await self._compute_search(search_term, search_key, query, file_ids)
+
+        return await self.single_flight.do(
+            search_key,
+            lambda: self._compute_search(search_term, search_key, query, file_ids),
+            lambda: self._cached_results(search_key),
+        )
 
-        if match_texts:
-            self.redis_client.set(
-                search_key, json.dumps(match_texts), ex=self.settings.redis_cache_exp
-            )
+    async def _cached_results(self, search_key: str) -> list[dict] | None:
+        """
+        Read search results stored by another worker.
+
+        Polled while another worker computes them, so polls are not counted
+        as cache lookups.
+
+        :param search_key: search cache key
+        :return: cached search results or None
+        """
+        cached = await self.search_cache.peek(search_key)
+        return cached.results if cached is not None else None
+
+    async def _outdated(self, search_key: str, computed_at: float) -> bool:
+        """
+        Whether cached search results were not refreshed since an entry was computed.
+
+        :param search_key: search cache key
+        :param computed_at: computation time of the entry triggering the refresh
+        :return: True when the results still need the refresh
+        """
+        cached = await self.search_cache.peek(search_key)
+        return cached is None or cached.computed_at <= computed_at
+
+    async def _compute_search(
+        self,
+        search_term: str,
+        search_key: str,
+        query: Callable[[list[float]], Awaitable[list[dict]]],
+        file_ids: list[str],
+    ) -> list[dict]:
+        """
+        Embed the search term, query the vector index and cache the results.
+
+        :param search_term: search query text
+        :param search_key: search cache key
+        :param query: coroutine function querying the vector index with an embedding
+        :param file_ids: file ids searched
+        :return: matching paragraphs texts from vector search
+        """
+        start = time.perf_counter()
+        term_embedding = await self.aembed_query(search_term)
+        match_texts = await query(term_embedding)
+
+        await self.search_cache.set(
+            search_key,
+            match_texts,
+            delta=time.perf_counter() - start,
+            file_ids=file_ids,
+        )
 
         return match_texts
+
+    async def abatch_search(self, items: list[tuple[str, str]]) -> list[dict]:
+        """
+        Perform many semantic searches sharing cache lookups and embedding requests.
+
+        :param items: search query text and file id pairs
+        :return: search results or error per item, in request order
+        """
+        keys = [self.search_key(search_term, file_id) for search_term, file_id in items]
+        unique_keys = list(dict.fromkeys(keys))
+        outcomes: dict[str, list[dict] | BaseException] = {}
+
+        for key, cached in zip(
+            unique_keys, await self.search_cache.get_many(unique_keys)
+        ):
+            if cached is not None:
+                outcomes[key] = cached.results
+
+        pending = {key: item for key, item in zip(keys, items) if key not in outcomes}
+
+        if pending:
+            try:
+                embeddings = await self.aembed_queries(
+                    [search_term for search_term, _ in pending.values()]
+                )
+            except HTTPException as exc:
+                outcomes.update(dict.fromkeys(pending, exc))
+            else:
+                start = time.perf_counter()
+                semaphore = asyncio.Semaphore(self.settings.extract_batch_concurrency)
+
+                async def query(search_term: str, file_id: str) -> list[dict]:
+                    async with semaphore:
+                        return await self.aquery_index(
+                            embeddings[normalize_query(search_term)], file_id
+                        )
+
+                results = await asyncio.gather(
+                    *(query(*item) for item in pending.values()),
+                    return_exceptions=True,
+                )
+                outcomes.update(zip(pending, results))
+                await self.search_cache.set_many(
+                    {
+                        key: result
+                        for key, result in zip(pending, results)
+                        if isinstance(result, list)
+                    },
+                    delta=time.perf_counter() - start,
+                    file_ids={key: [file_id] for key, (_, file_id) in pending.items()},
+                )
+
+        return [self._batch_item_result(outcomes[key]) for key in keys]
+
+    @staticmethod
+    def _batch_item_result(outcome: list[dict] | BaseException) -> dict:
+        """
+        Format the outcome of one batch item.
+
+        :param outcome: search results or raised exception
+        :return: batch item result
+        """
+        if isinstance(outcome, HTTPException):
+            return {"data": None, "error": outcome.detail}
+
+        if isinstance(outcome, BaseException):
+            logging.error("Exception raised during batch search: %s", outcome)
+            return {"data": None, "error": "Vector search failed"}
+
+        return {"data": outcome, "error": None}
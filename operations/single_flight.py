@@ -0,0 +1,253 @@
+"""Single-flight request coalescing module."""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from metrics import Counters
+from settings import Settings
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightState:
+    """Process wide single-flight state."""
+
+    def __init__(self):
+        """Initialize state and counters."""
+        self.inflight = {}
+        self.refreshing = set()
+        self.background = set()
+        self.stats = Counters(
+            "leader",
+            "joined",
+            "remote_hits",
+            "fallbacks",
+            "refreshes",
+            "refresh_skips",
+            "refresh_failures",
+        )
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent computations.
+
+    Callers of the same key inside the worker process share one in-flight
+    computation. Across workers a short Redis lease elects one computing
+    worker while the others poll `lookup` for its result, computing it
+    themselves once the lease is gone or the bounded wait runs out.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis_client: aioredis.Redis,
+        state: SingleFlightState,
+    ):
+        """
+        Inject class dependencies.
+
+        :param settings: Application settings
+        :param redis_client: asyncio Redis client
+        :param state: process wide single-flight state
+        """
+        self.settings = settings
+        self.redis_client = redis_client
+        self.state = state
+        self.inflight = state.inflight
+        self.stats = state.stats
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Compute a value once for all concurrent callers of the same key.
+
+        :param key: computation key
+        :param compute: coroutine function computing the value
+        :param lookup: coroutine function reading a value stored by another worker
+        :return: computed value
+        """
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats.increment("joined")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await compute()
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+
+        try:
+            result = await self._compute_leased(key, compute, lookup)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when no other caller joined.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self.inflight.pop(key, None)
+
+    async def _compute_leased(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Compute a value holding the cross worker lease, or wait for its holder.
+
+        :param key: computation key
+        :param compute: coroutine function computing the value
+        :param lookup: coroutine function reading a value stored by another worker
+        :return: computed value
+        """
+        lease_key = f"lease:{key}"
+
+        try:
+            token = await self._acquire(lease_key)
+        except RedisError as exc:
+            logger.warning(f"Single-flight lease unavailable: {exc}")
+            return await compute()
+
+        if token is not None:
+            self.stats.increment("leader")
+            try:
+                return await compute()
+            finally:
+                await self._release(lease_key, token)
+
+        deadline = time.monotonic() + self.settings.single_flight_wait
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.settings.single_flight_poll_interval)
+
+                result = await lookup()
+                if result is not None:
+                    self.stats.increment("remote_hits")
+                    return result
+
+                if not await self.redis_client.exists(lease_key):
+                    break
+        except RedisError as exc:
+            logger.warning(f"Single-flight lease unavailable: {exc}")
+
+        self.stats.increment("fallbacks")
+        return await compute()
+
+    def refresh_in_background(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        outdated: Callable[[], Awaitable[bool]] | None = None,
+    ):
+        """
+        Recompute a value in a background task unless a refresh already runs.
+
+        :param key: computation key
+        :param compute: coroutine function computing and storing the value
+        :param outdated: coroutine function telling whether the stored value still needs the refresh
+        :return: None
+        """
+        if key in self.state.refreshing or key in self.inflight:
+            return
+
+        self.state.refreshing.add(key)
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(key, compute, outdated)
+        )
+        self.state.background.add(task)
+        task.add_done_callback(self.state.background.discard)
+
+    async def _refresh(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        outdated: Callable[[], Awaitable[bool]] | None,
+    ):
+        """
+        Recompute a value when no other worker holds its lease.
+
+        The stored value is checked again once the lease is held, so a
+        refresh another worker completed in the meantime is not repeated.
+
+        :param key: computation key
+        :param compute: coroutine function computing and storing the value
+        :param outdated: coroutine function telling whether the stored value still needs the refresh
+        :return: None
+        """
+        lease_key = f"lease:{key}"
+
+        try:
+            token = await self._acquire(lease_key)
+            if token is None:
+                self.stats.increment("refresh_skips")
+                return
+
+            try:
+                if outdated is not None and not await outdated():
+                    self.stats.increment("refresh_skips")
+                    return
+                await compute()
+                self.stats.increment("refreshes")
+            finally:
+                await self._release(lease_key, token)
+        except Exception as exc:
+            self.stats.increment("refresh_failures")
+            logger.warning(f"Background refresh of {key} failed: {exc}")
+        finally:
+            self.state.refreshing.discard(key)
+
+    async def _acquire(self, lease_key: str) -> str | None:
+        """
+        Acquire the cross worker lease.
+
+        :param lease_key: lease key
+        :return: lease owner token or None when another caller holds it
+        """
+        token = uuid.uuid4().hex
+        acquired = await self.redis_client.set(
+            lease_key,
+            token,
+            nx=True,
+            px=int(self.settings.single_flight_lease * 1000),
+        )
+        return token if acquired else None
+
+    async def _release(self, lease_key: str, token: str):
+        """
+        Release the lease when still held by this caller.
+
+        :param lease_key: lease key
+        :param token: lease owner token
+        :return: None
+        """
+        try:
+            await self.redis_client.eval(  # type: ignore[misc]
+                RELEASE_LEASE_SCRIPT, 1, lease_key, token
+            )
+        except RedisError as exc:
+            logger.warning(f"Single-flight lease release failed: {exc}")
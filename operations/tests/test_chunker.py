@@ -0,0 +1,79 @@
+"""Test paragraph chunking module."""
+
+from operations.chunker import Chunk, chunk_paragraphs, estimate_tokens, split_paragraph
+
+
+class TestChunker:
+    """Test chunking functions."""
+
+    def test_estimate_tokens_counts_cjk_characters(self):
+        """Test CJK characters cost more than latin characters."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("契約書") > estimate_tokens("abc")
+        assert estimate_tokens("契約書") >= 3
+
+    def test_estimate_tokens_counts_rare_cjk_characters(self):
+        """Test rare CJK characters exceed 1.5 tokens each, up to one per byte."""
+        assert estimate_tokens("契約書") > 1.5 * 3
+        assert estimate_tokens("鬱" * 10) > 1.5 * 10
+
+        text = "本契約は甲乙間の取引に適用する。鬱𠮷ｱｲｳ한국어"
+        assert estimate_tokens(text) <= len(text.encode("utf-8"))
+
+    def test_split_paragraph_on_sentence_boundaries(self):
+        """Test a long paragraph is split after sentence ending punctuation."""
+        text = "第一条。本契約は取引に適用する。第二条。期間は一年とする。"
+
+        pieces = split_paragraph(text, 20)
+
+        assert pieces == [
+            "第一条。本契約は取引に適用する。",
+            "第二条。期間は一年とする。",
+        ]
+        assert all(estimate_tokens(piece) <= 20 for piece in pieces)
+
+    def test_split_paragraph_keeps_decimals_together(self):
+        """Test latin sentences split on punctuation followed by whitespace."""
+        text = "Rate is 3.5 percent. Term is one year."
+
+        assert split_paragraph(text, 8) == ["Rate is 3.5 percent.", "Term is one year."]
+
+    def test_split_paragraph_without_boundaries(self):
+        """Test a sentence over the budget is split between characters."""
+        pieces = split_paragraph("あ" * 25, 15)
+
+        assert "".join(pieces) == "あ" * 25
+        assert all(estimate_tokens(piece) <= 15 for piece in pieces)
+
+        pieces = split_paragraph("鬱𠮷" * 25, 16)
+
+        assert "".join(pieces) == "鬱𠮷" * 25
+        assert all(estimate_tokens(piece) <= 16 for piece in pieces)
+
+    def test_chunk_paragraphs_merges_small_paragraphs(self):
+        """Test headers are merged with the next paragraph and spans kept."""
+        body = "本契約は甲乙間の取引に適用する。"
+
+        chunks = chunk_paragraphs(["第一章", body, "第二章", body], 10, 100)
+
+        assert chunks == [
+            Chunk(f"第一章\n{body}", 0, 2),
+            Chunk(f"第二章\n{body}", 2, 4),
+        ]
+
+    def test_chunk_paragraphs_merges_small_last_paragraph(self):
+        """Test a small last paragraph is merged with the one before."""
+        body = "本契約は甲乙間の取引に適用する。"
+
+        assert chunk_paragraphs([body, "以上"], 10, 100) == [
+            Chunk(f"{body}\n以上", 0, 2)
+        ]
+
+    def test_chunk_paragraphs_splits_large_paragraphs(self):
+        """Test pieces of a split paragraph share its span."""
+        chunks = chunk_paragraphs(["short.", "One sentence. " * 20], 1, 20)
+
+        assert chunks[0] == Chunk("short.", 0, 1)
+        assert len(chunks) > 2
+        assert all(chunk[1:] == (1, 2) for chunk in chunks[1:])
+        assert all(estimate_tokens(chunk.text) <= 20 for chunk in chunks)
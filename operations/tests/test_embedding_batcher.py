@@ -0,0 +1,91 @@
+"""Test embedding micro-batcher module."""
+
+import asyncio
+
+import pytest
+from langchain_core.exceptions import LangChainException
+
+from conftest import override_get_settings
+from operations.embedding_batcher import EmbeddingBatcher, EmbeddingBatcherState
+
+
+class RequestRecordingEmbeddings:
+    """Embedding client recording the texts of each request."""
+
+    def __init__(self, fail: bool = False):
+        self.requests: list = []
+        self.fail = fail
+
+    async def aembed_documents(self, texts):
+        self.requests.append(list(texts))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise LangChainException("embedding failed")
+        return [[float(len(text))] for text in texts]
+
+
+def embedding_batcher(embeddings, max_items: int = 100) -> EmbeddingBatcher:
+    """
+    Build an embedding micro-batcher with fresh state.
+
+    :param embeddings: embedding client
+    :param max_items: texts sent per request
+    :return: embedding micro-batcher
+    """
+    settings = override_get_settings()
+    settings.embedding_chunk_size = max_items
+    return EmbeddingBatcher(settings, embeddings, EmbeddingBatcherState())
+
+
+async def embed_concurrently(batcher: EmbeddingBatcher, *calls: list[str]):
+    """
+    Embed texts of many callers at once.
+
+    :param batcher: embedding micro-batcher
+    :param calls: texts of each caller
+    :return: embeddings of each caller
+    """
+    return await asyncio.gather(*(batcher.aembed_documents(texts) for texts in calls))
+
+
+class TestEmbeddingBatcher:
+    """Test EmbeddingBatcher class."""
+
+    def test_concurrent_calls_share_one_request(self):
+        """Test texts of concurrent jobs are embedded in one request."""
+        embeddings = RequestRecordingEmbeddings()
+        batcher = embedding_batcher(embeddings)
+
+        results = asyncio.run(embed_concurrently(batcher, ["a"], ["bb", "a"], ["ccc"]))
+
+        assert embeddings.requests == [["a", "bb", "ccc"]]
+        assert results == [[[1.0]], [[2.0], [1.0]], [[3.0]]]
+        stats = batcher.state.stats.snapshot()
+        assert stats["calls"] == 3 and stats["deduplicated"] == 1
+
+    def test_full_batch_is_sent_without_waiting(self):
+        """Test a request is sent once the texts limit is reached."""
+        embeddings = RequestRecordingEmbeddings()
+        batcher = embedding_batcher(embeddings, max_items=3)
+
+        asyncio.run(embed_concurrently(batcher, ["a", "b"], ["c", "d"], ["e"]))
+
+        assert embeddings.requests == [["a", "b"], ["c", "d", "e"]]
+        assert batcher.state.stats.snapshot()["full_flushes"] == 2
+
+    def test_failed_request_fails_every_caller(self):
+        """Test the error of a shared request is raised to each caller."""
+        batcher = embedding_batcher(RequestRecordingEmbeddings(fail=True))
+
+        async def embed():
+            return await asyncio.gather(
+                batcher.aembed_documents(["a"]),
+                batcher.aembed_documents(["b"]),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(embed())
+
+        assert all(isinstance(result, LangChainException) for result in results)
+        with pytest.raises(LangChainException):
+            asyncio.run(batcher.aembed_documents(["c"]))
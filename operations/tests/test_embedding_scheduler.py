@@ -0,0 +1,119 @@
+"""Test rate limited embedding scheduler module."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from openai import RateLimitError
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from conftest import override_get_async_redis_client, override_get_settings
+from metrics import Counters
+from operations.embedding_scheduler import EmbeddingScheduler, backoff_delay
+
+
+def rate_limit_error(retry_after: str | None = None) -> RateLimitError:
+    """
+    Build an OpenAI rate limit error.
+
+    :param retry_after: Retry-After header value
+    :return: rate limit error
+    """
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(
+        429,
+        headers=headers,
+        request=httpx.Request("POST", "https://api.openai.com/v1/embeddings"),
+    )
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def embedding_scheduler(embedding_client, redis_client=None) -> EmbeddingScheduler:
+    """
+    Build an embedding scheduler with fresh counters.
+
+    :param embedding_client: embedding client mock
+    :param redis_client: asyncio Redis client mock
+    :return: embedding scheduler
+    """
+    return EmbeddingScheduler(
+        override_get_settings(),
+        redis_client or override_get_async_redis_client(),
+        embedding_client,
+        Counters("requests", "tokens", "paced", "throttled", "failures"),
+    )
+
+
+@pytest.fixture
+def sleep(monkeypatch) -> AsyncMock:
+    """
+    Replace the scheduler's sleeps.
+
+    :param monkeypatch: monkeypatch fixture
+    :return: sleep mock
+    """
+    mock = AsyncMock()
+    monkeypatch.setattr("operations.embedding_scheduler.asyncio.sleep", mock)
+    return mock
+
+
+class TestEmbeddingScheduler:
+    """Test EmbeddingScheduler class."""
+
+    def test_backoff_delay_is_capped(self):
+        """Test the jittered delay grows with the attempt up to the cap."""
+        assert 0 <= backoff_delay(0, 1, 60) <= 1
+        assert 0 <= backoff_delay(10, 1, 60) <= 60
+
+    def test_waits_for_next_window_when_budget_spent(self, sleep):
+        """Test a request over the shared budget waits for the next minute."""
+        redis_client = Mock()
+        redis_client.eval = AsyncMock(side_effect=[0, 1])
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(return_value=[[1.0]])
+        scheduler = embedding_scheduler(embedding_client, redis_client)
+
+        result = asyncio.run(scheduler.aembed_documents(["text"]))
+
+        assert result == [[1.0]]
+        assert sleep.await_count == 1 and 0 < sleep.await_args.args[0] <= 61
+        assert scheduler.stats.snapshot()["paced"] == 1
+        assert scheduler.stats.snapshot()["requests"] == 1
+
+    def test_retries_throttled_request(self, sleep):
+        """Test a 429 is retried after the Retry-After delay."""
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(
+            side_effect=[rate_limit_error("2"), [[1.0]]]
+        )
+        scheduler = embedding_scheduler(embedding_client)
+
+        result = asyncio.run(scheduler.aembed_documents(["text"]))
+
+        assert result == [[1.0]]
+        sleep.assert_awaited_once_with(2.0)
+        assert scheduler.stats.snapshot()["throttled"] == 1
+
+    def test_raises_after_retries(self, sleep):
+        """Test a request throttled on every attempt raises."""
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(side_effect=rate_limit_error())
+        scheduler = embedding_scheduler(embedding_client)
+
+        with pytest.raises(RateLimitError):
+            asyncio.run(scheduler.aembed_documents(["text"]))
+
+        assert embedding_client.aembed_documents.await_count == 3
+        assert scheduler.stats.snapshot()["failures"] == 1
+
+    def test_sends_unpaced_without_redis(self, sleep):
+        """Test requests are sent when the shared budget is unavailable."""
+        redis_client = Mock()
+        redis_client.eval = AsyncMock(side_effect=RedisConnectionError("down"))
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(return_value=[[1.0]])
+        scheduler = embedding_scheduler(embedding_client, redis_client)
+
+        assert asyncio.run(scheduler.aembed_documents(["text"])) == [[1.0]]
+        sleep.assert_not_awaited()
@@ -0,0 +1,107 @@
+"""Test document embedding store module."""
+
+import asyncio
+
+import numpy as np
+
+from operations.embedding_store import RedisEmbeddingStore, SQLiteEmbeddingStore
+from operations.ingest_pipeline import IngestPipeline
+from operations.tests.test_ingest_pipeline import format_payload, paragraphs
+from operations.upsert_batcher import UpsertBatcher
+from vector_stores import LocalVectorStore
+
+
+class FakeRedis:
+    """Dictionary backed asyncio Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, **kwargs):
+        return FakePipeline(self.data)
+
+
+class FakePipeline:
+    """Redis pipeline writing to a dictionary."""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def execute(self):
+        return []
+
+
+class CountingEmbeddings:
+    """Embedding client recording the texts it embeds."""
+
+    def __init__(self):
+        self.embedded = []
+
+    async def aembed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[1.0, float(len(text))] for text in texts]
+
+
+class TestEmbeddingStore:
+    """Test EmbeddingStore implementations."""
+
+    def test_sqlite_store_round_trip(self, tmp_path):
+        """
+        Test embeddings are found again under the same model and dimensions.
+
+        :param tmp_path: temporary directory fixture
+        """
+        path = str(tmp_path / "store" / "embeddings.sqlite3")
+        store = SQLiteEmbeddingStore(path, "model", 2)
+        asyncio.run(store.set_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]]))
+
+        found = asyncio.run(SQLiteEmbeddingStore(path, "model", 2).get_many(["b", "c"]))
+        other_model = asyncio.run(
+            SQLiteEmbeddingStore(path, "other", 2).get_many(["b"])
+        )
+
+        assert np.array_equal(found[0], [3.0, 4.0]) and found[1] is None
+        assert other_model == [None]
+
+    def test_redis_store_round_trip(self):
+        """Test embeddings are read back with one MGET."""
+        store = RedisEmbeddingStore(FakeRedis(), "model", None, 60)
+        asyncio.run(store.set_many(["a"], [[1.0, 2.0]]))
+
+        found = asyncio.run(store.get_many(["a", "b"]))
+
+        assert np.array_equal(found[0], [1.0, 2.0]) and found[1] is None
+
+    def test_pipeline_embeds_misses_only(self):
+        """Test known and repeated paragraphs are not embedded again."""
+        store = RedisEmbeddingStore(FakeRedis(), "model", None, 60)
+        embeddings = CountingEmbeddings()
+
+        def run(*texts: str) -> dict:
+            pipeline = IngestPipeline(
+                embeddings,
+                UpsertBatcher(LocalVectorStore(), 10, 10**6, 1, 0),
+                10,
+                1,
+                store,
+            )
+            return asyncio.run(pipeline.run(paragraphs(*texts), format_payload))
+
+        run("a", "b")
+        stats = run("a", "c", "c", "b")
+
+        assert embeddings.embedded == ["a", "b", "c"]
+        assert stats["embedding_store_hits"] == 3
+        assert stats["embedding_store_misses"] == 1
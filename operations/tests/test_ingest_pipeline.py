@@ -0,0 +1,167 @@
+"""Test ingestion pipeline module."""
+
+import asyncio
+
+import pytest
+from langchain_core.exceptions import LangChainException
+
+from operations.ingest_pipeline import IngestPipeline, pack_requests
+from operations.upsert_batcher import UpsertBatcher
+from vector_stores import LocalVectorStore
+
+
+def format_payload(
+    paragraphs: list[tuple[str, str]], embeddings: list[list[float]]
+) -> list[dict]:
+    """
+    Build vector records of a file.
+
+    :param paragraphs: vector ids and texts of paragraphs
+    :param embeddings: paragraph embeddings
+    :return: vector records
+    """
+    return [
+        {"id": vid, "values": values, "metadata": {"text": text, "file_id": "file"}}
+        for (vid, text), values in zip(paragraphs, embeddings)
+    ]
+
+
+def paragraphs(*texts: str) -> list[tuple[str, str]]:
+    """
+    Pair texts with vector ids.
+
+    :param texts: paragraph texts
+    :return: vector ids and texts
+    """
+    return [(f"id-{text}", text) for text in texts]
+
+
+class RecordingEmbeddings:
+    """Embedding client recording the pipeline events."""
+
+    def __init__(self, events: list, latency: float = 0.0, fail_on: int = -1):
+        self.events = events
+        self.latency = latency
+        self.fail_on = fail_on
+        self.calls = 0
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise LangChainException("embedding failed")
+        self.events.append(("embed", texts[0]))
+        await asyncio.sleep(self.latency)
+        return [[1.0, float(len(text))] for text in texts]
+
+
+class RecordingStore(LocalVectorStore):
+    """Local vector store recording the pipeline events."""
+
+    def __init__(self, events: list, latency: float = 0.0):
+        super().__init__()
+        self.events = events
+        self.latency = latency
+
+    async def upsert(self, vectors: list[dict]):
+        self.events.append(("upsert start", vectors[0]["id"]))
+        await asyncio.sleep(self.latency)
+        await super().upsert(vectors)
+        self.events.append(("upsert end", vectors[0]["id"]))
+
+
+class TestIngestPipeline:
+    """Test IngestPipeline class."""
+
+    def test_pack_requests_by_count(self):
+        """Test paragraphs are split lazily into batches."""
+        items = ((f"id-{idx}", f"t{idx}") for idx in range(5))
+
+        batches = list(pack_requests(items, 2))
+
+        assert [[text for _, text in batch] for batch in batches] == [
+            ["t0", "t1"],
+            ["t2", "t3"],
+            ["t4"],
+        ]
+
+    def test_pack_requests_by_tokens(self):
+        """Test requests stay under the token budget, larger texts go alone."""
+        items = paragraphs("a" * 20, "b" * 20, "c" * 40, "d" * 5)
+
+        batches = list(pack_requests(items, 10, 9))
+
+        assert [[vid for vid, _ in batch] for batch in batches] == [
+            ["id-" + "a" * 20, "id-" + "b" * 20],
+            ["id-" + "c" * 40],
+            ["id-" + "d" * 5],
+        ]
+
+    def test_upserts_every_paragraph(self):
+        """Test every paragraph of a generator is embedded and upserted."""
+        events = []
+        store = RecordingStore(events)
+        pipeline = IngestPipeline(
+            RecordingEmbeddings(events), UpsertBatcher(store, 3, 10**6, 1, 0), 3, 1
+        )
+
+        stats = asyncio.run(
+            pipeline.run(
+                ((f"id-t{idx}", f"t{idx}") for idx in range(10)), format_payload
+            )
+        )
+
+        assert stats["batches"] == 4 and stats["upsert"]["vectors"] == 10
+        matches = asyncio.run(store.query([1.0, 2.0], "file", top_k=20))
+        assert sorted(match.id for match in matches) == sorted(
+            f"id-t{idx}" for idx in range(10)
+        )
+
+    def test_embeds_next_batch_during_upsert(self):
+        """Test the next batch is embedded while the previous one is upserted."""
+        events = []
+        pipeline = IngestPipeline(
+            RecordingEmbeddings(events, latency=0.01),
+            UpsertBatcher(RecordingStore(events, latency=0.05), 1, 10**6, 1, 0),
+            1,
+            1,
+        )
+
+        asyncio.run(pipeline.run(paragraphs("a", "b", "c"), format_payload))
+
+        assert events.index(("embed", "b")) < events.index(("upsert end", "id-a"))
+
+    def test_queues_bound_batches_in_flight(self):
+        """Test a slow upsert stage holds the embedding stage back."""
+        events = []
+        pipeline = IngestPipeline(
+            RecordingEmbeddings(events),
+            UpsertBatcher(RecordingStore(events, latency=0.01), 1, 10**6, 1, 0),
+            1,
+            1,
+        )
+
+        texts = [f"t{idx}" for idx in range(8)]
+        asyncio.run(pipeline.run(paragraphs(*texts), format_payload))
+
+        ahead = 0
+        for event, _ in events:
+            if event == "embed":
+                ahead += 1
+            elif event == "upsert end":
+                ahead -= 1
+            # One batch upserting, one waiting for an upsert slot, one queued
+            # and one waiting to be queued.
+            assert ahead <= 4
+
+    def test_failure_stops_pipeline(self):
+        """Test an embedding failure stops every stage and is raised."""
+        events = []
+        store = RecordingStore(events)
+        batcher = UpsertBatcher(store, 2, 10**6, 1, 0)
+        pipeline = IngestPipeline(RecordingEmbeddings(events, fail_on=2), batcher, 2, 1)
+
+        with pytest.raises(LangChainException):
+            texts = [f"t{idx}" for idx in range(10)]
+            asyncio.run(pipeline.run(paragraphs(*texts), format_payload))
+
+        assert batcher.stats.snapshot()["vectors"] <= 2
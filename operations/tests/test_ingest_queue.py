@@ -0,0 +1,480 @@
+"""Test ingestion job queue and worker modules."""
+
+import asyncio
+import itertools
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import WatchError  # type: ignore[import-untyped]
+
+from conftest import override_get_settings
+from operations.cache_keys import ingest_job_key
+from operations.ingest_queue import (
+    DEAD_LETTER_STREAM,
+    INGEST_STREAM,
+    Delivery,
+    IngestConsumer,
+    IngestQueue,
+)
+from operations.job_status import JobStatusStore, new_job_status
+from worker import IngestWorker, serve
+
+
+class FakeStreams:
+    """Single consumer group Redis Streams and string keys held in memory."""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.streams = {INGEST_STREAM: {}, DEAD_LETTER_STREAM: {}}
+        self.delivered = set()
+        self.pending = {}
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
+    async def xgroup_create(self, *args, **kwargs):
+        return True
+
+    async def xadd(self, name, fields):
+        message_id = f"{next(self.ids)}-0"
+        self.streams[name][message_id] = {
+            key.encode(): value.encode() for key, value in fields.items()
+        }
+        return message_id
+
+    def _deliver(self, message_id, consumer):
+        times = self.pending.get(message_id, {}).get("times_delivered", 0)
+        self.pending[message_id] = {
+            "consumer": consumer,
+            "since": time.monotonic(),
+            "times_delivered": times + 1,
+        }
+        return message_id.encode(), self.streams[INGEST_STREAM][message_id]
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        new = [
+            message_id
+            for message_id in self.streams[INGEST_STREAM]
+            if message_id not in self.delivered
+        ][:count]
+        if not new:
+            await asyncio.sleep(block / 1000)
+            return []
+        self.delivered.update(new)
+        entries = [self._deliver(message_id, consumer) for message_id in new]
+        return [[INGEST_STREAM.encode(), entries]]
+
+    async def xautoclaim(self, name, group, consumer, min_idle_time, **kwargs):
+        now = time.monotonic()
+        expired = [
+            message_id
+            for message_id, entry in self.pending.items()
+            if (now - entry["since"]) * 1000 >= min_idle_time
+        ][: kwargs["count"]]
+        return [b"0-0", [self._deliver(message_id, consumer) for message_id in expired]]
+
+    async def xpending_range(self, name, group, min, max, count):
+        entry = self.pending.get(min)
+        return [entry] if entry else []
+
+    async def xclaim(self, name, group, consumer, min_idle_time, message_ids, **kwargs):
+        for message_id in message_ids:
+            self.pending[message_id]["since"] = time.monotonic()
+
+    def pipeline(self, **kwargs):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Pipeline running queued stream commands in order."""
+
+    def __init__(self, streams: FakeStreams):
+        self.streams = streams
+        self.commands: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def xadd(self, name, fields):
+        self.commands.append(self.streams.xadd(name, fields))
+
+    def xack(self, name, group, message_id):
+        self.streams.pending.pop(message_id, None)
+
+    def xdel(self, name, message_id):
+        self.streams.streams[name].pop(message_id, None)
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class FakeWatchRedis:
+    """Synchronous Redis string keys and stream with WATCH and MULTI."""
+
+    def __init__(self):
+        self.values = {}
+        self.stream = []
+        self.concurrent_writes = {}
+
+    def pipeline(self, **kwargs):
+        return FakeWatchPipeline(self)
+
+
+class FakeWatchPipeline:
+    """Pipeline whose transaction fails when a concurrent write is pending."""
+
+    def __init__(self, redis_client: FakeWatchRedis):
+        self.redis_client = redis_client
+        self.commands: list = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return None
+
+    def watch(self, key):
+        self.commands = []
+
+    def get(self, key):
+        return self.redis_client.values.get(key)
+
+    def multi(self):
+        return None
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def xadd(self, name, fields):
+        self.commands.append(("xadd", name, fields))
+
+    def execute(self):
+        if self.redis_client.concurrent_writes:
+            self.redis_client.values.update(self.redis_client.concurrent_writes)
+            self.redis_client.concurrent_writes = {}
+            raise WatchError("watched key changed")
+        for command, key, value in self.commands:
+            if command == "set":
+                self.redis_client.values[key] = value
+            else:
+                self.redis_client.stream.append(json.loads(value["job"]))
+
+
+def jobs(redis_client: FakeStreams, name: str) -> list[dict]:
+    """
+    Decode the jobs of a stream.
+
+    :param redis_client: fake Redis streams
+    :param name: stream name
+    :return: jobs in stream order
+    """
+    return [
+        json.loads(fields[b"job"]) for fields in redis_client.streams[name].values()
+    ]
+
+
+async def run_worker(
+    redis_client: FakeStreams, handler, seconds: float = 0.2, concurrency: int = 2
+):
+    """
+    Run a worker against the fake streams for a while.
+
+    :param redis_client: fake Redis streams
+    :param handler: coroutine function running a job
+    :param seconds: seconds the worker runs
+    :param concurrency: maximum number of jobs running at once
+    :return: None
+    """
+    settings = override_get_settings()
+    stop = asyncio.Event()
+    status_store = JobStatusStore(redis_client, 60, 0.01)  # type: ignore[arg-type]
+    worker = IngestWorker(
+        IngestConsumer(
+            settings, redis_client, "consumer", status_store  # type: ignore[arg-type]
+        ),
+        handler,
+        concurrency,
+    )
+    task = asyncio.create_task(worker.run(stop))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+
+
+async def enqueue(redis_client: FakeStreams, *file_ids: str):
+    """
+    Queue first attempts of jobs with their statuses.
+
+    :param redis_client: fake Redis streams
+    :param file_ids: file ids to ingest
+    :return: None
+    """
+    for file_id in file_ids:
+        job = {"job_id": file_id, "file_id": file_id, "attempt": 1}
+        status = new_job_status(file_id, file_id, "user")
+        await redis_client.set(ingest_job_key(file_id), json.dumps(status))
+        await redis_client.xadd(INGEST_STREAM, {"job": json.dumps(job)})
+
+
+def job_status(redis_client: FakeStreams, job_id: str) -> dict:
+    """
+    Decode the status of a job.
+
+    :param redis_client: fake Redis streams
+    :param job_id: ingestion job id
+    :return: job status
+    """
+    return json.loads(redis_client.values[ingest_job_key(job_id)])
+
+
+class TestIngestWorker:
+    """Test IngestWorker with IngestConsumer."""
+
+    def test_runs_jobs_concurrently_and_acknowledges(self):
+        """Test queued jobs run up to the concurrency and leave the stream."""
+        redis_client = FakeStreams()
+        running = []
+        peak = 0
+
+        async def handler(job, progress):
+            nonlocal peak
+            running.append(job["file_id"])
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.02)
+            running.remove(job["file_id"])
+
+        async def run():
+            await enqueue(redis_client, "a", "b", "c", "d", "e")
+            await run_worker(redis_client, handler)
+
+        asyncio.run(run())
+
+        assert peak == 2
+        assert not redis_client.streams[INGEST_STREAM]
+        assert not redis_client.pending
+
+    def test_failed_job_is_retried_then_dead_lettered(self):
+        """Test a failing job is queued again, then moved to the dead letters."""
+        redis_client = FakeStreams()
+        attempts = []
+
+        async def handler(job, progress):
+            attempts.append(job["attempt"])
+            raise RuntimeError("embedding failed")
+
+        async def run():
+            await enqueue(redis_client, "a")
+            await run_worker(redis_client, handler)
+
+        asyncio.run(run())
+
+        assert attempts == [1, 2]
+        assert not redis_client.streams[INGEST_STREAM]
+        assert jobs(redis_client, DEAD_LETTER_STREAM)[0]["attempt"] == 2
+        status = job_status(redis_client, "a")
+        assert status["state"] == "failed"
+        assert status["attempt"] == 2
+        assert "embedding failed" in status["error"]
+
+    def test_retry_status_written_before_job_is_queued(self):
+        """Test a retried job is marked queued before another worker can run it."""
+        redis_client = FakeStreams()
+        states = []
+        xadd = redis_client.xadd
+
+        async def record_state(name, fields):
+            states.append(job_status(redis_client, "a")["state"])
+            return await xadd(name, fields)
+
+        async def run():
+            await enqueue(redis_client, "a")
+            status_store = JobStatusStore(redis_client, 60, 0.01)  # type: ignore
+            await status_store.update("a", state="running")
+            consumer = IngestConsumer(
+                override_get_settings(),
+                redis_client,  # type: ignore[arg-type]
+                "consumer",
+                status_store,
+            )
+            redis_client.xadd = record_state  # type: ignore[method-assign]
+            job = {"job_id": "a", "file_id": "a", "attempt": 1}
+            await consumer.retry(Delivery("1-0", job), "embedding failed")
+
+        asyncio.run(run())
+
+        assert states == ["queued"]
+        assert jobs(redis_client, INGEST_STREAM)[-1]["attempt"] == 2
+
+    def test_reports_job_progress(self):
+        """Test a job status goes through running to done with its progress."""
+        redis_client = FakeStreams()
+        seen = []
+
+        async def handler(job, progress):
+            seen.append(job_status(redis_client, job["job_id"])["state"])
+            with progress.measure("chunking"):
+                progress.counts["paragraphs"] = 3
+                await asyncio.sleep(0.05)
+            seen.append(job_status(redis_client, job["job_id"])["progress"])
+
+        async def run():
+            await enqueue(redis_client, "a")
+            await run_worker(redis_client, handler)
+
+        asyncio.run(run())
+
+        assert seen[0] == "running"
+        assert seen[1]["stage"] == "chunking"
+        assert seen[1]["paragraphs"] == 3
+        status = job_status(redis_client, "a")
+        assert status["state"] == "done"
+        assert status["progress"]["paragraphs"] == 3
+        assert status["progress"]["stages"]["chunking"] > 0
+
+    def test_background_tasks_finished_with_job(self):
+        """Test no heartbeat or progress report outlives the job it belongs to."""
+        redis_client = FakeStreams()
+
+        async def handler(job, progress):
+            await asyncio.sleep(0)
+
+        async def run():
+            await enqueue(redis_client, "a")
+            status_store = JobStatusStore(redis_client, 60, 0.01)  # type: ignore
+            consumer = IngestConsumer(
+                override_get_settings(),
+                redis_client,  # type: ignore[arg-type]
+                "consumer",
+                status_store,
+            )
+            worker = IngestWorker(consumer, handler, 1)
+            job = {"job_id": "a", "file_id": "a", "attempt": 1}
+            await worker._process(Delivery("1-0", job))
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        assert asyncio.run(run()) == set()
+        assert job_status(redis_client, "a")["state"] == "done"
+
+    def test_reclaims_jobs_of_dead_worker(self):
+        """Test a job left pending past the visibility timeout runs again."""
+        redis_client = FakeStreams()
+        done = []
+
+        async def handler(job, progress):
+            done.append(job["file_id"])
+
+        async def run():
+            await enqueue(redis_client, "a")
+            # Delivered to a worker that died before acknowledging it.
+            await redis_client.xreadgroup("group", "dead", {}, count=1, block=0)
+            redis_client.pending["1-0"]["since"] -= 120
+            await run_worker(redis_client, handler)
+
+        asyncio.run(run())
+
+        assert done == ["a"]
+        assert not redis_client.pending
+
+    def test_refuses_local_backend(self):
+        """Test the worker does not start on a backend the API cannot read."""
+        settings = override_get_settings()
+        settings.vector_store_backend = "local"
+
+        with pytest.raises(SystemExit, match="local"):
+            asyncio.run(serve(settings, 1, "consumer"))
+
+
+class TestIngestQueue:
+    """Test IngestQueue idempotency."""
+
+    @staticmethod
+    def queue(redis_client: FakeWatchRedis) -> IngestQueue:
+        """
+        Build a queue over fake Redis keys.
+
+        :param redis_client: fake Redis keys
+        :return: ingestion job queue
+        """
+        return IngestQueue(override_get_settings(), redis_client)  # type: ignore
+
+    def test_repeated_request_attaches_to_job(self):
+        """Test the same file and content queue a single job."""
+        redis_client = FakeWatchRedis()
+        queue = self.queue(redis_client)
+
+        first = queue.enqueue("file.txt", "user", "v1")
+        second = queue.enqueue("file.txt", "user", "v1")
+
+        assert second == (first.job_id, True)
+        assert not first.duplicate
+        assert len(redis_client.stream) == 1
+
+    def test_new_content_or_user_queues_job(self):
+        """Test a changed content version or another user queue new jobs."""
+        redis_client = FakeWatchRedis()
+        queue = self.queue(redis_client)
+
+        job_ids = {
+            queue.enqueue("file.txt", "user", "v1").job_id,
+            queue.enqueue("file.txt", "user", "v2").job_id,
+            queue.enqueue("file.txt", "other-user", "v1").job_id,
+        }
+
+        assert len(job_ids) == 3
+        assert len(redis_client.stream) == 3
+
+    def test_failed_job_is_replaced(self):
+        """Test a request repeating a failed job queues a new one."""
+        redis_client = FakeWatchRedis()
+        queue = self.queue(redis_client)
+        failed = queue.enqueue("file.txt", "user", "v1").job_id
+        status = json.loads(redis_client.values[ingest_job_key(failed)])
+        redis_client.values[ingest_job_key(failed)] = json.dumps(
+            {**status, "state": "failed"}
+        )
+
+        retried = queue.enqueue("file.txt", "user", "v1")
+
+        assert retried.job_id != failed
+        assert not retried.duplicate
+        assert queue.enqueue("file.txt", "user", "v1") == (retried.job_id, True)
+
+    def test_idempotency_key(self):
+        """Test a client key attaches to its job, and is refused for another file."""
+        redis_client = FakeWatchRedis()
+        queue = self.queue(redis_client)
+
+        first = queue.enqueue("file.txt", "user", "v1", "client-key")
+        assert queue.enqueue("file.txt", "user", "v1", "client-key").duplicate
+        with pytest.raises(HTTPException) as exc_info:
+            queue.enqueue("other.txt", "user", "v1", "client-key")
+
+        assert exc_info.value.status_code == 409
+        assert redis_client.stream == [
+            {"job_id": first.job_id, "file_id": "file.txt", "attempt": 1}
+        ]
+
+    def test_concurrent_claim_attaches_to_winner(self):
+        """Test a request losing the key to a concurrent one attaches to its job."""
+        redis_client = FakeWatchRedis()
+        queue = self.queue(redis_client)
+        winner = queue.enqueue("file.txt", "user", "v1").job_id
+        key = next(key for key in redis_client.values if key.startswith("ingest:idem:"))
+        # The key is claimed between the read and the transaction.
+        del redis_client.values[key]
+        redis_client.concurrent_writes = {key: winner}
+
+        queued = queue.enqueue("file.txt", "user", "v1")
+
+        assert queued == (winner, True)
+        assert len(redis_client.stream) == 1
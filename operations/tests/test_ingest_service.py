@@ -0,0 +1,226 @@
+"""Test ingestion service module."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+
+from conftest import (
+    override_get_llm_embedding_client,
+    override_get_settings,
+    override_get_vector_store,
+)
+from metrics import CacheStats
+from operations.ingest_service import IngestService
+from operations.memory_cache import MemoryCache
+from operations.search_cache import SearchResultCache
+from operations.semantic_search_service import SemanticSearchService
+from operations.tests.test_semantic_search_service import FakeRedis
+from vector_stores import LocalVectorStore
+
+
+class TestIngestService:
+    """Test IngestService operations class."""
+
+    def test_format_pinecone_payload(self):
+        """Test format_pinecone_payload function."""
+
+        ingest_service = IngestService(
+            override_get_settings(),
+            override_get_vector_store(),
+            override_get_llm_embedding_client(),
+        )
+
+        response = ingest_service.format_pinecone_payload(
+            [("vector-id", "Sample text")], [[1, 2, 3]], "test file name"
+        )
+
+        assert response == [
+            {
+                "id": "vector-id",
+                "values": [1, 2, 3],
+                "metadata": {"text": "Sample text", "file_id": "test file name"},
+            }
+        ]
+
+    def test_embed_save_job_upserts_all_texts(self):
+        """Test every extracted text is embedded and upserted under the file id."""
+
+        vector_store = LocalVectorStore()
+        ingest_service = IngestService(
+            override_get_settings(),
+            vector_store,
+            override_get_llm_embedding_client(),
+        )
+        texts = [f"Sample text {idx}" for idx in range(450)]
+
+        asyncio.run(ingest_service.embed_save_job(texts, "test-file"))
+
+        matches = asyncio.run(
+            vector_store.query(list(np.ones(1536)), "test-file", top_k=1000)
+        )
+        assert sorted(match.metadata["text"] for match in matches) == sorted(texts)
+
+    def test_embed_save_job_records_paragraph_spans(self):
+        """Test merged chunks keep the range of paragraphs they cover."""
+
+        settings = override_get_settings()
+        settings.chunk_min_tokens = 6
+        vector_store = LocalVectorStore()
+        ingest_service = IngestService(
+            settings,
+            vector_store,
+            override_get_llm_embedding_client(),
+        )
+        body = "This agreement applies to every transaction."
+
+        asyncio.run(
+            ingest_service.embed_save_job(["Article 1", body, body], "test-file")
+        )
+
+        matches = asyncio.run(
+            vector_store.query(list(np.ones(1536)), "test-file", top_k=10)
+        )
+        assert sorted(
+            (match.metadata["paragraph_start"], match.metadata["paragraph_end"])
+            for match in matches
+        ) == [(0, 2), (2, 3)]
+
+    def test_embed_save_job_reingests_changes_only(self):
+        """Test processing a file again embeds changed texts and deletes removed ones."""
+
+        embedded = []
+        embedding_client = override_get_llm_embedding_client()
+        aembed_documents = embedding_client.aembed_documents
+
+        async def record_embedded(texts):
+            embedded.extend(texts)
+            return await aembed_documents(texts)
+
+        embedding_client.aembed_documents = record_embedded
+        vector_store = LocalVectorStore()
+        ingest_service = IngestService(
+            override_get_settings(),
+            vector_store,
+            embedding_client,
+        )
+
+        asyncio.run(ingest_service.embed_save_job(["a", "b", "c"], "test-file"))
+        embedded.clear()
+        asyncio.run(ingest_service.embed_save_job(["new", "a", "c", "c"], "test-file"))
+
+        assert embedded == ["new", "c"]
+        matches = asyncio.run(
+            vector_store.query(list(np.ones(1536)), "test-file", top_k=10)
+        )
+        assert sorted(match.metadata["text"] for match in matches) == [
+            "a",
+            "c",
+            "c",
+            "new",
+        ]
+
+    def test_embed_save_job_updates_moved_spans(self):
+        """Test unchanged chunks after a prepended paragraph get their new range."""
+
+        embedded = []
+        embedding_client = override_get_llm_embedding_client()
+        aembed_documents = embedding_client.aembed_documents
+
+        async def record_embedded(texts):
+            embedded.extend(texts)
+            return await aembed_documents(texts)
+
+        embedding_client.aembed_documents = record_embedded
+        vector_store = LocalVectorStore()
+        ingest_service = IngestService(
+            override_get_settings(),
+            vector_store,
+            embedding_client,
+        )
+
+        asyncio.run(ingest_service.embed_save_job(["a", "b"], "test-file"))
+        embedded.clear()
+        asyncio.run(ingest_service.embed_save_job(["new", "a", "b"], "test-file"))
+
+        assert embedded == ["new"]
+        matches = asyncio.run(
+            vector_store.query(list(np.ones(1536)), "test-file", top_k=10)
+        )
+        assert sorted(
+            (
+                match.metadata["text"],
+                match.metadata["paragraph_start"],
+                match.metadata["paragraph_end"],
+            )
+            for match in matches
+        ) == [("a", 1, 2), ("b", 2, 3), ("new", 0, 1)]
+
+    def test_embed_save_job_invalidates_searches(self):
+        """Test cached search results of the file are dropped once ingested."""
+
+        search_cache = Mock()
+        search_cache.invalidate_file = AsyncMock()
+        ingest_service = IngestService(
+            override_get_settings(),
+            LocalVectorStore(),
+            override_get_llm_embedding_client(),
+            search_cache=search_cache,
+        )
+
+        asyncio.run(ingest_service.embed_save_job(["a"], "test-file"))
+
+        search_cache.invalidate_file.assert_awaited_once_with("test-file")
+
+    def test_removed_paragraph_not_served_from_cache(self):
+        """Test a search cached before re-ingestion stops citing removed paragraphs."""
+
+        settings = override_get_settings()
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(
+            side_effect=lambda texts: [[1.0, 1.0] for _ in texts]
+        )
+        embedding_client.aembed_query = AsyncMock(return_value=[1.0, 1.0])
+        vector_store = LocalVectorStore()
+        search_cache = SearchResultCache(
+            settings, FakeRedis(), MemoryCache(0), CacheStats("memory", "redis")
+        )
+        search_service = SemanticSearchService(
+            settings, vector_store, embedding_client, search_cache
+        )
+        ingest_service = IngestService(
+            settings,
+            vector_store,
+            embedding_client,
+            search_cache=search_cache,
+        )
+
+        def search() -> list[str]:
+            results = asyncio.run(search_service.asearch("query", "test-file"))
+            return sorted(result["text"] for result in results)
+
+        asyncio.run(ingest_service.embed_save_job(["a", "b"], "test-file"))
+        assert search() == ["a", "b"]
+
+        asyncio.run(ingest_service.embed_save_job(["a"], "test-file"))
+
+        assert search() == ["a"]
+        assert embedding_client.aembed_query.await_count == 2
+
+    @patch(
+        "operations.ocr_service.OCRService.process_ocr",
+        lambda *args: {"paragraphs": [{"content": "a"}, {"content": "b"}]},
+    )
+    def test_ingest_embeds_ocr_results(self):
+        """Test the OCR paragraphs of a queued file are embedded."""
+
+        vector_store = LocalVectorStore()
+        ingest_service = IngestService(
+            override_get_settings(),
+            vector_store,
+            override_get_llm_embedding_client(),
+        )
+
+        asyncio.run(ingest_service.ingest("test-file"))
+
+        assert len(asyncio.run(vector_store.list_ids("test-file"))) == 2
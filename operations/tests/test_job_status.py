@@ -0,0 +1,67 @@
+"""Test ingestion job status module."""
+
+import asyncio
+import json
+
+from operations.job_status import JobStatusStore, new_job_status
+from operations.tests.test_ingest_queue import FakeStreams
+
+
+class TestJobStatusStore:
+    """Test JobStatusStore class."""
+
+    @staticmethod
+    def store() -> JobStatusStore:
+        """
+        Build a store over in memory Redis keys.
+
+        :return: job status store
+        """
+        return JobStatusStore(FakeStreams(), 60, 0.01)  # type: ignore[arg-type]
+
+    def test_update_unknown_job_is_ignored(self):
+        """Test updating an expired status does not recreate it."""
+        store = self.store()
+
+        async def run():
+            await store.update("job", state="running")
+            return await store.get("job")
+
+        assert asyncio.run(run()) is None
+
+    def test_wait_returns_once_done(self):
+        """Test waiting returns as soon as the job finishes."""
+        store = self.store()
+
+        async def finish():
+            await asyncio.sleep(0.03)
+            await store.update("job", state="done")
+
+        async def run():
+            status = new_job_status("job", "file.txt", "user")
+            await store.redis_client.set("ingest:job:job", json.dumps(status))
+            task = asyncio.create_task(finish())
+            status = await store.wait("job", 5)
+            await task
+            return status
+
+        assert asyncio.run(run())["state"] == "done"
+
+    def test_watch_yields_each_change(self):
+        """Test watching yields every status change until the job finishes."""
+        store = self.store()
+
+        async def work():
+            for state in ("running", "done"):
+                await asyncio.sleep(0.03)
+                await store.update("job", state=state)
+
+        async def run():
+            status = new_job_status("job", "file.txt", "user")
+            await store.redis_client.set("ingest:job:job", json.dumps(status))
+            task = asyncio.create_task(work())
+            states = [status["state"] async for status in store.watch("job", 5)]
+            await task
+            return states
+
+        assert asyncio.run(run()) == ["queued", "running", "done"]
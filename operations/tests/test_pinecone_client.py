@@ -0,0 +1,126 @@
+"""Test Pinecone client registry module."""
+
+from unittest.mock import Mock, patch
+
+import grpc
+import pytest
+from pinecone.exceptions import PineconeException
+
+from dependencies import get_pinecone_index
+from pinecone_client import PineconeClientRegistry, is_transport_failure
+
+
+class FakeRpcError(grpc.RpcError):
+    """gRPC error with a status code."""
+
+    def __init__(self, code: grpc.StatusCode):
+        self._code = code
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+
+def pinecone_error(code: grpc.StatusCode) -> PineconeException:
+    """
+    Build a Pinecone error raised from a gRPC error, as the gRPC client does.
+
+    :param code: gRPC status code
+    :return: Pinecone error
+    """
+    try:
+        raise PineconeException(code.name) from FakeRpcError(code)
+    except PineconeException as exc:
+        return exc
+
+
+class TestPineconeClientRegistry:
+    """Test PineconeClientRegistry class."""
+
+    @patch("pinecone_client.PineconeGRPC")
+    def test_start_warms_up_channels(self, pinecone_mock):
+        """
+        Test start opens and warms the configured number of channels.
+
+        :param pinecone_mock: patched PineconeGRPC client
+        """
+        pinecone_mock.return_value.Index.side_effect = lambda **kwargs: Mock()
+
+        registry = PineconeClientRegistry("key", "host", 1, 2)
+        registry.start()
+
+        assert registry.stats()["channels"] == 2
+        assert pinecone_mock.call_count == 1
+        first, second = registry.get_index(), registry.get_index()
+        assert first is not second
+        first.describe_index_stats.assert_called_once()
+
+    @patch("pinecone_client.PineconeGRPC")
+    def test_reconnect_replaces_failed_channel(self, pinecone_mock):
+        """
+        Test reconnect replaces the failed channel without closing it.
+
+        :param pinecone_mock: patched PineconeGRPC client
+        """
+        pinecone_mock.return_value.Index.side_effect = lambda **kwargs: Mock()
+
+        registry = PineconeClientRegistry("key", "host", 1, 1)
+        failed = registry.get_index()
+        registry.reconnect(failed)
+
+        assert registry.get_index() is not failed
+        assert registry.stats()["reconnects"] == 1
+        failed.close.assert_not_called()
+
+    @patch("pinecone_client.PineconeGRPC")
+    def test_warmup_failure_is_not_fatal(self, pinecone_mock):
+        """
+        Test failing warmup is recorded instead of raised.
+
+        :param pinecone_mock: patched PineconeGRPC client
+        """
+        index = Mock()
+        index.describe_index_stats.side_effect = PineconeException("unavailable")
+        pinecone_mock.return_value.Index.return_value = index
+
+        registry = PineconeClientRegistry("key", "host", 1, 1)
+        registry.start()
+
+        assert registry.stats()["warmup_failures"] == 1
+
+    def test_transport_failures(self):
+        """Test only unavailable channels and connection errors are transport failures."""
+        assert is_transport_failure(pinecone_error(grpc.StatusCode.UNAVAILABLE))
+        assert is_transport_failure(ConnectionResetError())
+        assert not is_transport_failure(
+            pinecone_error(grpc.StatusCode.INVALID_ARGUMENT)
+        )
+        assert not is_transport_failure(PineconeException("quota exceeded"))
+
+    @pytest.mark.parametrize(
+        "error, reconnects",
+        [
+            (pinecone_error(grpc.StatusCode.UNAVAILABLE), 1),
+            (pinecone_error(grpc.StatusCode.RESOURCE_EXHAUSTED), 0),
+        ],
+    )
+    @patch("dependencies.get_pinecone_registry")
+    def test_dependency_reconnects_on_transport_failure(
+        self, registry_mock, error, reconnects
+    ):
+        """
+        Test the index dependency replaces its channel on transport failures only.
+
+        :param registry_mock: patched registry getter
+        :param error: error raised by the request
+        :param reconnects: expected reconnects
+        """
+        registry = registry_mock.return_value
+        dependency = get_pinecone_index(Mock())
+        index = next(dependency)
+
+        with pytest.raises(PineconeException):
+            dependency.throw(error)
+
+        assert registry.reconnect.call_count == reconnects
+        if reconnects:
+            registry.reconnect.assert_called_once_with(index)
@@ -0,0 +1,417 @@
+"""Test semantic search service module."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+from conftest import override_get_async_redis_client, override_get_settings
+from metrics import CacheStats
+from operations.cache_keys import normalize_query
+from operations.embedding_cache import QueryEmbeddingCache, pack_vector, unpack_vector
+from operations.memory_cache import MemoryCache
+from operations.search_cache import CachedResults, SearchResultCache
+from operations.semantic_search_service import SemanticSearchService
+from operations.single_flight import SingleFlight, SingleFlightState
+from vector_stores import PineconeVectorStore
+
+
+class FakeRedis:
+    """Dictionary backed asyncio Redis client."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.expiries = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiries[key] = ex
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.sets.pop(key, None)
+
+    def pipeline(self, **kwargs):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Redis pipeline writing to a fake Redis client."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def set(self, key, value, ex=None):
+        self.redis_client.data[key] = value
+        self.redis_client.expiries[key] = ex
+
+    def sadd(self, key, member):
+        self.redis_client.sets.setdefault(key, set()).add(member)
+
+    def expire(self, key, seconds):
+        self.redis_client.expiries[key] = seconds
+
+    async def execute(self):
+        return []
+
+
+def build_search_service(embedding_client, redis_client=None):
+    """
+    Build a search service with a fresh query embedding cache.
+
+    :param embedding_client: embedding client mock
+    :param redis_client: asyncio Redis client mock
+    :return: search service and its embedding cache
+    """
+    settings = override_get_settings()
+    redis_client = redis_client or override_get_async_redis_client()
+    pinecone_index = Mock()
+    pinecone_index.query.return_value = Mock(
+        matches=[MagicMock(score=0.9, metadata={"text": "Sample matching text"})]
+    )
+    embedding_cache = QueryEmbeddingCache(
+        settings, redis_client, MemoryCache(10), CacheStats("memory", "redis")
+    )
+    search_cache = SearchResultCache(
+        settings, redis_client, MemoryCache(10), CacheStats("memory", "redis")
+    )
+    service = SemanticSearchService(
+        settings,
+        PineconeVectorStore(pinecone_index, settings.embedding_namespace),
+        embedding_client,
+        search_cache,
+        embedding_cache,
+    )
+    return service, embedding_cache
+
+
+class TestQueryEmbeddingCache:
+    """Test query embedding cache."""
+
+    def test_normalize_query(self):
+        """Test casing, width and whitespace variants normalize to one text."""
+        assert normalize_query("  Building,\tFLOORS  ") == "building, floors"
+        assert normalize_query("ＡＢＣ　建物") == "abc 建物"
+
+    def test_pack_unpack_vector(self):
+        """Test embeddings round trip through packed float32 bytes."""
+        data = pack_vector([0.5, -1.0, 2.0])
+
+        assert len(data) == 12
+        assert unpack_vector(data).tolist() == [0.5, -1.0, 2.0]
+
+    def test_embedding_shared_across_file_ids(self):
+        """Test one query embedded once when searched against many files."""
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        service, embedding_cache = build_search_service(embedding_client)
+
+        asyncio.run(service.asearch("Building", "file-1"))
+        asyncio.run(service.asearch(" building ", "file-2"))
+
+        embedding_client.aembed_query.assert_awaited_once_with("building")
+        assert embedding_cache.stats.snapshot()["memory_hits"] == 1
+
+    def test_embedding_read_from_redis(self):
+        """Test a Redis hit skips embedding and fills the memory tier."""
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock()
+        redis_client = Mock()
+        redis_client.get = AsyncMock(return_value=pack_vector([0.25, 0.5]))
+        service, embedding_cache = build_search_service(embedding_client, redis_client)
+
+        embedding = asyncio.run(service.aembed_query("building"))
+
+        assert embedding == [0.25, 0.5]
+        embedding_client.aembed_query.assert_not_awaited()
+        assert len(embedding_cache.memory_cache) == 1
+
+
+class TestSearchResultCache:
+    """Test two tier search result cache."""
+
+    def test_memory_cache_ttl_and_byte_cap(self, monkeypatch):
+        """
+        Test entries expire after the TTL and eviction keeps the byte cap.
+
+        :param monkeypatch: monkeypatch fixture
+        """
+        now = [100.0]
+        monkeypatch.setattr("operations.memory_cache.time.monotonic", lambda: now[0])
+        memory_cache = MemoryCache(10, ttl=5, max_bytes=10)
+
+        memory_cache.set("a", [1], size=6)
+        memory_cache.set("b", [2], size=6)
+        assert memory_cache.get("a") is None
+        assert memory_cache.get("b") == [2]
+        assert memory_cache.size_bytes == 6
+
+        now[0] += 5
+        assert memory_cache.get("b") is None
+        assert memory_cache.size_bytes == 0
+
+    def test_redis_hit_costs_one_round_trip(self):
+        """Test a Redis hit is read once then served from memory."""
+        redis_client = Mock()
+        results = [{"score": 1, "text": "t"}]
+        redis_client.get = AsyncMock(
+            return_value=json.dumps(
+                {"results": results, "computed_at": time.time(), "delta": 0}
+            ).encode()
+        )
+        search_cache = SearchResultCache(
+            override_get_settings(),
+            redis_client,
+            MemoryCache(10, ttl=60),
+            CacheStats("memory", "redis"),
+        )
+
+        first = asyncio.run(search_cache.get("key"))
+        second = asyncio.run(search_cache.get("key"))
+
+        assert first.results == second.results == [{"score": 1, "text": "t"}]
+        redis_client.get.assert_awaited_once_with("key")
+        stats = search_cache.stats.snapshot()
+        assert stats["redis_hits"] == 1 and stats["memory_hits"] == 1
+
+    def test_search_key_normalized_and_fixed_length(self):
+        """Test query variants share one hashed key scoped by file id."""
+        service, _ = build_search_service(Mock())
+
+        key = service.search_key("  Building FLOORS ", "file-1")
+
+        assert key == service.search_key("building floors", "file-1")
+        assert key != service.search_key("building floors", "file-2")
+        assert len(service.search_key("x" * 10_000, "file-1")) == len(key)
+        assert key.startswith("search:sample-embedding-name-space:")
+
+    def test_empty_results_cached_with_negative_ttl(self):
+        """Test a search without matches is cached briefly and not recomputed."""
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        redis_client = FakeRedis()
+        service, _ = build_search_service(embedding_client, redis_client)
+        service.vector_store.index.query.return_value = Mock(
+            matches=[MagicMock(score=0.5, metadata={"text": "Weak match"})]
+        )
+
+        first = asyncio.run(service.asearch("building", "file-1"))
+        second = asyncio.run(service.asearch("building", "file-1"))
+
+        assert first == second == []
+        service.vector_store.index.query.assert_called_once()
+        key = service.search_key("building", "file-1")
+        assert redis_client.expiries[key] == service.settings.search_negative_cache_exp
+        assert service.search_cache.memory_cache.get(key) is None
+
+    def test_invalidated_empty_results_recomputed(self):
+        """Test empty results of a file are searched again once it is ingested."""
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        redis_client = FakeRedis()
+        service, _ = build_search_service(embedding_client, redis_client)
+        index = service.vector_store.index
+        index.query.return_value = Mock(matches=[])
+        asyncio.run(service.asearch("building", "file-1"))
+        asyncio.run(service.asearch_files("building", ["file-1", "file-2"]))
+
+        asyncio.run(service.search_cache.invalidate_file("file-1"))
+        index.query.return_value = Mock(
+            matches=[MagicMock(score=0.9, metadata={"text": "Ingested"})]
+        )
+
+        assert asyncio.run(service.asearch("building", "file-1")) == [
+            {"score": 0.9, "text": "Ingested"}
+        ]
+        assert asyncio.run(service.asearch_files("building", ["file-1", "file-2"]))
+        assert index.query.call_count == 4
+
+    def test_negative_entry_has_no_grace(self):
+        """Test an empty entry expires with its negative TTL."""
+        search_cache = build_search_service(Mock())[0].search_cache
+        exp = search_cache.settings.search_negative_cache_exp
+        entry = CachedResults([], time.time() - exp, 0.0)
+
+        assert search_cache._expired(entry)
+        assert not search_cache._expired(entry._replace(results=[{"text": "t"}]))
+
+
+class TestBatchSearch:
+    """Test batch semantic search."""
+
+    def test_distinct_queries_embedded_in_one_request(self):
+        """Test a batch embeds each distinct normalized query once in one call."""
+        embedding_client = Mock()
+        embedding_client.aembed_documents = AsyncMock(
+            side_effect=lambda texts: [[0.1, 0.2] for _ in texts]
+        )
+        service, _ = build_search_service(embedding_client)
+
+        results = asyncio.run(
+            service.abatch_search(
+                [("Building", "file-1"), ("building", "file-2"), ("Walls", "file-1")]
+            )
+        )
+
+        embedding_client.aembed_documents.assert_awaited_once_with(
+            ["building", "walls"]
+        )
+        assert [result["error"] for result in results] == [None, None, None]
+        assert service.vector_store.index.query.call_count == 3
+
+
+class TestStaleWhileRevalidate:
+    """Test stale-while-revalidate of cached search results."""
+
+    @staticmethod
+    def build_cache(redis_value: bytes) -> SearchResultCache:
+        """
+        Build a search result cache reading a fixed Redis value.
+
+        :param redis_value: serialized cache entry returned by Redis
+        :return: search result cache
+        """
+        redis_client = Mock()
+        redis_client.get = AsyncMock(return_value=redis_value)
+        return SearchResultCache(
+            override_get_settings(),
+            redis_client,
+            MemoryCache(0),
+            CacheStats("memory", "redis"),
+        )
+
+    def test_stale_entry_served_and_refreshed(self):
+        """Test an entry past its TTL but within grace is served and refreshed."""
+        settings = override_get_settings()
+        computed_at = time.time() - settings.redis_cache_exp - 1
+        search_cache = self.build_cache(
+            json.dumps(
+                {"results": [{"text": "old"}], "computed_at": computed_at, "delta": 0}
+            ).encode()
+        )
+
+        entry = asyncio.run(search_cache.get("key"))
+
+        assert entry.results == [{"text": "old"}]
+        assert search_cache.should_refresh(entry)
+
+    def test_fresh_entry_not_refreshed_without_cost(self):
+        """Test a fresh entry with no computation cost is never refreshed early."""
+        search_cache = self.build_cache(
+            json.dumps({"results": [], "computed_at": time.time(), "delta": 0}).encode()
+        )
+
+        entry = asyncio.run(search_cache.get("key"))
+
+        assert not search_cache.should_refresh(entry)
+
+    def test_entry_past_grace_is_a_miss(self):
+        """Test an entry past the stale grace window is not served."""
+        settings = override_get_settings()
+        computed_at = (
+            time.time() - settings.redis_cache_exp - settings.search_stale_grace - 1
+        )
+        search_cache = self.build_cache(
+            json.dumps({"results": [], "computed_at": computed_at, "delta": 0}).encode()
+        )
+
+        assert asyncio.run(search_cache.get("key")) is None
+
+    def test_lease_wait_polls_not_counted(self):
+        """Test waiting on another worker's result records a single miss."""
+        settings = override_get_settings()
+        redis_client = FakeRedis()
+        redis_client.exists = AsyncMock(return_value=1)
+        service, _ = build_search_service(Mock(), redis_client)
+        service.single_flight = SingleFlight(
+            settings, redis_client, SingleFlightState()
+        )
+        key = service.search_key("q", "f")
+        redis_client.data[f"lease:{key}"] = "other-worker"
+        polls = []
+
+        async def get(name):
+            if name == key:
+                polls.append(name)
+                if len(polls) == 3:
+                    entry = CachedResults([{"text": "remote"}], time.time(), 0.0)
+                    return json.dumps(entry._asdict()).encode()
+            return redis_client.data.get(name)
+
+        async def set_lease(name, value, nx=False, px=None, ex=None):
+            return None
+
+        redis_client.get = get
+        redis_client.set = set_lease
+
+        assert asyncio.run(service.asearch("q", "f")) == [{"text": "remote"}]
+        assert len(polls) == 3
+        stats = service.search_cache.stats.snapshot()
+        assert stats["misses"] == 1 and stats["redis_hits"] == 0
+        assert service.single_flight.stats.snapshot()["remote_hits"] == 1
+
+    def test_stale_hit_schedules_background_refresh(self):
+        """Test asearch returns the stale entry and recomputes it once."""
+        settings = override_get_settings()
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        redis_client = override_get_async_redis_client()
+        service, _ = build_search_service(embedding_client, redis_client)
+        service.single_flight = SingleFlight(
+            settings, redis_client, SingleFlightState()
+        )
+        stale = CachedResults([{"text": "old"}], time.time() - 20, 0.0)
+        service.search_cache.memory_cache.set(service.search_key("q", "f"), stale)
+
+        async def run():
+            results = await service.asearch("q", "f")
+            await asyncio.gather(*service.single_flight.state.background)
+            return results
+
+        assert asyncio.run(run()) == [{"text": "old"}]
+        embedding_client.aembed_query.assert_awaited_once()
+        assert service.single_flight.stats.snapshot()["refreshes"] == 1
+
+    def test_refresh_skipped_when_already_refreshed(self):
+        """Test a refresh finding a newer stored entry does not recompute it."""
+        settings = override_get_settings()
+        embedding_client = Mock()
+        embedding_client.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        redis_client = override_get_async_redis_client()
+        service, _ = build_search_service(embedding_client, redis_client)
+        service.single_flight = SingleFlight(
+            settings, redis_client, SingleFlightState()
+        )
+        key = service.search_key("q", "f")
+        stale = CachedResults([{"text": "old"}], time.time() - 20, 0.0)
+        service.search_cache.memory_cache.set(key, stale)
+        # Refreshed by another worker since this one cached the stale entry.
+        fresh = CachedResults([{"text": "new"}], time.time(), 0.0)
+        redis_client.get = AsyncMock(return_value=json.dumps(fresh._asdict()))
+
+        async def run():
+            results = await service.asearch("q", "f")
+            await asyncio.gather(*service.single_flight.state.background)
+            return results
+
+        assert asyncio.run(run()) == [{"text": "old"}]
+        embedding_client.aembed_query.assert_not_awaited()
+        stats = service.single_flight.stats.snapshot()
+        assert stats["refreshes"] == 0 and stats["refresh_skips"] == 1
@@ -0,0 +1,97 @@
+"""Test single-flight request coalescing module."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from conftest import override_get_async_redis_client, override_get_settings
+from operations.single_flight import SingleFlight, SingleFlightState
+
+
+def build_single_flight(redis_client=None) -> SingleFlight:
+    """
+    Build a single-flight with fresh process state.
+
+    :param redis_client: asyncio Redis client mock
+    :return: single-flight
+    """
+    return SingleFlight(
+        override_get_settings(),
+        redis_client or override_get_async_redis_client(),
+        SingleFlightState(),
+    )
+
+
+class TestSingleFlight:
+    """Test SingleFlight class."""
+
+    def test_concurrent_callers_share_one_computation(self):
+        """Test concurrent callers of one key in a process compute once."""
+        single_flight = build_single_flight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        async def run():
+            return await asyncio.gather(
+                *(
+                    single_flight.do("key", compute, AsyncMock(return_value=None))
+                    for _ in range(5)
+                )
+            )
+
+        results = asyncio.run(run())
+
+        assert results == [["result"]] * 5
+        assert len(calls) == 1
+        assert single_flight.stats.snapshot()["joined"] == 4
+        assert not single_flight.inflight
+
+    def test_waits_for_other_worker_result(self):
+        """Test a caller without the lease reads the leader's stored result."""
+        redis_client = Mock()
+        redis_client.set = AsyncMock(return_value=None)
+        redis_client.exists = AsyncMock(return_value=1)
+        single_flight = build_single_flight(redis_client)
+        compute = AsyncMock()
+        lookup = AsyncMock(side_effect=[None, ["remote"]])
+
+        result = asyncio.run(single_flight.do("key", compute, lookup))
+
+        assert result == ["remote"]
+        compute.assert_not_awaited()
+        assert single_flight.stats.snapshot()["remote_hits"] == 1
+
+    def test_falls_back_after_bounded_wait(self):
+        """Test a caller computes itself when the leader never stores a result."""
+        redis_client = Mock()
+        redis_client.set = AsyncMock(return_value=None)
+        redis_client.exists = AsyncMock(return_value=1)
+        single_flight = build_single_flight(redis_client)
+        compute = AsyncMock(return_value=["local"])
+
+        result = asyncio.run(
+            single_flight.do("key", compute, AsyncMock(return_value=None))
+        )
+
+        assert result == ["local"]
+        assert single_flight.stats.snapshot()["fallbacks"] == 1
+
+    def test_leader_error_propagates(self):
+        """Test the leader's exception reaches the caller and clears state."""
+        single_flight = build_single_flight()
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(
+                single_flight.do(
+                    "key",
+                    AsyncMock(side_effect=RuntimeError()),
+                    AsyncMock(return_value=None),
+                )
+            )
+
+        assert not single_flight.inflight
@@ -0,0 +1,119 @@
+"""Test upsert batcher module."""
+
+import asyncio
+
+import pytest
+
+from operations.upsert_batcher import UpsertBatcher, record_bytes
+
+
+def record(vid: str, text: str = "text") -> dict:
+    """
+    Build a vector record.
+
+    :param vid: vector id
+    :param text: paragraph text
+    :return: vector record
+    """
+    return {"id": vid, "values": [0.0] * 4, "metadata": {"text": text}}
+
+
+class RecordingStore:
+    """Vector store recording upserted batches."""
+
+    def __init__(self, latency: float = 0.0, failures: int = 0):
+        self.latency = latency
+        self.failures = failures
+        self.batches: list = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def upsert(self, vectors):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("unavailable")
+            self.batches.append([vector["id"] for vector in vectors])
+        finally:
+            self.in_flight -= 1
+
+
+async def upsert_all(batcher: UpsertBatcher, records: list[dict], chunk: int):
+    """
+    Add records in chunks, then flush.
+
+    :param batcher: upsert batcher
+    :param records: vector records
+    :param chunk: records added at a time
+    :return: None
+    """
+    for idx in range(0, len(records), chunk):
+        await batcher.add(records[idx : idx + chunk])
+    await batcher.flush()
+
+
+class TestUpsertBatcher:
+    """Test UpsertBatcher class."""
+
+    def test_packs_by_count_without_losing_vectors(self):
+        """Test batches are filled up to the count across added chunks."""
+        store = RecordingStore()
+        batcher = UpsertBatcher(store, 4, 10**6, 2, 0)
+        records = [record(f"v{idx}") for idx in range(10)]
+
+        asyncio.run(upsert_all(batcher, records, 3))
+
+        assert [len(batch) for batch in store.batches] == [4, 4, 2]
+        assert sorted(vid for batch in store.batches for vid in batch) == sorted(
+            r["id"] for r in records
+        )
+        assert batcher.snapshot()["vectors"] == 10
+
+    def test_packs_by_size(self):
+        """Test batches stay under the byte limit, larger records go alone."""
+        store = RecordingStore()
+        records = [record(f"v{idx}", "x" * 100) for idx in range(6)]
+        records.insert(3, record("large", "x" * 1000))
+        limit = 3 * record_bytes(records[0])
+        batcher = UpsertBatcher(store, 100, limit, 1, 0)
+
+        asyncio.run(upsert_all(batcher, records, 10))
+
+        assert store.batches == [
+            ["v0", "v1", "v2"],
+            ["large"],
+            ["v3", "v4", "v5"],
+        ]
+
+    def test_caps_batches_in_flight(self):
+        """Test no more than the configured batches are upserted at once."""
+        store = RecordingStore(latency=0.01)
+        batcher = UpsertBatcher(store, 1, 10**6, 3, 0)
+
+        asyncio.run(upsert_all(batcher, [record(f"v{i}") for i in range(12)], 12))
+
+        assert store.peak_in_flight == 3
+        assert len(store.batches) == 12
+
+    def test_retries_failed_batch(self):
+        """Test a failed batch is retried on its own."""
+        store = RecordingStore(failures=1)
+        batcher = UpsertBatcher(store, 2, 10**6, 1, 2, retry_delay=0)
+
+        asyncio.run(upsert_all(batcher, [record(f"v{i}") for i in range(4)], 4))
+
+        assert store.batches == [["v0", "v1"], ["v2", "v3"]]
+        assert batcher.snapshot()["retries"] == 1
+
+    def test_raises_after_retries(self):
+        """Test a batch failing every attempt fails the batcher."""
+        store = RecordingStore(failures=3)
+        batcher = UpsertBatcher(store, 2, 10**6, 1, 2, retry_delay=0)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(upsert_all(batcher, [record(f"v{i}") for i in range(4)], 4))
+
+        assert batcher.snapshot()["vectors"] == 0
@@ -0,0 +1,198 @@
+"""Vector upsert batching module."""
+
+import asyncio
+import json
+import time
+
+from loguru import logger
+
+from metrics import Counters
+from vector_stores import VectorStore
+
+# Bytes a record costs on the wire besides its id, values and metadata.
+RECORD_OVERHEAD_BYTES = 32
+
+
+def record_bytes(record: dict) -> int:
+    """
+    Estimate the serialized size of a vector record.
+
+    Values are sent as 4 byte floats and metadata about as large as its
+    UTF-8 JSON encoding.
+
+    :param record: vector record
+    :return: estimated size in bytes
+    """
+    metadata = json.dumps(record.get("metadata", {}), ensure_ascii=False)
+    return (
+        len(record["id"].encode("utf-8"))
+        + 4 * len(record["values"])
+        + len(metadata.encode("utf-8"))
+        + RECORD_OVERHEAD_BYTES
+    )
+
+
+class UpsertBatcher:
+    """
+    Pack vector records into upsert batches bounded by count and size.
+
+    Records are buffered until the next one would take the batch over
+    `max_vectors` records or `max_bytes` estimated bytes, a record larger
+    than `max_bytes` on its own is sent alone. Up to `max_in_flight`
+    batches are upserted concurrently, adding records waits for a free
+    slot. A failed batch is retried on its own with exponential backoff,
+    the first batch failing every attempt fails the batcher.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        max_vectors: int,
+        max_bytes: int,
+        max_in_flight: int,
+        max_retries: int,
+        retry_delay: float = 0.5,
+    ):
+        """
+        Inject class dependencies.
+
+        :param vector_store: vector store the records are upserted to
+        :param max_vectors: records per batch
+        :param max_bytes: estimated bytes per batch
+        :param max_in_flight: batches upserted concurrently
+        :param max_retries: retries of a failed batch
+        :param retry_delay: seconds before the first retry, doubled on every retry
+        """
+        self.vector_store = vector_store
+        self.max_vectors = max_vectors
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.stats = Counters("batches", "vectors", "bytes", "retries")
+        self.batch_seconds: list[float] = []
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: set[asyncio.Task] = set()
+        self._error: BaseException | None = None
+        self._pending: list[dict] = []
+        self._pending_bytes = 0
+        self._started: float | None = None
+        self._finished = 0.0
+
+    async def add(self, records: list[dict]):
+        """
+        Buffer records, sending every batch filled.
+
+        :param records: vector records
+        :return: None
+        """
+        for record in records:
+            size = record_bytes(record)
+            if self._pending and self._pending_bytes + size > self.max_bytes:
+                await self._send_pending()
+
+            self._pending.append(record)
+            self._pending_bytes += size
+            if len(self._pending) >= self.max_vectors:
+                await self._send_pending()
+
+    async def flush(self):
+        """
+        Send the buffered records and wait for every batch in flight.
+
+        :return: None
+        """
+        if self._pending:
+            await self._send_pending()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._error is not None:
+            raise self._error
+
+    def cancel(self):
+        """
+        Cancel the batches in flight, a no-op once flushed.
+
+        :return: None
+        """
+        for task in self._tasks:
+            task.cancel()
+
+    async def _send_pending(self):
+        """
+        Start upserting the buffered records once a slot frees up.
+
+        :return: None
+        """
+        batch, size = self._pending, self._pending_bytes
+        self._pending, self._pending_bytes = [], 0
+        if self._started is None:
+            self._started = time.perf_counter()
+
+        await self._slots.acquire()
+        if self._error is not None:
+            self._slots.release()
+            raise self._error
+
+        task = asyncio.create_task(self._upsert(batch, size))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        """
+        Free the slot of a finished batch and keep its failure.
+
+        :param task: batch upsert task
+        :return: None
+        """
+        self._tasks.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception() and self._error is None:
+            self._error = task.exception()
+
+    async def _upsert(self, batch: list[dict], size: int):
+        """
+        Upsert a batch, retrying it on failure.
+
+        :param batch: vector records
+        :param size: estimated batch size in bytes
+        :return: None
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await self.vector_store.upsert(batch)
+                break
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    logger.error(f"Upsert of {len(batch)} vectors failed: {exc}")
+                    raise
+                logger.warning(
+                    f"Upsert of {len(batch)} vectors failed, retrying: {exc}"
+                )
+                self.stats.increment("retries")
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+
+        self._finished = time.perf_counter()
+        elapsed = self._finished - start
+        self.batch_seconds.append(elapsed)
+        self.stats.increment("batches")
+        self.stats.increment("vectors", len(batch))
+        self.stats.increment("bytes", size)
+        logger.debug(f"Upserted {len(batch)} vectors, {size} bytes in {elapsed:.3f}s")
+
+    def snapshot(self) -> dict:
+        """
+        Batch latency and throughput statistics.
+
+        :return: statistics dictionary
+        """
+        stats = self.stats.snapshot()
+        batches = len(self.batch_seconds)
+        wall = self._finished - self._started if self._started is not None else 0.0
+        return {
+            **stats,
+            "batch_seconds_avg": sum(self.batch_seconds) / batches if batches else 0.0,
+            "batch_seconds_max": max(self.batch_seconds, default=0.0),
+            "vectors_per_second": stats["vectors"] / wall if wall > 0 else 0.0,
+            "bytes_per_second": stats["bytes"] / wall if wall > 0 else 0.0,
+        }
@@ -0,0 +1,56 @@
+"""User file ownership operations module."""
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.user import User, UserFile
+
+
+class UserFileOperations:
+    """User file ownership operations class."""
+
+    def __init__(self, session: Session):
+        """
+        Inject class dependencies.
+
+        :param session: Database session
+        """
+        self.session = session
+
+    def add(self, user: User, file_id: str):
+        """
+        Record a file processed for a user, recording it again is a no-op.
+
+        :param user: file owner
+        :param file_id: file id
+        :return: None
+        """
+        exists = (
+            self.session.query(UserFile.id)
+            .filter(UserFile.user_id == user.id, UserFile.file_id == file_id)
+            .first()
+        )
+        if exists is not None:
+            return
+
+        try:
+            self.session.add(UserFile(user_id=user.id, file_id=file_id))
+            self.session.commit()
+        except IntegrityError:
+            # Recorded concurrently by another request.
+            self.session.rollback()
+
+    def file_ids(self, user: User) -> list[str]:
+        """
+        List the files processed for a user.
+
+        :param user: file owner
+        :return: file ids, oldest first
+        """
+        rows = (
+            self.session.query(UserFile.file_id)
+            .filter(UserFile.user_id == user.id)
+            .order_by(UserFile.id)
+            .all()
+        )
+        return [row.file_id for row in rows]
@@ -0,0 +1,193 @@
+"""Pinecone client module."""
+
+import itertools
+import threading
+from functools import lru_cache
+
+import grpc
+from loguru import logger
+from pinecone import Pinecone
+from pinecone.exceptions import PineconeException
+from pinecone.grpc import PineconeGRPC
+
+from metrics import register_metrics
+from settings import Settings
+
+
+def is_transport_failure(exc: BaseException) -> bool:
+    """
+    Whether an error, or an error it was raised from, means the channel is broken.
+
+    Only an unavailable gRPC channel or a failed connection is a transport
+    failure, request errors such as invalid arguments or quota errors are not.
+
+    :param exc: raised error
+    :return: True when the channel should be replaced
+    """
+    error: BaseException | None = exc
+    while error is not None:
+        if isinstance(error, ConnectionError):
+            return True
+        if (
+            isinstance(error, grpc.RpcError)
+            and callable(getattr(error, "code", None))
+            and error.code() == grpc.StatusCode.UNAVAILABLE
+        ):
+            return True
+        error = error.__cause__
+    return False
+
+
+class PineconeClientRegistry:
+    """Process wide Pinecone gRPC client holding a pool of warm index channels."""
+
+    def __init__(self, api_key: str, host: str, pool_threads: int, channel_count: int):
+        """
+        Initialize registry configuration, channels are opened on `start`.
+
+        :param api_key: Pinecone API key
+        :param host: Pinecone index host
+        :param pool_threads: Pinecone client thread pool size
+        :param channel_count: number of gRPC index channels kept open
+        """
+        self.api_key = api_key
+        self.host = host
+        self.pool_threads = pool_threads
+        self.channel_count = max(channel_count, 1)
+        self._lock = threading.Lock()
+        self._client: PineconeGRPC | None = None
+        self._indexes: list[Pinecone.Index] = []
+        self._round_robin = itertools.count()
+        self.reconnects = 0
+        self.warmup_failures = 0
+
+    def _open_index(self) -> Pinecone.Index:
+        """
+        Open a new gRPC index channel.
+
+        :return: Pinecone index instance
+        """
+        if self._client is None:
+            self._client = PineconeGRPC(
+                api_key=self.api_key, pool_threads=self.pool_threads
+            )
+        return self._client.Index(host=self.host)
+
+    def _warmup(self, index: Pinecone.Index):
+        """
+        Establish the channel connection and TLS session ahead of requests.
+
+        :param index: Pinecone index instance
+        :return: None
+        """
+        try:
+            index.describe_index_stats()
+        except PineconeException as exc:
+            self.warmup_failures += 1
+            logger.warning(f"Pinecone channel warmup failed: {exc}")
+
+    def start(self, warmup: bool = True):
+        """
+        Open the pool of index channels.
+
+        :param warmup: whether to warm each channel with a round-trip
+        :return: None
+        """
+        with self._lock:
+            while len(self._indexes) < self.channel_count:
+                self._indexes.append(self._open_index())
+            indexes = list(self._indexes)
+
+        if warmup:
+            logger.info(f"Warming up {len(indexes)} Pinecone channel(s)")
+            for index in indexes:
+                self._warmup(index)
+
+    def get_index(self) -> Pinecone.Index:
+        """
+        Get the next index channel from the pool.
+
+        :return: Pinecone index instance
+        """
+        if len(self._indexes) < self.channel_count:
+            self.start(warmup=False)
+
+        indexes = self._indexes
+        return indexes[next(self._round_robin) % len(indexes)]
+
+    def reconnect(self, index: Pinecone.Index):
+        """
+        Replace a failed index channel with a freshly opened one.
+
+        The failed channel is not closed, requests still running on it finish
+        and it is closed once garbage collected.
+
+        :param index: failed Pinecone index instance
+        :return: None
+        """
+        with self._lock:
+            if index not in self._indexes:
+                return
+
+            logger.warning("Reconnecting failed Pinecone channel")
+            position = self._indexes.index(index)
+            self._indexes[position] = self._open_index()
+            self.reconnects += 1
+
+    def close(self):
+        """
+        Close every index channel.
+
+        :return: None
+        """
+        with self._lock:
+            indexes, self._indexes = self._indexes, []
+
+        for index in indexes:
+            index.close()
+
+    def stats(self) -> dict:
+        """
+        Get registry statistics.
+
+        :return: statistics dictionary
+        """
+        return {
+            "channels": len(self._indexes),
+            "channel_count": self.channel_count,
+            "reconnects": self.reconnects,
+            "warmup_failures": self.warmup_failures,
+        }
+
+
+@lru_cache
+def _build_pinecone_registry(
+    api_key: str, host: str, pool_threads: int, channel_count: int
+) -> PineconeClientRegistry:
+    """
+    Build the process wide Pinecone client registry.
+
+    :param api_key: Pinecone API key
+    :param host: Pinecone index host
+    :param pool_threads: Pinecone client thread pool size
+    :param channel_count: number of gRPC index channels kept open
+    :return: Pinecone client registry
+    """
+    registry = PineconeClientRegistry(api_key, host, pool_threads, channel_count)
+    register_metrics("pinecone", registry.stats)
+    return registry
+
+
+def get_pinecone_registry(settings: Settings) -> PineconeClientRegistry:
+    """
+    Get the Pinecone client registry shared by the worker process.
+
+    :param settings: Application settings
+    :return: Pinecone client registry
+    """
+    return _build_pinecone_registry(
+        settings.pinecone_api_key,
+        settings.pinecone_host,
+        settings.pinecone_pool_count,
+        settings.pinecone_channel_count,
+    )
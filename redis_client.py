@@ -0,0 +1,131 @@
+"""Redis client module."""
+
+from functools import lru_cache
+
+import redis  # type: ignore[import-untyped]
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+
+from metrics import PoolStats, register_metrics
+from settings import Settings
+
+
+class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+    """Blocking connection pool that records checkout wait times."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self._checked_out = set()
+
+    def get_connection(self, command_name, *keys, **options):
+        with self.stats.measure_checkout():
+            connection = super().get_connection(command_name, *keys, **options)
+        self._checked_out.add(connection)
+        return connection
+
+    def release(self, connection):
+        if connection in self._checked_out:
+            self._checked_out.discard(connection)
+            self.stats.record_release()
+        super().release(connection)
+
+
+class InstrumentedAsyncBlockingConnectionPool(aioredis.BlockingConnectionPool):
+    """Asyncio blocking connection pool that records checkout wait times."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self._checked_out = set()
+
+    async def get_connection(self, command_name, *keys, **options):
+        with self.stats.measure_checkout():
+            connection = await super().get_connection(command_name, *keys, **options)
+        self._checked_out.add(connection)
+        return connection
+
+    async def release(self, connection):
+        if connection in self._checked_out:
+            self._checked_out.discard(connection)
+            self.stats.record_release()
+        await super().release(connection)
+
+
+def _pool_metrics(pool) -> dict:
+    """
+    Build pool saturation metrics.
+
+    :param pool: instrumented connection pool
+    :return: metrics dictionary
+    """
+    snapshot = pool.stats.snapshot()
+    return {
+        "max_connections": pool.max_connections,
+        "saturation": snapshot["in_use"] / pool.max_connections,
+        **snapshot,
+    }
+
+
+def _pool_kwargs(settings: Settings) -> dict:
+    """
+    Connection pool keyword arguments from settings.
+
+    :param settings: Application settings
+    :return: connection pool keyword arguments
+    """
+    return {
+        "host": settings.redis_host,
+        "port": settings.redis_port,
+        "db": settings.redis_cache_db,
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_pool_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout,
+    }
+
+
+@lru_cache
+def _build_redis_pool(**pool_kwargs) -> InstrumentedBlockingConnectionPool:
+    """
+    Build the process wide Redis connection pool.
+
+    :param pool_kwargs: connection pool keyword arguments
+    :return: Redis connection pool
+    """
+    pool = InstrumentedBlockingConnectionPool(**pool_kwargs)
+    register_metrics("redis", lambda: _pool_metrics(pool))
+    return pool
+
+
+@lru_cache
+def _build_async_redis_pool(**pool_kwargs) -> InstrumentedAsyncBlockingConnectionPool:
+    """
+    Build the process wide asyncio Redis connection pool.
+
+    :param pool_kwargs: connection pool keyword arguments
+    :return: asyncio Redis connection pool
+    """
+    pool = InstrumentedAsyncBlockingConnectionPool(**pool_kwargs)
+    register_metrics("redis_async", lambda: _pool_metrics(pool))
+    return pool
+
+
+def get_redis_pool(settings: Settings) -> InstrumentedBlockingConnectionPool:
+    """
+    Get the Redis connection pool shared by the worker process.
+
+    :param settings: Application settings
+    :return: Redis connection pool
+    """
+    return _build_redis_pool(**_pool_kwargs(settings))
+
+
+def get_async_redis_pool(settings: Settings) -> InstrumentedAsyncBlockingConnectionPool:
+    """
+    Get the asyncio Redis connection pool shared by the worker process.
+
+    :param settings: Application settings
+    :return: asyncio Redis connection pool
+    """
+    return _build_async_redis_pool(**_pool_kwargs(settings))
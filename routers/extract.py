@@ -1,46 +1,131 @@
 """Extract API endpoint module."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 
+from database import get_db_session
 from dependencies import (
     get_current_user,
     get_llm_embedding_client,
-    get_pinecone_index,
-    get_redis_client,
+    get_query_embedding_cache,
+    get_search_cache,
+    get_single_flight,
+    get_vector_store,
+)
+from models.requests import BatchExtractRequest, ExtractRequest
+from models.response import (
+    BaseDataResponse,
+    BatchExtractItemResponse,
+    BatchExtractResponse,
 )
-from models.requests import ExtractRequest
-from models.response import BaseDataResponse
 from operations.semantic_search_service import SemanticSearchService
+from operations.user_files import UserFileOperations
 from settings import Settings, get_settings
 
 router = APIRouter()
 
 
 @router.post("/extract")
-def extract_related_words(
+async def extract_related_words(
     request_payload: ExtractRequest,
     settings: Settings = Depends(get_settings),
-    _=Depends(get_current_user),
-    pinecone_index=Depends(get_pinecone_index),
+    user=Depends(get_current_user),
+    session: Session = Depends(get_db_session),
+    vector_store=Depends(get_vector_store),
     llm_embedding_client=Depends(get_llm_embedding_client),
-    redis_client=Depends(get_redis_client),
+    search_cache=Depends(get_search_cache),
+    embedding_cache=Depends(get_query_embedding_cache),
+    single_flight=Depends(get_single_flight),
 ) -> BaseDataResponse:
     """
     Extract related words based on given File ID and query text.
 
+    With a list of File IDs, or all files processed for the user, the query
+    text is embedded once and the best paragraphs across those files are
+    returned with the File ID they belong to.
+
     :param request_payload: type ExtractRequest
-    :param _: Auth dependency
+    :param user: Auth dependency, owner of the searched files
+    :param session: Database session dependency
     :param settings: Application settings dependency
-    :param pinecone_index: Pinecone index dependency
+    :param vector_store: vector store dependency
     :param llm_embedding_client: OpenAI llm embedding client dependency
-    :param redis_client: Redis client dependency
+    :param search_cache: search result cache dependency
+    :param embedding_cache: query embedding cache dependency
+    :param single_flight: request coalescing dependency
     :return: BaseDataResponse - list of extracted paragraphs related to search term
     """
     search_service = SemanticSearchService(
-        settings, pinecone_index, llm_embedding_client, redis_client
+        settings,
+        vector_store,
+        llm_embedding_client,
+        search_cache,
+        embedding_cache,
+        single_flight,
     )
-    match_texts = search_service.search(
-        request_payload.query_text, request_payload.file_id
+
+    if request_payload.file_id is not None:
+        match_texts = await search_service.asearch(
+            request_payload.query_text, request_payload.file_id
+        )
+        return BaseDataResponse(data=match_texts)
+
+    if request_payload.all_files:
+        file_ids = await run_in_threadpool(UserFileOperations(session).file_ids, user)
+    else:
+        file_ids = request_payload.file_ids or []
+
+    if len(set(file_ids)) > settings.extract_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum number of searched files: {settings.extract_max_files}",
+        )
+
+    match_texts = await search_service.asearch_files(
+        request_payload.query_text, file_ids
     )
 
     return BaseDataResponse(data=match_texts)
+
+
+@router.post("/extract/batch")
+async def batch_extract_related_words(
+    request_payload: BatchExtractRequest,
+    settings: Settings = Depends(get_settings),
+    _=Depends(get_current_user),
+    vector_store=Depends(get_vector_store),
+    llm_embedding_client=Depends(get_llm_embedding_client),
+    search_cache=Depends(get_search_cache),
+    embedding_cache=Depends(get_query_embedding_cache),
+) -> BatchExtractResponse:
+    """
+    Extract related words for many query text and File ID pairs in one request.
+
+    :param request_payload: type BatchExtractRequest
+    :param _: Auth dependency
+    :param settings: Application settings dependency
+    :param vector_store: vector store dependency
+    :param llm_embedding_client: OpenAI llm embedding client dependency
+    :param search_cache: search result cache dependency
+    :param embedding_cache: query embedding cache dependency
+    :return: BatchExtractResponse - extracted paragraphs or error per item in request order
+    """
+    if len(request_payload.items) > settings.extract_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum number of batch items: {settings.extract_batch_max_items}",
+        )
+
+    search_service = SemanticSearchService(
+        settings, vector_store, llm_embedding_client, search_cache, embedding_cache
+    )
+    items = [(item.query_text, item.file_id) for item in request_payload.items]
+    results = await search_service.abatch_search(items)
+
+    return BatchExtractResponse(
+        data=[
+            BatchExtractItemResponse(query_text=query_text, file_id=file_id, **result)
+            for (query_text, file_id), result in zip(items, results)
+        ]
+    )
@@ -0,0 +1,20 @@
+"""Metrics API endpoint module."""
+
+from fastapi import APIRouter, Depends
+
+from dependencies import get_current_user
+from metrics import collect_metrics
+from models.response import MetricsResponse
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics(_=Depends(get_current_user)) -> MetricsResponse:
+    """
+    Expose connection pool and cache metrics of the current worker process.
+
+    :param _: Auth dependency
+    :return: MetricsResponse - metrics grouped by component
+    """
+    return MetricsResponse(data=collect_metrics())
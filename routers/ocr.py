@@ -1,43 +1,139 @@
 """OCR API Endpoint module."""
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, status
+import json
 
-from dependencies import get_current_user, get_llm_embedding_client, get_pinecone_index
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from database import get_db_session
+from dependencies import get_current_user, get_ingest_queue, get_job_status_store
 from models.requests import OCRRequestURLs
+from models.response import IngestJobResponse, IngestJobStatusResponse
+from operations.ingest_queue import IngestQueue
+from operations.job_status import JobStatusStore
 from operations.ocr_service import OCRService
+from operations.user_files import UserFileOperations
 from rate_limit_config import limiter
 from settings import Settings, get_settings
 
 router = APIRouter()
 
 
-@router.post("/ocr")
+@router.post("/ocr", status_code=status.HTTP_202_ACCEPTED)
 @limiter.limit("5/minute")
 @limiter.limit("10/hour")
 def process_ocr(
     request: Request,
-    background_tasks: BackgroundTasks,
     payload: OCRRequestURLs,
     settings: Settings = Depends(get_settings),
-    _=Depends(get_current_user),
-    pinecone_index=Depends(get_pinecone_index),
-    llm_embedding_client=Depends(get_llm_embedding_client),
-):
+    user=Depends(get_current_user),
+    session: Session = Depends(get_db_session),
+    ingest_queue: IngestQueue = Depends(get_ingest_queue),
+    idempotency_key: str | None = Header(default=None, max_length=255),
+) -> JSONResponse:
     """
-    A mock OCR endpoint that processes OCR results
-    embeds texts and saves it to Pinecone vector database.
+    A mock OCR endpoint that processes OCR results and queues
+    the embedding of its texts into the vector store.
+
+    A request repeating the file and content of a queued, running or done
+    job, or its `Idempotency-Key` header, gets that job instead of a new one.
 
-    :param background_tasks: dependency for background tasks
     :param request: Request object required for rate limiting
     :param payload: payload of type OCRRequestURLs
     :param settings: Application settings dependency
-    :param _: Auth dependency
-    :param pinecone_index: Pinecone index dependency
-    :param llm_embedding_client: OpenAI llm embedding client dependency
-    :return:
+    :param user: Auth dependency, owner of the processed file
+    :param session: Database session dependency
+    :param ingest_queue: ingestion job queue dependency
+    :param idempotency_key: client idempotency key header
+    :return: IngestJobResponse - id of the queued ingestion job
+    """
+    file_id, content_version = OCRService(settings, payload.url).process_url()
+    UserFileOperations(session).add(user, file_id)
+    job_id, duplicate = ingest_queue.enqueue(
+        file_id, str(user.id), content_version, idempotency_key
+    )
+    body = IngestJobResponse(job_id=job_id, file_id=file_id, duplicate=duplicate)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=body.model_dump(),
+        headers={"Location": str(request.url_for("get_ingest_job", job_id=job_id))},
+    )
+
+
+async def _get_user_job(job_status_store: JobStatusStore, job_id: str, user) -> dict:
     """
-    ocr_service = OCRService(
-        settings, payload.url, pinecone_index, llm_embedding_client, background_tasks
+    Get the status of an ingestion job queued by the user.
+
+    :param job_status_store: job status store
+    :param job_id: ingestion job id
+    :param user: user who queued the job
+    :return: job status
+    """
+    job_status = await job_status_store.get(job_id)
+    if job_status is None or job_status["user_id"] != str(user.id):
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job_status
+
+
+@router.get("/ocr/jobs/{job_id}")
+async def get_ingest_job(
+    job_id: str,
+    wait: float = Query(default=0, ge=0),
+    settings: Settings = Depends(get_settings),
+    user=Depends(get_current_user),
+    job_status_store: JobStatusStore = Depends(get_job_status_store),
+) -> IngestJobStatusResponse:
+    """
+    Get the state, progress and stage timings of an ingestion job.
+
+    With `wait`, the response is held until the job is done or failed, for
+    at most `wait` seconds capped to `ingest_job_max_wait`.
+
+    :param job_id: ingestion job id
+    :param wait: seconds to wait for the job to finish
+    :param settings: Application settings dependency
+    :param user: Auth dependency, owner of the job
+    :param job_status_store: job status store dependency
+    :return: IngestJobStatusResponse - ingestion job status
+    """
+    job_status = await _get_user_job(job_status_store, job_id, user)
+    if wait:
+        timeout = min(wait, settings.ingest_job_max_wait)
+        job_status = await job_status_store.wait(job_id, timeout) or job_status
+    return IngestJobStatusResponse(**job_status)
+
+
+@router.get("/ocr/jobs/{job_id}/events")
+async def stream_ingest_job(
+    job_id: str,
+    settings: Settings = Depends(get_settings),
+    user=Depends(get_current_user),
+    job_status_store: JobStatusStore = Depends(get_job_status_store),
+) -> StreamingResponse:
+    """
+    Stream the status of an ingestion job as Server-Sent Events.
+
+    An event is sent on each status change until the job is done or failed,
+    or `ingest_job_stream_timeout` seconds have passed.
+
+    :param job_id: ingestion job id
+    :param settings: Application settings dependency
+    :param user: Auth dependency, owner of the job
+    :param job_status_store: job status store dependency
+    :return: StreamingResponse - `text/event-stream` of job statuses
+    """
+    await _get_user_job(job_status_store, job_id, user)
+
+    async def events():
+        async for job_status in job_status_store.watch(
+            job_id, settings.ingest_job_stream_timeout
+        ):
+            body = IngestJobStatusResponse(**job_status).model_dump()
+            yield f"event: {job_status['state']}\ndata: {json.dumps(body)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
     )
-    ocr_service.process_url()
-    return Response(status_code=status.HTTP_202_ACCEPTED)
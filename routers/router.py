@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from routers import auth, extract, ocr, upload
+from routers import auth, extract, metrics, ocr, upload
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -10,3 +10,4 @@ api_router.include_router(extract.router)
 api_router.include_router(ocr.router)
 api_router.include_router(upload.router)
 api_router.include_router(auth.router)
+api_router.include_router(metrics.router)
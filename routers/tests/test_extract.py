@@ -1,8 +1,14 @@
 """Test Extract module."""
 
-from unittest.mock import MagicMock, Mock
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, Mock
 
-from dependencies import get_pinecone_index, get_redis_client
+from conftest import override_get_current_user
+from dependencies import get_async_redis_client, get_vector_store
+from models.user import UserFile
+from vector_stores import PineconeVectorStore
 
 
 class TestExtractAPI:
@@ -43,7 +49,9 @@ class TestExtractAPI:
         mock_pinecone.query.return_value = Mock(
             matches=[MagicMock(score=1, metadata={"text": "Sample matching text"})]
         )
-        app.dependency_overrides[get_pinecone_index] = lambda: mock_pinecone
+        app.dependency_overrides[get_vector_store] = lambda: PineconeVectorStore(
+            mock_pinecone, "sample-embedding-name-space"
+        )
 
         response = test_client.post(
             "/api/v1/extract",
@@ -64,8 +72,13 @@ class TestExtractAPI:
         test_client, app = login_client
 
         mock_redis = Mock()
-        mock_redis.get = lambda *args: b'[{"score": 1, "text": "Sample matching text"}]'
-        app.dependency_overrides[get_redis_client] = lambda: mock_redis
+        results = [{"score": 1, "text": "Sample matching text"}]
+        mock_redis.get = AsyncMock(
+            return_value=json.dumps(
+                {"results": results, "computed_at": time.time(), "delta": 0}
+            ).encode()
+        )
+        app.dependency_overrides[get_async_redis_client] = lambda: mock_redis
 
         response = test_client.post(
             "/api/v1/extract",
@@ -78,3 +91,184 @@ class TestExtractAPI:
         assert response.json() == {
             "data": [{"score": 1, "text": "Sample matching text"}]
         }
+
+    def test_extract_many_files_single_query(self, login_client):
+        """
+        Test Extract API searches a list of files with one filtered query.
+
+        :param login_client: login client fixture
+        """
+        test_client, app = login_client
+
+        mock_pinecone = Mock()
+        mock_pinecone.query.return_value = Mock(
+            matches=[
+                MagicMock(score=0.9, metadata={"text": "First", "file_id": "file-2"}),
+                MagicMock(score=0.85, metadata={"text": "Second", "file_id": "file-1"}),
+                MagicMock(score=0.5, metadata={"text": "Weak", "file_id": "file-1"}),
+            ]
+        )
+        app.dependency_overrides[get_vector_store] = lambda: PineconeVectorStore(
+            mock_pinecone, "sample-embedding-name-space"
+        )
+
+        response = test_client.post(
+            "/api/v1/extract",
+            json={"query_text": "Sample", "file_ids": ["file-2", "file-1", "file-2"]},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "data": [
+                {"score": 0.9, "text": "First", "file_id": "file-2"},
+                {"score": 0.85, "text": "Second", "file_id": "file-1"},
+            ]
+        }
+        mock_pinecone.query.assert_called_once()
+        assert mock_pinecone.query.call_args.kwargs["filter"] == {
+            "file_id": {"$in": ["file-1", "file-2"]}
+        }
+
+    def test_extract_all_files(self, login_client, db_session):
+        """
+        Test Extract API searches every file processed for the user.
+
+        :param login_client: login client fixture
+        :param db_session: database session fixture
+        """
+        test_client, app = login_client
+
+        mock_pinecone = Mock()
+        mock_pinecone.query.return_value = Mock(matches=[])
+        app.dependency_overrides[get_vector_store] = lambda: PineconeVectorStore(
+            mock_pinecone, "sample-embedding-name-space"
+        )
+
+        response = test_client.post(
+            "/api/v1/extract", json={"query_text": "Sample", "all_files": True}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"data": []}
+        mock_pinecone.query.assert_not_called()
+
+        db_session.add_all(
+            [
+                UserFile(user_id=override_get_current_user().id, file_id="mine.json"),
+                UserFile(user_id=uuid.uuid4(), file_id="other.json"),
+            ]
+        )
+        db_session.commit()
+
+        response = test_client.post(
+            "/api/v1/extract", json={"query_text": "Sample", "all_files": True}
+        )
+
+        assert response.status_code == 200
+        assert mock_pinecone.query.call_args.kwargs["filter"] == {
+            "file_id": {"$in": ["mine.json"]}
+        }
+
+    def test_extract_requires_single_scope(self, login_client):
+        """
+        Test Extract API rejects requests without exactly one file scope.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+
+        for payload in (
+            {"query_text": "Sample"},
+            {"query_text": "Sample", "file_id": "file", "all_files": True},
+            {"query_text": "Sample", "file_ids": []},
+        ):
+            response = test_client.post("/api/v1/extract", json=payload)
+            assert response.status_code == 422
+
+    def test_extract_too_many_files(self, login_client):
+        """
+        Test Extract API rejects searches over the configured maximum of files.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+
+        response = test_client.post(
+            "/api/v1/extract",
+            json={"query_text": "Sample", "file_ids": ["a", "b", "c", "d"]},
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Maximum number of searched files: 3"}
+
+    def test_batch_extract_results_in_request_order(self, login_client):
+        """
+        Test Batch Extract API returns results and errors in request order.
+
+        :param login_client: login client fixture
+        """
+        test_client, app = login_client
+
+        def query(**kwargs):
+            if kwargs["filter"]["file_id"]["$eq"] == "broken-file":
+                raise RuntimeError("unavailable")
+            return Mock(
+                matches=[MagicMock(score=1, metadata={"text": "Sample matching text"})]
+            )
+
+        mock_pinecone = Mock()
+        mock_pinecone.query.side_effect = query
+        app.dependency_overrides[get_vector_store] = lambda: PineconeVectorStore(
+            mock_pinecone, "sample-embedding-name-space"
+        )
+
+        response = test_client.post(
+            "/api/v1/extract/batch",
+            json={
+                "items": [
+                    {"query_text": "Sample", "file_id": "file-1"},
+                    {"query_text": "Sample", "file_id": "broken-file"},
+                    {"query_text": "Other", "file_id": "file-1"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "data": [
+                {
+                    "query_text": "Sample",
+                    "file_id": "file-1",
+                    "data": [{"score": 1, "text": "Sample matching text"}],
+                    "error": None,
+                },
+                {
+                    "query_text": "Sample",
+                    "file_id": "broken-file",
+                    "data": None,
+                    "error": "Vector search failed",
+                },
+                {
+                    "query_text": "Other",
+                    "file_id": "file-1",
+                    "data": [{"score": 1, "text": "Sample matching text"}],
+                    "error": None,
+                },
+            ]
+        }
+
+    def test_batch_extract_too_many_items(self, login_client):
+        """
+        Test Batch Extract API rejects batches over the configured maximum.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+
+        response = test_client.post(
+            "/api/v1/extract/batch",
+            json={"items": [{"query_text": "Sample", "file_id": "file"}] * 6},
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Maximum number of batch items: 5"}
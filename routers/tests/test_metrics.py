@@ -0,0 +1,55 @@
+"""Test Metrics API module."""
+
+from typing import Iterator
+
+import pytest
+
+from metrics import PoolStats, register_metrics, unregister_metrics
+
+
+@pytest.fixture
+def sample_provider() -> Iterator[str]:
+    """
+    Register a sample metrics provider for the duration of a test.
+
+    :yield: metrics section name
+    """
+    register_metrics("sample", lambda: {"value": 1})
+    yield "sample"
+    unregister_metrics("sample")
+
+
+class TestMetricsAPI:
+    """Test Metrics API."""
+
+    def test_metrics_registered_provider(self, login_client, sample_provider):
+        """
+        Test metrics API returns registered providers.
+
+        :param login_client: login client fixture
+        :param sample_provider: sample metrics provider fixture
+        """
+        test_client, _ = login_client
+
+        response = test_client.get("/api/v1/metrics")
+
+        assert response.status_code == 200
+        assert response.json()["data"][sample_provider] == {"value": 1}
+
+    def test_pool_stats_records_checkouts_and_failures(self):
+        """Test PoolStats checkout and failure counters."""
+        stats = PoolStats()
+
+        with stats.measure_checkout():
+            pass
+
+        try:
+            with stats.measure_checkout():
+                raise TimeoutError()
+        except TimeoutError:
+            pass
+
+        snapshot = stats.snapshot()
+        assert snapshot["checkouts"] == 1
+        assert snapshot["failures"] == 1
+        assert snapshot["waiting"] == 0
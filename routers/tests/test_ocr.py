@@ -1,10 +1,34 @@
 """Test OCR API module."""
 
+import json
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
 import pytest
 
+from conftest import override_get_current_user
+from dependencies import get_job_status_store
+from models.user import UserFile
+from operations.cache_keys import ingest_job_key, text_digest
+from operations.ingest_queue import QueuedJob
+from operations.job_status import JobStatusStore, new_job_status
+
+USER_ID = str(override_get_current_user().id)
+
+
+class FakeStatusRedis:
+    """Asyncio Redis string keys held in memory."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
 
 class TestOCREmbeddingsAPI:
     """Test OCR API class."""
@@ -78,14 +102,18 @@ class TestOCREmbeddingsAPI:
         "operations.ocr_service.OCRService.process_ocr",
         lambda *args: {"paragraphs": [{"content": "Sample paragraph content!"}]},
     )
-    @patch("fastapi.background.BackgroundTasks.add_task")
-    def test_valid_texts_extracted_and_saved(self, add_task_mock, login_client):
+    @patch("operations.ingest_queue.IngestQueue.enqueue")
+    def test_valid_texts_extracted_and_queued(
+        self, enqueue_mock, login_client, db_session
+    ):
         """
-        Tests valid input with text extracted from a mock file.
+        Tests valid input with text extracted from a mock file is queued.
 
+        :param enqueue_mock: ingestion job queue mock
         :param login_client: login client fixture
+        :param db_session: database session fixture
         """
-        add_task_mock.return_value = lambda *args: None
+        enqueue_mock.return_value = QueuedJob("job-id", False)
 
         test_client, _ = login_client
 
@@ -97,5 +125,108 @@ class TestOCREmbeddingsAPI:
             },
         )
         assert response.status_code == 202
-        assert response.content == b""
-        assert add_task_mock.call_count == 1
+        assert response.json() == {
+            "job_id": "job-id",
+            "file_id": "file.txt",
+            "duplicate": False,
+        }
+        assert response.headers["location"].endswith("/api/v1/ocr/jobs/job-id")
+        enqueue_mock.assert_called_once_with(
+            "file.txt", USER_ID, text_digest("Sample paragraph content!"), None
+        )
+        assert [row.file_id for row in db_session.query(UserFile)] == ["file.txt"]
+
+
+class TestIngestJobsAPI:
+    """Test ingestion jobs API class."""
+
+    @staticmethod
+    def status_store(login_client, *statuses: dict) -> JobStatusStore:
+        """
+        Override the job status store with one holding given statuses.
+
+        :param login_client: login client fixture
+        :param statuses: stored job statuses
+        :return: job status store
+        """
+        _, app = login_client
+        redis_client = FakeStatusRedis()
+        for job_status in statuses:
+            redis_client.values[ingest_job_key(job_status["job_id"])] = json.dumps(
+                job_status
+            )
+        store = JobStatusStore(redis_client, 60, 0.01)  # type: ignore[arg-type]
+        app.dependency_overrides[get_job_status_store] = lambda: store
+        return store
+
+    def test_get_job_status(self, login_client):
+        """
+        Test the status of a job of the user is returned.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+        self.status_store(login_client, new_job_status("job", "file.txt", USER_ID))
+
+        response = test_client.get("api/v1/ocr/jobs/job")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["state"] == "queued"
+        assert body["file_id"] == "file.txt"
+        assert "user_id" not in body
+
+    @pytest.mark.parametrize("user_id", [USER_ID, "another-user"])
+    def test_unknown_job_not_found(self, user_id, login_client):
+        """
+        Test unknown jobs and jobs of other users are not found.
+
+        :param user_id: owner of the stored job
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+        self.status_store(login_client, new_job_status("job", "file.txt", user_id))
+
+        response = test_client.get(
+            "api/v1/ocr/jobs/unknown" if user_id == USER_ID else "api/v1/ocr/jobs/job"
+        )
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Ingestion job not found"}
+
+    def test_wait_returns_on_timeout(self, login_client):
+        """
+        Test long polling a running job returns its status after the wait.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+        job_status = {**new_job_status("job", "file.txt", USER_ID), "state": "running"}
+        self.status_store(login_client, job_status)
+
+        response = test_client.get("api/v1/ocr/jobs/job?wait=0.05")
+
+        assert response.status_code == 200
+        assert response.json()["state"] == "running"
+
+    def test_events_stream_until_done(self, login_client):
+        """
+        Test the events endpoint streams the job status until it is done.
+
+        :param login_client: login client fixture
+        """
+        test_client, _ = login_client
+        job_status = {
+            **new_job_status("job", "file.txt", USER_ID),
+            "state": "done",
+            "progress": {"paragraphs": 2},
+        }
+        self.status_store(login_client, job_status)
+
+        response = test_client.get("api/v1/ocr/jobs/job/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        event, data = response.text.strip().split("\n")
+        assert event == "event: done"
+        assert json.loads(data.removeprefix("data: "))["progress"] == {"paragraphs": 2}
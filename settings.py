@@ -2,7 +2,7 @@
 
 import os
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,7 +15,12 @@ class Settings(BaseSettings):
     app_port: Optional[int] = Field(default=3000, alias="APP_PORT")
     app_debug: Optional[bool] = Field(default=False, alias="APP_DEBUG")
     app_workers: Optional[int] = Field(default=1, alias="APP_WORKERS")
+    io_thread_pool_size: int = Field(default=64, alias="IO_THREAD_POOL_SIZE")
     db_url: str = Field(default="db", alias="DB_URL")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    db_pool_timeout: float = Field(default=30, alias="DB_POOL_TIMEOUT")
     max_file_upload_count: Optional[int] = Field(
         default=5, alias="MAX_FILE_UPLOAD_COUNT"
     )
@@ -33,6 +38,28 @@ class Settings(BaseSettings):
     pinecone_api_key: str = Field(default="key", alias="PINECONE_API_KEY")
     pinecone_host: str = Field(default="host", alias="PINECONE_HOST")
     pinecone_pool_count: int = Field(default=1, alias="PINECONE_POOL_COUNT")
+    pinecone_channel_count: int = Field(default=1, alias="PINECONE_CHANNEL_COUNT")
+    vector_store_backend: Literal["pinecone", "local", "shard", "ivf"] = Field(
+        default="pinecone", alias="VECTOR_STORE_BACKEND"
+    )
+    vector_shard_directory: str = Field(
+        default="vector_shards", alias="VECTOR_SHARD_DIRECTORY"
+    )
+    vector_shard_residency_bytes: int = Field(
+        default=536870912, alias="VECTOR_SHARD_RESIDENCY_BYTES"
+    )
+    vector_shard_quantization: Literal["none", "int8"] = Field(
+        default="none", alias="VECTOR_SHARD_QUANTIZATION"
+    )
+    vector_shard_rescore_factor: int = Field(
+        default=4, alias="VECTOR_SHARD_RESCORE_FACTOR"
+    )
+    vector_ivf_directory: str = Field(
+        default="vector_ivf", alias="VECTOR_IVF_DIRECTORY"
+    )
+    vector_ivf_nlist: int = Field(default=256, alias="VECTOR_IVF_NLIST")
+    vector_ivf_nprobe: int = Field(default=64, alias="VECTOR_IVF_NPROBE")
+    vector_ivf_max_segments: int = Field(default=32, alias="VECTOR_IVF_MAX_SEGMENTS")
     openai_api_key: str = Field(default="key", alias="OPENAI_API_KEY")
     openai_embeddings_dimensions: Optional[int] = Field(
         default=None, alias="OPENAI_EMBEDDINGS_DIMENSIONS"
@@ -41,13 +68,100 @@ class Settings(BaseSettings):
         default="text-embedding-ada-002", alias="OPENAI_EMBEDDING_MODEL"
     )
     embedding_chunk_size: int = Field(default=200, alias="EMBEDDING_CHUNK_SIZE")
+    embedding_request_max_tokens: int = Field(
+        default=50000, alias="EMBEDDING_REQUEST_MAX_TOKENS"
+    )
+    embedding_batch_wait_ms: float = Field(default=20, alias="EMBEDDING_BATCH_WAIT_MS")
+    openai_embedding_rpm: int = Field(default=3000, alias="OPENAI_EMBEDDING_RPM")
+    openai_embedding_tpm: int = Field(default=1_000_000, alias="OPENAI_EMBEDDING_TPM")
+    embedding_rate_max_retries: int = Field(
+        default=6, alias="EMBEDDING_RATE_MAX_RETRIES"
+    )
+    embedding_rate_backoff_base: float = Field(
+        default=1.0, alias="EMBEDDING_RATE_BACKOFF_BASE"
+    )
+    embedding_rate_backoff_max: float = Field(
+        default=60, alias="EMBEDDING_RATE_BACKOFF_MAX"
+    )
+    ingest_worker_concurrency: int = Field(default=4, alias="INGEST_WORKER_CONCURRENCY")
+    ingest_visibility_timeout: float = Field(
+        default=300, alias="INGEST_VISIBILITY_TIMEOUT"
+    )
+    ingest_max_attempts: int = Field(default=5, alias="INGEST_MAX_ATTEMPTS")
+    ingest_poll_block_ms: int = Field(default=2000, alias="INGEST_POLL_BLOCK_MS")
+    ingest_job_status_exp: int = Field(default=86400, alias="INGEST_JOB_STATUS_EXP")
+    ingest_idempotency_exp: int = Field(default=86400, alias="INGEST_IDEMPOTENCY_EXP")
+    ingest_job_progress_interval: float = Field(
+        default=1, alias="INGEST_JOB_PROGRESS_INTERVAL"
+    )
+    ingest_job_poll_interval: float = Field(
+        default=0.5, alias="INGEST_JOB_POLL_INTERVAL"
+    )
+    ingest_job_max_wait: float = Field(default=30, alias="INGEST_JOB_MAX_WAIT")
+    ingest_job_stream_timeout: float = Field(
+        default=600, alias="INGEST_JOB_STREAM_TIMEOUT"
+    )
+    chunk_min_tokens: int = Field(default=64, alias="CHUNK_MIN_TOKENS")
+    chunk_max_tokens: int = Field(default=512, alias="CHUNK_MAX_TOKENS")
+    ingest_queue_size: int = Field(default=2, alias="INGEST_QUEUE_SIZE")
+    upsert_batch_max_vectors: int = Field(
+        default=1000, alias="UPSERT_BATCH_MAX_VECTORS"
+    )
+    upsert_batch_max_bytes: int = Field(
+        default=1_500_000, alias="UPSERT_BATCH_MAX_BYTES"
+    )
+    upsert_max_in_flight: int = Field(default=4, alias="UPSERT_MAX_IN_FLIGHT")
+    upsert_max_retries: int = Field(default=3, alias="UPSERT_MAX_RETRIES")
     embedding_namespace: Optional[str] = Field(
         default="paragraphs", alias="EMBEDDING_NAMESPACE"
     )
+    extract_batch_max_items: int = Field(default=100, alias="EXTRACT_BATCH_MAX_ITEMS")
+    extract_batch_concurrency: int = Field(default=8, alias="EXTRACT_BATCH_CONCURRENCY")
+    extract_max_files: int = Field(default=100, alias="EXTRACT_MAX_FILES")
     redis_host: str = Field(default="localhost", alias="REDIS_HOST")
     redis_port: int = Field(default=6379, alias="REDIS_PORT")
     redis_cache_db: Optional[int] = Field(default=1, alias="REDIS_CACHE_DB")
-    redis_cache_exp: Optional[int] = Field(default=86400, alias="REDIS_CACHE_EXP")
+    redis_cache_exp: int = Field(default=86400, alias="REDIS_CACHE_EXP")
+    search_memory_cache_size: int = Field(
+        default=10000, alias="SEARCH_MEMORY_CACHE_SIZE"
+    )
+    search_memory_cache_ttl: float = Field(default=60, alias="SEARCH_MEMORY_CACHE_TTL")
+    search_memory_cache_max_bytes: int = Field(
+        default=64000000, alias="SEARCH_MEMORY_CACHE_MAX_BYTES"
+    )
+    search_negative_cache_exp: int = Field(
+        default=300, alias="SEARCH_NEGATIVE_CACHE_EXP"
+    )
+    search_stale_grace: int = Field(default=3600, alias="SEARCH_STALE_GRACE")
+    search_xfetch_beta: float = Field(default=1.0, alias="SEARCH_XFETCH_BETA")
+    single_flight_lease: float = Field(default=10, alias="SINGLE_FLIGHT_LEASE")
+    single_flight_wait: float = Field(default=3, alias="SINGLE_FLIGHT_WAIT")
+    single_flight_poll_interval: float = Field(
+        default=0.05, alias="SINGLE_FLIGHT_POLL_INTERVAL"
+    )
+    query_embedding_cache_size: int = Field(
+        default=10000, alias="QUERY_EMBEDDING_CACHE_SIZE"
+    )
+    query_embedding_cache_exp: int = Field(
+        default=604800, alias="QUERY_EMBEDDING_CACHE_EXP"
+    )
+    document_embedding_store: Literal["redis", "sqlite", "none"] = Field(
+        default="redis", alias="DOCUMENT_EMBEDDING_STORE"
+    )
+    document_embedding_store_path: str = Field(
+        default="document_embeddings/embeddings.sqlite3",
+        alias="DOCUMENT_EMBEDDING_STORE_PATH",
+    )
+    document_embedding_exp: int = Field(default=2592000, alias="DOCUMENT_EMBEDDING_EXP")
+    redis_max_connections: int = Field(default=50, alias="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout: float = Field(default=5, alias="REDIS_POOL_TIMEOUT")
+    redis_health_check_interval: int = Field(
+        default=30, alias="REDIS_HEALTH_CHECK_INTERVAL"
+    )
+    redis_socket_timeout: float = Field(default=5, alias="REDIS_SOCKET_TIMEOUT")
+    redis_socket_connect_timeout: float = Field(
+        default=2, alias="REDIS_SOCKET_CONNECT_TIMEOUT"
+    )
 
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
@@ -0,0 +1,16 @@
+"""Vector store backends module."""
+
+from vector_stores.base import VectorMatch, VectorStore
+from vector_stores.ivf_store import IVFVectorStore
+from vector_stores.local_store import LocalVectorStore
+from vector_stores.pinecone_store import PineconeVectorStore
+from vector_stores.shard_store import ShardVectorStore
+
+__all__ = [
+    "IVFVectorStore",
+    "LocalVectorStore",
+    "PineconeVectorStore",
+    "ShardVectorStore",
+    "VectorMatch",
+    "VectorStore",
+]
@@ -0,0 +1,116 @@
+"""Vector store interface module."""
+
+import asyncio
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+
+class VectorMatch(NamedTuple):
+    """Vector query match."""
+
+    id: str
+    score: float
+    metadata: dict
+
+
+class VectorStore(ABC):
+    """
+    Vector store holding paragraph embeddings of uploaded files.
+
+    Vectors are upserted in the Pinecone record format, a dictionary with
+    `id`, `values` and `metadata` keys where the metadata carries the
+    `file_id` the paragraph belongs to and its `text`. Vector ids are
+    unique within a file.
+    """
+
+    @abstractmethod
+    async def upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors.
+
+        :param vectors: vector records
+        :return: None
+        """
+
+    @abstractmethod
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+
+    async def query_files(
+        self, vector: list[float], file_ids: list[str], top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of many files most similar to a query vector.
+
+        Files are queried concurrently and their matches merged, backends
+        able to filter on many files in one query override this.
+
+        :param vector: query vector
+        :param file_ids: file ids the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        results = await asyncio.gather(
+            *(self.query(vector, file_id, top_k) for file_id in file_ids)
+        )
+        return heapq.nlargest(
+            top_k, itertools.chain.from_iterable(results), key=lambda match: match.score
+        )
+
+    @abstractmethod
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the vectors of a file.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+
+    @abstractmethod
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the vector records of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+
+    @abstractmethod
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+
+    def buffered(self) -> "VectorStore":
+        """
+        Get the store the upserts of one ingestion go through.
+
+        Backends rewriting a file's vectors on every write return a store
+        holding upserts back until `flush`, others return themselves.
+
+        :return: vector store for the upserts
+        """
+        return self
+
+    async def flush(self):
+        """
+        Write the upserts held back, a no-op for unbuffered stores.
+
+        :return: None
+        """
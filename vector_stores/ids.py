@@ -0,0 +1,46 @@
+"""Deterministic vector ids module."""
+
+import hashlib
+
+
+def _digest(text: str) -> str:
+    """
+    Short SHA-256 hex digest of a text.
+
+    :param text: text
+    :return: 16 hex characters
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def file_prefix(file_id: str) -> str:
+    """
+    Prefix shared by the vector ids of a file.
+
+    :param file_id: file id
+    :return: vector id prefix
+    """
+    return f"{_digest(file_id)}#"
+
+
+def paragraph_ids(file_id: str, texts: list[str]) -> list[str]:
+    """
+    Derive the vector ids of a file's paragraphs from their content.
+
+    An id is the file prefix, the paragraph content hash and the number of
+    earlier paragraphs with the same content. Unchanged paragraphs keep
+    their id when other paragraphs are inserted or removed around them.
+
+    :param file_id: file id
+    :param texts: paragraph texts in document order
+    :return: vector id per paragraph
+    """
+    prefix = file_prefix(file_id)
+    occurrences: dict[str, int] = {}
+    ids = []
+    for text in texts:
+        digest = _digest(text)
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        ids.append(f"{prefix}{digest}#{occurrence}")
+    return ids
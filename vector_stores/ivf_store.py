@@ -0,0 +1,751 @@
+"""Inverted file (IVF-flat) approximate vector index module."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from metrics import Counters
+from vector_stores.base import VectorMatch, VectorStore
+from vector_stores.local_store import normalize_rows, top_k_indices
+from vector_stores.storage import (
+    exclusive_lock,
+    manifest_version,
+    publish_manifest,
+    read_manifest,
+    write_file,
+)
+
+# Vectors needed per list before training, fewer leave lists poorly placed.
+MIN_TRAIN_POINTS_PER_LIST = 39
+# Vectors sampled per list to train on, bounding training time.
+MAX_TRAIN_POINTS_PER_LIST = 256
+TRAIN_ITERATIONS = 10
+# Rows scored against every centroid at a time while assigning lists.
+ASSIGN_BLOCK_ROWS = 4096
+# Delta rows, relative to the base segment, above which compaction rewrites
+# the base segment instead of only merging delta segments.
+BASE_REWRITE_RATIO = 0.1
+
+Key = tuple[str, str]
+
+
+def assign_lists(matrix: np.ndarray, centroids: np.ndarray | None) -> np.ndarray:
+    """
+    Assign rows to their most similar centroid.
+
+    :param matrix: unit length float32 rows
+    :param centroids: unit length centroids or None before training
+    :return: list number per row
+    """
+    lists = np.zeros(len(matrix), dtype=np.int32)
+    if centroids is None:
+        return lists
+
+    for start in range(0, len(matrix), ASSIGN_BLOCK_ROWS):
+        block = matrix[start : start + ASSIGN_BLOCK_ROWS]
+        lists[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return lists
+
+
+def train_centroids(
+    matrix: np.ndarray, nlist: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Train list centroids with spherical k-means.
+
+    Empty lists are reseeded with the rows least similar to their centroid.
+
+    :param matrix: unit length float32 rows
+    :param nlist: number of lists
+    :param rng: random generator
+    :return: unit length float32 centroids
+    """
+    sample_size = min(len(matrix), nlist * MAX_TRAIN_POINTS_PER_LIST)
+    sample = matrix[np.sort(rng.choice(len(matrix), sample_size, replace=False))]
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(TRAIN_ITERATIONS):
+        lists = assign_lists(sample, centroids)
+        order = np.argsort(lists, kind="stable")
+        counts = np.bincount(lists, minlength=nlist)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        centroids = normalize_rows(sums)
+
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            similarity = np.einsum("ij,ij->i", sample, centroids[lists])
+            centroids[empty] = sample[np.argsort(similarity)[: len(empty)]]
+
+    return centroids.astype(np.float32)
+
+
+class Segment(NamedTuple):
+    """Vectors written together, rows ordered by list when `sorted`."""
+
+    name: str
+    keys: list[Key]
+    metadata: list[dict]
+    matrix: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+    sorted: bool
+    deleted: list[Key]
+
+
+class IndexState:
+    """Immutable snapshot of the loaded index, replaced on every reload."""
+
+    def __init__(
+        self, version: tuple[int, int] | None, manifest: dict, centroids, segments
+    ):
+        """
+        Resolve which segment row holds the live vector of every key.
+
+        :param version: manifest version
+        :param manifest: manifest content
+        :param centroids: unit length centroids or None before training
+        :param segments: segments in write order
+        """
+        self.version = version
+        self.manifest = manifest
+        self.centroids = centroids
+        self.segments: list[Segment] = []
+        self.alive: list[np.ndarray] = []
+        self.live: dict[Key, tuple[int, int]] = {}
+        self.files: dict[str, dict[str, tuple[int, int]]] = {}
+        for segment in segments:
+            self._add(segment)
+
+    def _add(self, segment: Segment):
+        """
+        Apply a segment on top of the previous ones.
+
+        :param segment: segment
+        :return: None
+        """
+        index = len(self.segments)
+        self.segments.append(segment)
+        self.alive.append(np.ones(len(segment.keys), dtype=bool))
+
+        for key in segment.deleted:
+            self._kill(key)
+
+        for row, key in enumerate(segment.keys):
+            self._kill(key)
+            self.live[key] = (index, row)
+            self.files.setdefault(key[0], {})[key[1]] = (index, row)
+
+    def _kill(self, key: Key):
+        """
+        Mark the live vector of a key dead.
+
+        :param key: file id and vector id
+        :return: None
+        """
+        location = self.live.pop(key, None)
+        if location is None:
+            return
+
+        self.alive[location[0]][location[1]] = False
+        rows = self.files[key[0]]
+        del rows[key[1]]
+        if not rows:
+            del self.files[key[0]]
+
+    def extended(
+        self, version: tuple[int, int], manifest: dict, segments: list[Segment]
+    ) -> "IndexState":
+        """
+        Copy the snapshot with new segments applied.
+
+        :param version: manifest version
+        :param manifest: manifest content
+        :param segments: segments written since this snapshot
+        :return: new snapshot
+        """
+        state = IndexState(version, manifest, self.centroids, [])
+        state.segments = list(self.segments)
+        state.alive = [alive.copy() for alive in self.alive]
+        state.live = dict(self.live)
+        state.files = {file_id: dict(rows) for file_id, rows in self.files.items()}
+        for segment in segments:
+            state._add(segment)
+        return state
+
+    def live_vectors(self) -> tuple[list[Key], list[dict], np.ndarray]:
+        """
+        Gather every live vector, for compaction.
+
+        :return: keys, metadata and unit length float32 rows
+        """
+        keys: list[Key] = []
+        metadata: list[dict] = []
+        blocks = []
+        for segment, alive in zip(self.segments, self.alive):
+            rows = np.flatnonzero(alive)
+            if not len(rows):
+                continue
+            keys.extend(segment.keys[row] for row in rows)
+            metadata.extend(segment.metadata[row] for row in rows)
+            blocks.append(np.asarray(segment.matrix[rows]))
+
+        dims = self.manifest.get("dimensions") or 0
+        matrix = np.concatenate(blocks) if blocks else np.empty((0, dims), np.float32)
+        return keys, metadata, matrix
+
+
+class IVFVectorStore(VectorStore):
+    """
+    Inverted file index for approximate search across many files.
+
+    Vectors are grouped into `nlist` lists around k-means centroids and a
+    query scans only the `nprobe` lists whose centroids are most similar.
+    Queries filtered to a single file, or to files small enough, are
+    answered exactly from those files' rows. Until enough vectors arrive to
+    train centroids every vector sits in one list and search is exact.
+
+    The index lives in a directory of append only segments: each write adds
+    a segment of new vectors and deleted keys, then atomically publishes a
+    manifest listing the segments. Segment matrices are memory-mapped, the
+    compacted base segment is ordered by list so every probed list is a
+    contiguous scan. Too many segments are compacted, merging delta segments
+    or rewriting the base segment once deltas grow large. Workers reload new
+    segments when the manifest changes, writers serialize with a file lock.
+
+    Vectors are keyed by file id and vector id, their other metadata is
+    stored in the segment sidecar.
+    """
+
+    def __init__(self, directory: str, nlist: int, nprobe: int, max_segments: int):
+        """
+        Initialize the store.
+
+        :param directory: directory holding the index
+        :param nlist: number of lists trained
+        :param nprobe: lists scanned per query
+        :param max_segments: segments allowed before compaction
+        """
+        self.directory = Path(directory)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.max_segments = max_segments
+        self.stats = Counters("reloads", "segments_written", "compactions", "trainings")
+        self._state = IndexState(None, {}, None, [])
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _load_segment(self, name: str, nlist: int) -> Segment:
+        """
+        Map a segment.
+
+        :param name: segment name
+        :param nlist: number of lists of the index
+        :return: segment
+        """
+        sidecar = json.loads((self.directory / f"{name}.json").read_bytes())
+        matrix = np.load(self.directory / f"{name}.npy", mmap_mode="r")
+        lists = np.load(self.directory / f"{name}.lists.npy")
+        order = np.argsort(lists, kind="stable")
+        offsets = np.searchsorted(lists[order], np.arange(nlist + 1))
+
+        return Segment(
+            name,
+            [tuple(key) for key in sidecar["keys"]],
+            sidecar["metadata"],
+            matrix,
+            order,
+            offsets,
+            bool(np.all(order == np.arange(len(order)))),
+            [tuple(key) for key in sidecar["deleted"]],
+        )
+
+    def _reload(self) -> IndexState:
+        """
+        Load segments published since the current snapshot.
+
+        :return: current snapshot
+        """
+        state = self._state
+        if manifest_version(self.directory) == state.version:
+            return state
+
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            return state
+
+        content, version = manifest
+        names = content["segments"]
+        known = [segment.name for segment in state.segments]
+        nlist = content["nlist"]
+
+        if (
+            content["generation"] == state.manifest.get("generation")
+            and names[: len(known)] == known
+        ):
+            segments = [self._load_segment(name, nlist) for name in names[len(known) :]]
+            state = state.extended(version, content, segments)
+        else:
+            centroids = None
+            if content["centroids"]:
+                centroids = np.load(self.directory / content["centroids"])
+            segments = [self._load_segment(name, nlist) for name in names]
+            state = IndexState(version, content, centroids, segments)
+
+        self._state = state
+        self.stats.increment("reloads")
+        return state
+
+    def _write_segment(
+        self,
+        name: str,
+        keys: list[Key],
+        metadata: list[dict],
+        matrix: np.ndarray,
+        lists: np.ndarray,
+        deleted: list[Key],
+    ):
+        """
+        Write segment files.
+
+        :param name: segment name
+        :param keys: file id and vector id per row
+        :param metadata: metadata per row, without the file id
+        :param matrix: unit length float32 rows
+        :param lists: list number per row
+        :param deleted: keys deleted by the segment
+        :return: None
+        """
+        write_file(self.directory / f"{name}.npy", lambda file: np.save(file, matrix))
+        write_file(
+            self.directory / f"{name}.lists.npy", lambda file: np.save(file, lists)
+        )
+        write_file(
+            self.directory / f"{name}.json",
+            json.dumps(
+                {"keys": keys, "metadata": metadata, "deleted": deleted}
+            ).encode(),
+        )
+        self.stats.increment("segments_written")
+
+    def _append(
+        self, keys: list[Key], metadata: list[dict], matrix, deleted: list[Key]
+    ):
+        """
+        Publish a delta segment, then compact or train when due.
+
+        :param keys: file id and vector id per row
+        :param metadata: metadata per row, without the file id
+        :param matrix: float32 rows
+        :param deleted: keys deleted
+        :return: None
+        """
+        with exclusive_lock(self.directory):
+            state = self._reload()
+            manifest = state.manifest or {
+                "generation": 0,
+                "nlist": 1,
+                "centroids": None,
+                "segments": [],
+                "base": None,
+                "next_segment": 0,
+                "dimensions": None,
+            }
+            matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+            name = f"segment-{manifest['next_segment']}"
+
+            self._write_segment(
+                name,
+                keys,
+                metadata,
+                matrix,
+                assign_lists(matrix, state.centroids),
+                deleted,
+            )
+            publish_manifest(
+                self.directory,
+                {
+                    **manifest,
+                    "segments": manifest["segments"] + [name],
+                    "next_segment": manifest["next_segment"] + 1,
+                    "dimensions": manifest["dimensions"]
+                    or (matrix.shape[1] if len(keys) else None),
+                },
+            )
+            state = self._reload()
+
+            if state.centroids is None and len(state.live) >= (
+                self.nlist * MIN_TRAIN_POINTS_PER_LIST
+            ):
+                self._compact(state, train=True)
+            elif len(state.segments) > self.max_segments:
+                self._compact(state, train=False)
+
+    def _compact(self, state: IndexState, train: bool):
+        """
+        Merge segments, lock must be held.
+
+        Delta segments are merged into one unless they hold a large share of
+        the vectors or centroids are trained, then the base segment is
+        rewritten ordered by list.
+
+        :param state: current snapshot
+        :param train: whether to train centroids
+        :return: None
+        """
+        manifest = dict(state.manifest)
+        base = manifest["base"]
+        base_rows = 0
+        if base is not None:
+            base_rows = int(state.alive[0].sum())
+        delta_rows = len(state.live) - base_rows
+        rewrite_base = (
+            train or base is None or delta_rows > base_rows * BASE_REWRITE_RATIO
+        )
+
+        if rewrite_base:
+            merged = IndexState(None, manifest, state.centroids, [])
+            merged.segments, merged.alive = state.segments, state.alive
+        else:
+            merged = IndexState(None, manifest, state.centroids, [])
+            merged.segments, merged.alive = state.segments[1:], state.alive[1:]
+
+        keys, metadata, matrix = merged.live_vectors()
+        centroids = state.centroids
+        name = f"segment-{manifest['next_segment']}"
+        manifest["next_segment"] += 1
+        obsolete = [segment.name for segment in merged.segments]
+
+        if train:
+            centroids = train_centroids(
+                matrix, self.nlist, np.random.default_rng(len(keys))
+            )
+            manifest["generation"] += 1
+            manifest["nlist"] = len(centroids)
+            manifest["centroids"] = f"centroids-{manifest['generation']}.npy"
+            write_file(
+                self.directory / manifest["centroids"],
+                lambda file: np.save(file, centroids),
+            )
+            self.stats.increment("trainings")
+
+        lists = assign_lists(matrix, centroids)
+        if rewrite_base:
+            order = np.argsort(lists, kind="stable")
+            keys = [keys[row] for row in order]
+            metadata = [metadata[row] for row in order]
+            matrix, lists = matrix[order], lists[order]
+
+        deleted = []
+        if not rewrite_base:
+            # Base rows deleted or replaced by the merged deltas stay dead.
+            base_segment = state.segments[0]
+            deleted = [
+                base_segment.keys[row] for row in np.flatnonzero(~state.alive[0])
+            ]
+
+        self._write_segment(name, keys, metadata, matrix, lists, deleted)
+
+        if rewrite_base:
+            manifest["base"] = name
+            manifest["segments"] = [name]
+        else:
+            manifest["segments"] = [base, name]
+
+        publish_manifest(self.directory, manifest)
+        self.stats.increment("compactions")
+
+        # Readers mapping obsolete segments keep them until they unmap.
+        if train and state.manifest.get("centroids"):
+            (self.directory / state.manifest["centroids"]).unlink(missing_ok=True)
+        for obsolete_name in obsolete:
+            for suffix in (".npy", ".lists.npy", ".json"):
+                (self.directory / f"{obsolete_name}{suffix}").unlink(missing_ok=True)
+
+        self._reload()
+
+    def _upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors, blocking.
+
+        :param vectors: vector records
+        :return: None
+        """
+        records = {
+            (record["metadata"]["file_id"], record["id"]): record for record in vectors
+        }
+        if not records:
+            return
+
+        self._append(
+            list(records),
+            [
+                {
+                    key: value
+                    for key, value in record["metadata"].items()
+                    if key != "file_id"
+                }
+                for record in records.values()
+            ],
+            [record["values"] for record in records.values()],
+            [],
+        )
+
+    async def upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors.
+
+        :param vectors: vector records
+        :return: None
+        """
+        await asyncio.to_thread(self._upsert, vectors)
+
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the vectors of a file.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+        state = await asyncio.to_thread(self._reload)
+        return list(state.files.get(file_id, {}))
+
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the vector records of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+        state = await asyncio.to_thread(self._reload)
+        rows = state.files.get(file_id, {})
+        records = []
+        for vid in ids:
+            if vid not in rows:
+                continue
+            index, row = rows[vid]
+            segment = state.segments[index]
+            records.append(
+                {
+                    "id": vid,
+                    "values": segment.matrix[row].tolist(),
+                    "metadata": {**segment.metadata[row], "file_id": file_id},
+                }
+            )
+        return records
+
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        if ids:
+            await asyncio.to_thread(
+                self._append, [], [], np.empty((0, 0)), [(file_id, vid) for vid in ids]
+            )
+
+    @staticmethod
+    def _matches(
+        state: IndexState, candidates: list[tuple[int, np.ndarray, np.ndarray]], top_k
+    ) -> list[VectorMatch]:
+        """
+        Pick the best scored candidate rows.
+
+        :param state: index snapshot
+        :param candidates: segment index, rows and scores of scanned rows
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        if not candidates:
+            return []
+
+        segments = np.concatenate(
+            [np.full(len(rows), index) for index, rows, _ in candidates]
+        )
+        rows = np.concatenate([rows for _, rows, _ in candidates])
+        scores = np.concatenate([scores for _, _, scores in candidates])
+
+        matches = []
+        for best in top_k_indices(scores, top_k):
+            segment = state.segments[segments[best]]
+            file_id, vid = segment.keys[rows[best]]
+            metadata = {**segment.metadata[rows[best]], "file_id": file_id}
+            matches.append(VectorMatch(vid, float(scores[best]), metadata))
+        return matches
+
+    def _query_exact(
+        self, state: IndexState, vector: list[float], file_ids: list[str], top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Exact search over the rows of some files, blocking.
+
+        :param state: index snapshot
+        :param vector: query vector
+        :param file_ids: file ids the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        query = normalize_rows(np.asarray(vector, dtype=np.float32))
+
+        by_segment: dict[int, list[int]] = {}
+        for file_id in file_ids:
+            for index, row in state.files.get(file_id, {}).values():
+                by_segment.setdefault(index, []).append(row)
+
+        candidates = []
+        for index, segment_rows in by_segment.items():
+            rows = np.sort(segment_rows)
+            candidates.append((index, rows, state.segments[index].matrix[rows] @ query))
+        return self._matches(state, candidates, top_k)
+
+    def _query_files(
+        self, vector: list[float], file_ids: list[str], top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Search the rows of some files, blocking.
+
+        Files holding fewer rows than the probed lists are expected to hold
+        are scanned exactly, larger selections probe the lists instead.
+
+        :param vector: query vector
+        :param file_ids: file ids the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        state = self._reload()
+        file_ids = list(dict.fromkeys(file_ids))
+        rows = sum(len(state.files.get(file_id, {})) for file_id in file_ids)
+        if (
+            state.centroids is None
+            or rows * len(state.centroids) <= len(state.live) * self.nprobe
+        ):
+            return self._query_exact(state, vector, file_ids, top_k)
+
+        return self._query_all(vector, top_k, file_ids, self.nprobe)
+
+    def _query_all(
+        self,
+        vector: list[float],
+        top_k: int,
+        file_ids: list[str] | None,
+        nprobe: int,
+    ) -> list[VectorMatch]:
+        """
+        Approximate search over the probed lists, blocking.
+
+        :param vector: query vector
+        :param top_k: maximum number of matches
+        :param file_ids: file ids the matches must belong to, None for all
+        :param nprobe: lists scanned
+        :return: matches by descending cosine similarity
+        """
+        state = self._reload()
+        query = normalize_rows(np.asarray(vector, dtype=np.float32))
+
+        if state.centroids is None:
+            probes = np.zeros(1, dtype=np.int64)
+        else:
+            probes = np.sort(top_k_indices(state.centroids @ query, nprobe))
+
+        allowed = set(file_ids) if file_ids is not None else None
+        candidates = []
+        for index, (segment, alive) in enumerate(zip(state.segments, state.alive)):
+            starts = segment.offsets[probes]
+            ends = segment.offsets[probes + 1]
+            filled = starts < ends
+            bounds = list(zip(starts[filled].tolist(), ends[filled].tolist()))
+            if not bounds:
+                continue
+
+            rows = np.concatenate([segment.order[start:end] for start, end in bounds])
+            if segment.sorted:
+                # Lists of the base segment are contiguous, scan them in place.
+                scores = np.concatenate(
+                    [segment.matrix[start:end] @ query for start, end in bounds]
+                )
+            else:
+                scores = segment.matrix[rows] @ query
+
+            keep = alive[rows]
+            if allowed is not None:
+                keep &= np.fromiter(
+                    (segment.keys[row][0] in allowed for row in rows),
+                    dtype=bool,
+                    count=len(rows),
+                )
+            if keep.any():
+                candidates.append((index, rows[keep], scores[keep]))
+
+        return self._matches(state, candidates, top_k)
+
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await asyncio.to_thread(
+            lambda: self._query_exact(self._reload(), vector, [file_id], top_k)
+        )
+
+    async def query_files(
+        self, vector: list[float], file_ids: list[str], top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of many files most similar to a query vector.
+
+        :param vector: query vector
+        :param file_ids: file ids the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await asyncio.to_thread(self._query_files, vector, file_ids, top_k)
+
+    async def query_all(
+        self,
+        vector: list[float],
+        top_k: int,
+        file_ids: list[str] | None = None,
+        nprobe: int | None = None,
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors most similar to a query vector across files.
+
+        :param vector: query vector
+        :param top_k: maximum number of matches
+        :param file_ids: file ids the matches must belong to, None for all
+        :param nprobe: lists scanned, defaults to the store setting
+        :return: matches by approximately descending cosine similarity
+        """
+        return await asyncio.to_thread(
+            self._query_all, vector, top_k, file_ids, nprobe or self.nprobe
+        )
+
+    def metrics(self) -> dict:
+        """
+        Index metrics.
+
+        :return: metrics dictionary
+        """
+        state = self._state
+        return {
+            **self.stats.snapshot(),
+            "vectors": len(state.live),
+            "segments": len(state.segments),
+            "lists": len(state.centroids) if state.centroids is not None else 0,
+        }
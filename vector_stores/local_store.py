@@ -0,0 +1,234 @@
+"""In-process vector store module."""
+
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from vector_stores.base import VectorMatch, VectorStore
+
+
+class FileVectors(NamedTuple):
+    """Vectors of one file, rows of `matrix` are unit length float32."""
+
+    ids: list[str]
+    matrix: np.ndarray
+    metadata: list[dict]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scale rows to unit length so dot products are cosine similarities.
+
+    :param matrix: float32 matrix
+    :return: matrix of unit length rows, zero rows are left as is
+    """
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Indices of the highest scores, best first.
+
+    :param scores: similarity scores
+    :param top_k: maximum number of indices
+    :return: indices sorted by descending score
+    """
+    if top_k < len(scores):
+        candidates = np.argpartition(scores, -top_k)[-top_k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def group_by_file(vectors: list[dict]) -> dict[str, dict[str, dict]]:
+    """
+    Group vector records by the file id in their metadata.
+
+    :param vectors: vector records
+    :return: vector records by id, by file id
+    """
+    by_file: dict[str, dict[str, dict]] = {}
+    for record in vectors:
+        file_id = record["metadata"]["file_id"]
+        by_file.setdefault(file_id, {})[record["id"]] = record
+    return by_file
+
+
+def merge_vectors(current: FileVectors | None, records: dict[str, dict]) -> FileVectors:
+    """
+    Build a file's vectors with records inserted or replaced in place.
+
+    :param current: current vectors of the file
+    :param records: vector records by id
+    :return: merged vectors
+    """
+    ids = list(current.ids) if current else []
+    metadata = list(current.metadata) if current else []
+    rows = {vid: row for row, vid in enumerate(ids)}
+
+    for vid, record in records.items():
+        if vid in rows:
+            metadata[rows[vid]] = record["metadata"]
+        else:
+            rows[vid] = len(ids)
+            ids.append(vid)
+            metadata.append(record["metadata"])
+
+    values = normalize_rows(
+        np.asarray([record["values"] for record in records.values()], dtype=np.float32)
+    )
+    if current is None:
+        return FileVectors(ids, values, metadata)
+
+    matrix = np.empty((len(ids), values.shape[1]), dtype=np.float32)
+    matrix[: len(current.ids)] = current.matrix
+    matrix[[rows[vid] for vid in records]] = values
+    return FileVectors(ids, matrix, metadata)
+
+
+def remove_vectors(current: FileVectors, ids: set[str]) -> FileVectors | None:
+    """
+    Build a file's vectors without the given ids.
+
+    :param current: current vectors of the file
+    :param ids: vector ids to remove
+    :return: remaining vectors or None when none remain
+    """
+    keep = [row for row, vid in enumerate(current.ids) if vid not in ids]
+    if not keep:
+        return None
+
+    return FileVectors(
+        [current.ids[row] for row in keep],
+        current.matrix[keep],
+        [current.metadata[row] for row in keep],
+    )
+
+
+def fetch_records(current: FileVectors, ids: list[str]) -> list[dict]:
+    """
+    Build the vector records of some of a file's vectors.
+
+    :param current: vectors of the file
+    :param ids: vector ids, unknown ids are ignored
+    :return: vector records
+    """
+    rows = {vid: row for row, vid in enumerate(current.ids)}
+    return [
+        {
+            "id": vid,
+            "values": current.matrix[rows[vid]].tolist(),
+            "metadata": dict(current.metadata[rows[vid]]),
+        }
+        for vid in ids
+        if vid in rows
+    ]
+
+
+def rank_matches(
+    matrix: np.ndarray, vector: list[float], top_k: int
+) -> list[tuple[int, float]]:
+    """
+    Rank the rows of a unit row matrix by cosine similarity to a vector.
+
+    :param matrix: unit length float32 rows
+    :param vector: query vector
+    :param top_k: maximum number of matches
+    :return: row and score of the best matches, best first
+    """
+    query = normalize_rows(np.asarray(vector, dtype=np.float32))
+    scores = matrix @ query
+    return [(int(row), float(scores[row])) for row in top_k_indices(scores, top_k)]
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Exact vector search held in process memory.
+
+    Each file's vectors are one contiguous float32 matrix, so a query filtered
+    to a file is a single matrix-vector product and a partial sort. Writers
+    swap in a rebuilt matrix, readers never take the lock.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._files = {}
+
+    async def upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors.
+
+        :param vectors: vector records
+        :return: None
+        """
+        with self._lock:
+            for file_id, records in group_by_file(vectors).items():
+                self._files[file_id] = merge_vectors(self._files.get(file_id), records)
+
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        current = self._files.get(file_id)
+        if current is None:
+            return []
+
+        return [
+            VectorMatch(current.ids[row], score, current.metadata[row])
+            for row, score in rank_matches(current.matrix, vector, top_k)
+        ]
+
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the vectors of a file.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+        current = self._files.get(file_id)
+        return list(current.ids) if current is not None else []
+
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the vector records of a file, unknown ids are ignored.
+
+        Values are returned scaled to unit length as stored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+        current = self._files.get(file_id)
+        if current is None:
+            return []
+
+        return fetch_records(current, ids)
+
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        with self._lock:
+            current = self._files.get(file_id)
+            if current is None:
+                return
+
+            remaining = remove_vectors(current, set(ids))
+            if remaining is None:
+                del self._files[file_id]
+            else:
+                self._files[file_id] = remaining
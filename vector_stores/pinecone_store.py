@@ -0,0 +1,152 @@
+"""Pinecone vector store module."""
+
+import asyncio
+
+from pinecone import Pinecone
+
+from vector_stores.base import VectorMatch, VectorStore
+from vector_stores.ids import file_prefix
+
+# Ids accepted by a Pinecone delete or fetch request.
+DELETE_BATCH_SIZE = 1000
+FETCH_BATCH_SIZE = 1000
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by a Pinecone index namespace."""
+
+    def __init__(self, index: Pinecone.Index, namespace: str | None):
+        """
+        Inject class dependencies.
+
+        :param index: Pinecone index instance
+        :param namespace: Pinecone namespace
+        """
+        self.index = index
+        self.namespace = namespace
+
+    # The gRPC index has no asyncio API, blocking calls run off the loop.
+
+    async def upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors.
+
+        :param vectors: vector records
+        :return: None
+        """
+        await asyncio.to_thread(
+            self.index.upsert, vectors=vectors, namespace=self.namespace
+        )
+
+    async def _query(
+        self, vector: list[float], metadata_filter: dict, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Query the namespace with a metadata filter.
+
+        :param vector: query vector
+        :param metadata_filter: Pinecone metadata filter
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        result = await asyncio.to_thread(
+            self.index.query,
+            filter=metadata_filter,
+            vector=vector,
+            top_k=top_k,
+            include_values=False,
+            namespace=self.namespace,
+            include_metadata=True,
+        )
+        return [
+            VectorMatch(match.id, match.score, match.metadata or {})
+            for match in result.matches
+        ]
+
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await self._query(vector, {"file_id": {"$eq": file_id}}, top_k)
+
+    async def query_files(
+        self, vector: list[float], file_ids: list[str], top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of many files most similar to a query vector in one query.
+
+        :param vector: query vector
+        :param file_ids: file ids the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await self._query(vector, {"file_id": {"$in": file_ids}}, top_k)
+
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the vectors of a file.
+
+        Pinecone lists ids by prefix only, vectors stored under ids without
+        the file's prefix are not listed.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+
+        def list_pages() -> list[str]:
+            return [
+                vid
+                for page in self.index.list(
+                    prefix=file_prefix(file_id), namespace=self.namespace
+                )
+                for vid in page
+            ]
+
+        return await asyncio.to_thread(list_pages)
+
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the vector records of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+        records: list[dict] = []
+        for idx in range(0, len(ids), FETCH_BATCH_SIZE):
+            result = await asyncio.to_thread(
+                self.index.fetch,
+                ids=ids[idx : idx + FETCH_BATCH_SIZE],
+                namespace=self.namespace,
+            )
+            records.extend(
+                {
+                    "id": vid,
+                    "values": list(vector.values),
+                    "metadata": dict(vector.metadata or {}),
+                }
+                for vid, vector in result.vectors.items()
+            )
+        return records
+
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        for idx in range(0, len(ids), DELETE_BATCH_SIZE):
+            await asyncio.to_thread(
+                self.index.delete,
+                ids=ids[idx : idx + DELETE_BATCH_SIZE],
+                namespace=self.namespace,
+            )
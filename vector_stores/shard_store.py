@@ -0,0 +1,597 @@
+"""Memory-mapped vector shard store module."""
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from metrics import Counters
+from vector_stores.base import VectorMatch, VectorStore
+from vector_stores.local_store import (
+    FileVectors,
+    fetch_records,
+    group_by_file,
+    merge_vectors,
+    rank_matches,
+    remove_vectors,
+)
+from vector_stores.quantization import QuantizedMatrix, quantize, rescored_matches
+from vector_stores.storage import (
+    MANIFEST,
+    GenerationCounter,
+    exclusive_lock,
+    manifest_version,
+    publish_manifest,
+    read_manifest,
+    write_file,
+)
+
+OPEN_RETRIES = 3
+
+
+# Metadata kept in the text sidecar and the shard directory, not per row.
+SHARED_METADATA = ("text", "file_id")
+
+
+class Shard(NamedTuple):
+    """Memory-mapped vectors, paragraph texts and metadata of one file."""
+
+    version: tuple[int, int]
+    generation: int
+    ids: list[str]
+    offsets: list[int]
+    matrix: np.ndarray
+    quantized: QuantizedMatrix | None
+    text: mmap.mmap | bytes
+    metadata: list[dict]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the shard read by every query."""
+        if self.quantized is not None:
+            return self.quantized.nbytes + len(self.text)
+        return self.matrix.nbytes + len(self.text)
+
+    def text_at(self, row: int) -> str:
+        """
+        Paragraph text of a row.
+
+        :param row: matrix row
+        :return: paragraph text
+        """
+        return self.text[self.offsets[row] : self.offsets[row + 1]].decode("utf-8")
+
+    def metadata_at(self, row: int, file_id: str) -> dict:
+        """
+        Metadata of a row.
+
+        :param row: matrix row
+        :param file_id: file id of the shard
+        :return: vector metadata
+        """
+        return {"text": self.text_at(row), "file_id": file_id, **self.metadata[row]}
+
+
+def _map_text(path: Path) -> mmap.mmap | bytes:
+    """
+    Map a paragraph text sidecar read only.
+
+    :param path: text sidecar path
+    :return: mapped text, empty files cannot be mapped
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ShardVectorStore(VectorStore):
+    """
+    Exact vector search over memory-mapped per-file shards on local disk.
+
+    A shard directory per file holds generation numbered files: a float32
+    `.npy` matrix of unit rows, an ids and text offsets sidecar, a UTF-8
+    paragraph text sidecar and a sidecar of the other metadata of each row.
+    A manifest names the current generation and is replaced atomically once
+    the generation is on disk, so readers never see a partial write. Every
+    write also bumps a generation counter shared through a memory-mapped
+    file, a resident shard is checked against its manifest only once the
+    counter moved. Shards are mapped on first query and kept resident up to
+    a byte budget, least recently used first out. Every worker process maps
+    the same files, so pages are shared through the OS page cache.
+
+    Every write rewrites the whole shard of a file, ingestions upsert
+    through `buffered` so a file is written once rather than once per batch.
+
+    With int8 quantization a quantized copy of the matrix is written
+    alongside, queries scan the quantized rows and rescore the best
+    candidates on the float32 rows. Only the quantized rows count towards
+    the residency budget, quantization saves memory and does not make
+    queries faster.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        residency_bytes: int,
+        quantization: str = "none",
+        rescore_factor: int = 4,
+    ):
+        """
+        Initialize the store.
+
+        :param directory: directory holding the shards
+        :param residency_bytes: bytes of shards kept mapped
+        :param quantization: `none` or `int8` for shards written
+        :param rescore_factor: candidates rescored per requested match
+        """
+        self.directory = Path(directory)
+        self.residency_bytes = residency_bytes
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.stats = Counters("hits", "loads", "evictions")
+        self._lock = threading.Lock()
+        self._resident: OrderedDict[str, Shard] = OrderedDict()
+        self._resident_bytes = 0
+        self._checked: dict[str, int] = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._generations = GenerationCounter(self.directory)
+
+    def _shard_dir(self, file_id: str) -> Path:
+        """
+        Directory of a file's shard.
+
+        :param file_id: file id
+        :return: shard directory path
+        """
+        return self.directory / hashlib.sha256(file_id.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def _load_quantized(shard_dir: Path, manifest: dict) -> QuantizedMatrix | None:
+        """
+        Map the quantized matrix of a shard generation.
+
+        :param shard_dir: shard directory path
+        :param manifest: shard manifest
+        :return: quantized matrix or None for unquantized shards
+        """
+        generation = manifest["generation"]
+        if manifest.get("quantization", "none") == "none":
+            return None
+
+        data = np.load(shard_dir / f"quantized-{generation}.npy", mmap_mode="r")
+        scales = np.load(shard_dir / f"scales-{generation}.npy")
+        return QuantizedMatrix(data, scales)
+
+    def _open(self, file_id: str) -> Shard | None:
+        """
+        Map the current generation of a file's shard.
+
+        :param file_id: file id
+        :return: mapped shard or None without shard
+        """
+        shard_dir = self._shard_dir(file_id)
+
+        for attempt in range(OPEN_RETRIES):
+            manifest = read_manifest(shard_dir)
+            if manifest is None:
+                return None
+
+            content, version = manifest
+            generation = content["generation"]
+            try:
+                sidecar = json.loads(
+                    (shard_dir / f"ids-{generation}.json").read_bytes()
+                )
+                matrix = np.load(shard_dir / f"vectors-{generation}.npy", mmap_mode="r")
+                quantized = self._load_quantized(shard_dir, content)
+                text = _map_text(shard_dir / f"text-{generation}.bin")
+                metadata = json.loads(
+                    (shard_dir / f"metadata-{generation}.json").read_bytes()
+                )
+            except FileNotFoundError:
+                # A writer replaced the generation in between, read it again.
+                if attempt == OPEN_RETRIES - 1:
+                    raise
+                continue
+
+            return Shard(
+                version,
+                generation,
+                sidecar["ids"],
+                sidecar["offsets"],
+                matrix,
+                quantized,
+                text,
+                metadata,
+            )
+
+        return None
+
+    def _evict(self, file_id: str):
+        """
+        Unmap a resident shard, lock must be held.
+
+        :param file_id: file id
+        :return: None
+        """
+        shard = self._resident.pop(file_id, None)
+        self._checked.pop(file_id, None)
+        if shard is not None:
+            self._resident_bytes -= shard.nbytes
+
+    def _cached(self, file_id: str) -> Shard | None:
+        """
+        Get a resident shard that is still current.
+
+        :param file_id: file id
+        :return: resident shard or None when it must be loaded
+        """
+        generation = self._generations.value
+        with self._lock:
+            shard = self._resident.get(file_id)
+            if shard is None:
+                return None
+            checked = self._checked.get(file_id) == generation
+
+        if not checked and manifest_version(self._shard_dir(file_id)) != shard.version:
+            return None
+
+        with self._lock:
+            if self._resident.get(file_id) is shard:
+                self._resident.move_to_end(file_id)
+                self._checked[file_id] = generation
+        self.stats.increment("hits")
+        return shard
+
+    def _load(self, file_id: str) -> Shard | None:
+        """
+        Map a file's shard and make it resident within the byte budget.
+
+        :param file_id: file id
+        :return: mapped shard or None without shard
+        """
+        # Read first, a write landing while mapping moves the counter again.
+        generation = self._generations.value
+        shard = self._open(file_id)
+        with self._lock:
+            self._evict(file_id)
+            if shard is None:
+                return None
+
+            self._resident[file_id] = shard
+            self._checked[file_id] = generation
+            self._resident_bytes += shard.nbytes
+            while (
+                self._resident_bytes > self.residency_bytes and len(self._resident) > 1
+            ):
+                self._evict(next(iter(self._resident)))
+                self.stats.increment("evictions")
+
+        self.stats.increment("loads")
+        return shard
+
+    def _read_vectors(self, file_id: str) -> tuple[FileVectors | None, int]:
+        """
+        Read a file's vectors for rewriting, shard lock must be held.
+
+        :param file_id: file id
+        :return: current vectors and generation, None and 0 without shard
+        """
+        shard = self._open(file_id)
+        if shard is None:
+            return None, 0
+
+        metadata = [shard.metadata_at(row, file_id) for row in range(len(shard.ids))]
+        return FileVectors(shard.ids, shard.matrix, metadata), shard.generation
+
+    def _write_vectors(
+        self, file_id: str, vectors: FileVectors | None, generation: int
+    ):
+        """
+        Write a new shard generation and publish it, shard lock must be held.
+
+        :param file_id: file id
+        :param vectors: vectors of the file or None to remove the shard
+        :param generation: generation being replaced
+        :return: None
+        """
+        shard_dir = self._shard_dir(file_id)
+
+        if vectors is None:
+            (shard_dir / MANIFEST).unlink(missing_ok=True)
+        else:
+            new = generation + 1
+            encoded = [
+                meta.get("text", "").encode("utf-8") for meta in vectors.metadata
+            ]
+            offsets = [0]
+            for text in encoded:
+                offsets.append(offsets[-1] + len(text))
+
+            matrix = np.ascontiguousarray(vectors.matrix, dtype=np.float32)
+            write_file(
+                shard_dir / f"vectors-{new}.npy", lambda file: np.save(file, matrix)
+            )
+            if self.quantization != "none":
+                quantized = quantize(matrix, self.quantization)
+                write_file(
+                    shard_dir / f"quantized-{new}.npy",
+                    lambda file: np.save(file, quantized.data),
+                )
+                write_file(
+                    shard_dir / f"scales-{new}.npy",
+                    lambda file: np.save(file, quantized.scales),
+                )
+            write_file(shard_dir / f"text-{new}.bin", b"".join(encoded))
+            write_file(
+                shard_dir / f"ids-{new}.json",
+                json.dumps({"ids": vectors.ids, "offsets": offsets}).encode(),
+            )
+            extra = [
+                {
+                    key: value
+                    for key, value in meta.items()
+                    if key not in SHARED_METADATA
+                }
+                for meta in vectors.metadata
+            ]
+            write_file(shard_dir / f"metadata-{new}.json", json.dumps(extra).encode())
+            manifest = {
+                "file_id": file_id,
+                "generation": new,
+                "count": len(vectors.ids),
+                "dimensions": matrix.shape[1],
+                "quantization": self.quantization,
+            }
+            publish_manifest(shard_dir, manifest)
+
+        self._generations.bump()
+
+        # Readers mapping the replaced generation keep it until they unmap.
+        for path in shard_dir.glob(f"*-{generation}.*"):
+            path.unlink(missing_ok=True)
+
+    def _update(
+        self,
+        file_id: str,
+        change: Callable[[FileVectors | None], FileVectors | None],
+    ):
+        """
+        Rewrite a file's shard holding an exclusive lock shared with other processes.
+
+        :param file_id: file id
+        :param change: callable building the new vectors from the current ones
+        :return: None
+        """
+        shard_dir = self._shard_dir(file_id)
+        shard_dir.mkdir(exist_ok=True)
+
+        with exclusive_lock(shard_dir):
+            current, generation = self._read_vectors(file_id)
+            updated = change(current)
+            if updated is not current:
+                self._write_vectors(file_id, updated, generation)
+
+        with self._lock:
+            self._evict(file_id)
+
+    def _upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors, blocking.
+
+        :param vectors: vector records
+        :return: None
+        """
+        for file_id, records in group_by_file(vectors).items():
+            self._update(file_id, lambda current: merge_vectors(current, records))
+
+    def _delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, blocking.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        remove = set(ids)
+        self._update(
+            file_id,
+            lambda current: current and remove_vectors(current, remove),
+        )
+
+    async def upsert(self, vectors: list[dict]):
+        """
+        Insert or replace vectors.
+
+        :param vectors: vector records
+        :return: None
+        """
+        await asyncio.to_thread(self._upsert, vectors)
+
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await asyncio.to_thread(self._query, vector, file_id, top_k)
+
+    def _query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the vectors of a file most similar to a query vector, blocking.
+
+        Scoring reads the mapped pages, so it runs off the event loop
+        together with loading, a cold shard faults its pages in here.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        shard = self._cached(file_id) or self._load(file_id)
+        if shard is None:
+            return []
+
+        if shard.quantized is None:
+            ranked = rank_matches(shard.matrix, vector, top_k)
+        else:
+            ranked = rescored_matches(
+                shard.matrix, shard.quantized, vector, top_k, self.rescore_factor
+            )
+
+        return [
+            VectorMatch(shard.ids[row], score, shard.metadata_at(row, file_id))
+            for row, score in ranked
+        ]
+
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the vectors of a file.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+        shard = await asyncio.to_thread(
+            lambda: self._cached(file_id) or self._load(file_id)
+        )
+        return list(shard.ids) if shard is not None else []
+
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the vector records of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+        current, _ = await asyncio.to_thread(self._read_vectors, file_id)
+        return fetch_records(current, ids) if current is not None else []
+
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        await asyncio.to_thread(self._delete, ids, file_id)
+
+    def buffered(self) -> "BufferedShardStore":
+        """
+        Get a store holding upserts back until flushed.
+
+        :return: buffered view of the store
+        """
+        return BufferedShardStore(self)
+
+    def metrics(self) -> dict:
+        """
+        Shard residency metrics.
+
+        :return: metrics dictionary
+        """
+        with self._lock:
+            resident = {
+                "resident_shards": len(self._resident),
+                "resident_bytes": self._resident_bytes,
+            }
+        return {**self.stats.snapshot(), **resident}
+
+
+class BufferedShardStore(VectorStore):
+    """
+    Shard store view writing the upserts of a file at once.
+
+    Upserted records are held by file and id until `flush`, which writes
+    each file's shard once. Reads go to the store and do not see the held
+    records, deletes also drop held records with the deleted ids.
+    """
+
+    def __init__(self, store: ShardVectorStore):
+        """
+        Initialize the view.
+
+        :param store: shard store written on flush
+        """
+        self.store = store
+        self._pending: dict[tuple[str, str], dict] = {}
+
+    async def upsert(self, vectors: list[dict]):
+        """
+        Hold vectors until flushed, a later record replaces one with its id.
+
+        :param vectors: vector records
+        :return: None
+        """
+        for record in vectors:
+            self._pending[(record["metadata"]["file_id"], record["id"])] = record
+
+    async def flush(self):
+        """
+        Write the held vectors, one shard write per file.
+
+        :return: None
+        """
+        records, self._pending = list(self._pending.values()), {}
+        if records:
+            await self.store.upsert(records)
+
+    async def query(
+        self, vector: list[float], file_id: str, top_k: int
+    ) -> list[VectorMatch]:
+        """
+        Find the stored vectors of a file most similar to a query vector.
+
+        :param vector: query vector
+        :param file_id: file id the matches must belong to
+        :param top_k: maximum number of matches
+        :return: matches by descending cosine similarity
+        """
+        return await self.store.query(vector, file_id, top_k)
+
+    async def list_ids(self, file_id: str) -> list[str]:
+        """
+        List the ids of the stored vectors of a file.
+
+        :param file_id: file id
+        :return: vector ids
+        """
+        return await self.store.list_ids(file_id)
+
+    async def fetch(self, ids: list[str], file_id: str) -> list[dict]:
+        """
+        Get the stored vector records of a file, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: vector records with their values and metadata
+        """
+        return await self.store.fetch(ids, file_id)
+
+    async def delete(self, ids: list[str], file_id: str):
+        """
+        Delete vectors of a file, held or stored, unknown ids are ignored.
+
+        :param ids: vector ids
+        :param file_id: file id the vectors belong to
+        :return: None
+        """
+        for vector_id in ids:
+            self._pending.pop((file_id, vector_id), None)
+        await self.store.delete(ids, file_id)
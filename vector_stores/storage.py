@@ -0,0 +1,120 @@
+"""Vector store file helpers module."""
+
+import fcntl
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+MANIFEST = "manifest.json"
+GENERATION = "generation"
+
+
+def write_file(path: Path, data: bytes | Callable):
+    """
+    Write a file and flush it to disk.
+
+    :param path: file path
+    :param data: file content or a callable writing to the open file
+    :return: None
+    """
+    with open(path, "wb") as file:
+        if callable(data):
+            data(file)
+        else:
+            file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def manifest_version(directory: Path) -> tuple[int, int] | None:
+    """
+    Version of a manifest, changed by every manifest replacement.
+
+    :param directory: directory holding the manifest
+    :return: manifest inode and modification time or None without manifest
+    """
+    try:
+        stat = os.stat(directory / MANIFEST)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def read_manifest(directory: Path) -> tuple[dict, tuple[int, int]] | None:
+    """
+    Read a manifest.
+
+    :param directory: directory holding the manifest
+    :return: manifest and its version or None without manifest
+    """
+    try:
+        with open(directory / MANIFEST, "rb") as file:
+            stat = os.fstat(file.fileno())
+            return json.load(file), (stat.st_ino, stat.st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+
+def publish_manifest(directory: Path, manifest: dict):
+    """
+    Atomically replace a manifest, files it names must already be on disk.
+
+    :param directory: directory holding the manifest
+    :param manifest: manifest content
+    :return: None
+    """
+    write_file(directory / f"{MANIFEST}.tmp", json.dumps(manifest).encode())
+    os.replace(directory / f"{MANIFEST}.tmp", directory / MANIFEST)
+
+
+@contextmanager
+def exclusive_lock(directory: Path):
+    """
+    Hold an exclusive lock on a directory shared with other processes.
+
+    :param directory: directory to lock
+    :yield: None
+    """
+    with open(directory / "lock", "ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+class GenerationCounter:
+    """
+    Count of manifest replacements under a directory, shared by processes.
+
+    The counter is a memory-mapped file, so readers notice writes of other
+    processes with a memory read instead of a file system call.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Map the counter file, creating it when missing.
+
+        :param directory: directory holding the counter
+        """
+        self.directory = directory
+        with open(directory / GENERATION, "ab") as file:
+            # Extending to 8 bytes is idempotent, racing creators agree.
+            if os.fstat(file.fileno()).st_size < 8:
+                file.truncate(8)
+        with open(directory / GENERATION, "r+b") as file:
+            self._map = mmap.mmap(file.fileno(), 8)
+
+    @property
+    def value(self) -> int:
+        """Current count."""
+        return int.from_bytes(self._map[:8], "little")
+
+    def bump(self):
+        """
+        Increment the count.
+
+        :return: None
+        """
+        with exclusive_lock(self.directory):
+            self._map[:8] = (self.value + 1).to_bytes(8, "little")
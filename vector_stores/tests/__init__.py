@@ -0,0 +1 @@
+"""Vector store tests module."""
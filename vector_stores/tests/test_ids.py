@@ -0,0 +1,23 @@
+"""Test deterministic vector ids module."""
+
+from vector_stores.ids import file_prefix, paragraph_ids
+
+
+class TestParagraphIds:
+    """Test paragraph_ids function."""
+
+    def test_ids_are_deterministic_per_file(self):
+        """Test ids depend only on the file and the paragraph contents."""
+        ids = paragraph_ids("file.json", ["a", "b"])
+
+        assert ids == paragraph_ids("file.json", ["a", "b"])
+        assert ids != paragraph_ids("other.json", ["a", "b"])
+        assert all(vid.startswith(file_prefix("file.json")) for vid in ids)
+
+    def test_ids_survive_insertions_and_repeats(self):
+        """Test inserted paragraphs keep the other ids, repeats get their own."""
+        before = paragraph_ids("file.json", ["a", "b", "a"])
+        after = paragraph_ids("file.json", ["new", "a", "b", "a"])
+
+        assert len(set(before)) == 3
+        assert after[1:] == before
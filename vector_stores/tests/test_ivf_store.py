@@ -0,0 +1,136 @@
+"""Test inverted file vector index module."""
+
+import asyncio
+
+import numpy as np
+
+from vector_stores import IVFVectorStore
+from vector_stores.local_store import normalize_rows, top_k_indices
+
+
+def clustered_records(rows: int, dims: int = 16, files: int = 3) -> list[dict]:
+    """
+    Build vector records grouped around a few directions.
+
+    :param rows: number of records
+    :param dims: vector dimensions
+    :param files: number of files the records are spread over
+    :return: vector records
+    """
+    rng = np.random.default_rng(0)
+    centroids = rng.normal(size=(8, dims))
+    values = centroids[rng.integers(8, size=rows)] + rng.normal(
+        scale=0.3, size=(rows, dims)
+    )
+    return [
+        {
+            "id": f"v{idx}",
+            "values": values[idx].tolist(),
+            "metadata": {"text": f"text {idx}", "file_id": f"file-{idx % files}"},
+        }
+        for idx in range(rows)
+    ]
+
+
+class TestIVFVectorStore:
+    """Test IVFVectorStore class."""
+
+    def test_trains_and_searches_across_files(self, tmp_path):
+        """
+        Test lists are trained once enough vectors arrive and probed queries
+        find the exact nearest neighbours.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = IVFVectorStore(str(tmp_path), nlist=4, nprobe=4, max_segments=100)
+        records = clustered_records(200)
+        for start in range(0, len(records), 50):
+            asyncio.run(store.upsert(records[start : start + 50]))
+
+        assert store.metrics()["lists"] == 4
+        assert store.metrics()["segments"] == 1
+
+        matrix = normalize_rows(np.array([r["values"] for r in records], np.float32))
+        query = records[7]["values"]
+        expected = top_k_indices(matrix @ normalize_rows(np.array(query)), 5)
+
+        matches = asyncio.run(store.query_all(query, top_k=5))
+        assert [m.id for m in matches] == [f"v{row}" for row in expected]
+        assert matches[0].metadata == {"text": "text 7", "file_id": "file-1"}
+
+        filtered = asyncio.run(store.query_all(query, 5, file_ids=["file-2"]))
+        assert {m.metadata["file_id"] for m in filtered} == {"file-2"}
+
+    def test_query_files_exact_for_small_selections(self, tmp_path):
+        """
+        Test files holding fewer rows than the probed lists are searched
+        exactly, larger selections are probed.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = IVFVectorStore(str(tmp_path), nlist=4, nprobe=2, max_segments=100)
+        records = clustered_records(200)
+        asyncio.run(store.upsert(records))
+
+        selected = [r for r in records if r["metadata"]["file_id"] == "file-2"]
+        matrix = normalize_rows(np.array([r["values"] for r in selected], np.float32))
+        query = records[0]["values"]
+        expected = top_k_indices(matrix @ normalize_rows(np.array(query)), 5)
+
+        matches = asyncio.run(store.query_files(query, ["file-2"], top_k=5))
+        assert [m.id for m in matches] == [selected[row]["id"] for row in expected]
+
+        probed = asyncio.run(store.query_files(query, ["file-1", "file-2"], top_k=5))
+        assert len(probed) == 5
+        assert {m.metadata["file_id"] for m in probed} <= {"file-1", "file-2"}
+
+    def test_persisted_incremental_writes_and_deletes(self, tmp_path):
+        """
+        Test another store on the same directory sees appended and deleted
+        vectors, also after delta segments are compacted.
+
+        :param tmp_path: temporary directory fixture
+        """
+        writer = IVFVectorStore(str(tmp_path), nlist=2, nprobe=2, max_segments=3)
+        records = clustered_records(100)
+        asyncio.run(writer.upsert(records[:90]))
+        reader = IVFVectorStore(str(tmp_path), nlist=2, nprobe=2, max_segments=3)
+        assert len(asyncio.run(reader.query(records[0]["values"], "file-0", 100))) == 30
+
+        asyncio.run(writer.delete(["v0", "v3"], "file-0"))
+        asyncio.run(writer.upsert(records[90:91]))
+        asyncio.run(writer.delete(["v6"], "file-0"))
+        asyncio.run(writer.upsert(records[:1]))
+
+        matches = asyncio.run(reader.query(records[0]["values"], "file-0", 100))
+        ids = {m.id for m in matches}
+        assert len(matches) == 29
+        assert "v0" in ids and "v90" in ids and "v3" not in ids and "v6" not in ids
+        assert set(asyncio.run(reader.list_ids("file-0"))) == ids
+        # Few delta vectors were merged into one segment next to the base,
+        # the last upsert added a delta segment after it.
+        stats = writer.stats.snapshot()
+        assert stats["trainings"] == 1 and stats["compactions"] == 2
+        assert reader.metrics()["segments"] == 3
+
+    def test_metadata_survives_compaction(self, tmp_path):
+        """
+        Test metadata besides the text and file id is kept through compaction.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = IVFVectorStore(str(tmp_path), nlist=4, nprobe=4, max_segments=1)
+        records = clustered_records(20)
+        for idx, record in enumerate(records):
+            record["metadata"].update(paragraph_start=idx, paragraph_end=idx + 1)
+        for start in range(0, len(records), 5):
+            asyncio.run(store.upsert(records[start : start + 5]))
+
+        reader = IVFVectorStore(str(tmp_path), nlist=4, nprobe=4, max_segments=1)
+        fetched = asyncio.run(reader.fetch(["v7", "unknown"], "file-1"))
+        matches = asyncio.run(reader.query(records[7]["values"], "file-1", top_k=1))
+
+        assert store.metrics()["compactions"] > 0
+        assert fetched[0]["metadata"] == records[7]["metadata"]
+        assert [record["id"] for record in fetched] == ["v7"]
+        assert matches[0].metadata == records[7]["metadata"]
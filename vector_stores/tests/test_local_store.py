@@ -0,0 +1,95 @@
+"""Test local vector store module."""
+
+import asyncio
+
+import numpy as np
+
+from vector_stores import LocalVectorStore
+
+
+def record(vid: str, values: list[float], file_id: str = "file-1") -> dict:
+    """
+    Build a vector record.
+
+    :param vid: vector id
+    :param values: vector values
+    :param file_id: file id
+    :return: vector record
+    """
+    return {"id": vid, "values": values, "metadata": {"text": vid, "file_id": file_id}}
+
+
+class TestLocalVectorStore:
+    """Test LocalVectorStore class."""
+
+    def test_query_ranks_by_cosine_similarity(self):
+        """Test top k matches of one file ordered by cosine similarity."""
+        store = LocalVectorStore()
+        asyncio.run(
+            store.upsert(
+                [
+                    record("a", [1.0, 0.0]),
+                    record("b", [2.0, 2.0]),
+                    record("c", [0.0, 3.0]),
+                    record("d", [1.0, 0.0], file_id="file-2"),
+                ]
+            )
+        )
+
+        matches = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=2))
+
+        assert [match.id for match in matches] == ["c", "b"]
+        assert np.isclose(matches[0].score, 1.0)
+        assert np.isclose(matches[1].score, np.sqrt(0.5))
+        assert matches[0].metadata == {"text": "c", "file_id": "file-1"}
+        assert asyncio.run(store.query([0.0, 1.0], "unknown", top_k=2)) == []
+
+    def test_query_files_merges_top_k(self):
+        """Test matches of many files are merged by cosine similarity."""
+        store = LocalVectorStore()
+        asyncio.run(
+            store.upsert(
+                [
+                    record("a", [1.0, 0.0]),
+                    record("b", [1.0, 1.0], file_id="file-2"),
+                    record("c", [0.0, 1.0], file_id="file-2"),
+                    record("d", [0.0, 1.0], file_id="file-3"),
+                ]
+            )
+        )
+
+        matches = asyncio.run(
+            store.query_files([0.0, 1.0], ["file-1", "file-2", "unknown"], top_k=2)
+        )
+
+        assert [(m.id, m.metadata["file_id"]) for m in matches] == [
+            ("c", "file-2"),
+            ("b", "file-2"),
+        ]
+
+    def test_upsert_replaces_vectors(self):
+        """Test upserting an existing id replaces its row."""
+        store = LocalVectorStore()
+        asyncio.run(store.upsert([record("a", [1.0, 0.0]), record("b", [0.0, 1.0])]))
+        asyncio.run(store.upsert([record("a", [0.0, 1.0]), record("c", [1.0, 1.0])]))
+
+        matches = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=5))
+
+        assert [(m.id, round(m.score, 3)) for m in matches] == [
+            ("a", 1.0),
+            ("b", 1.0),
+            ("c", 0.707),
+        ]
+
+    def test_delete(self):
+        """Test deleted vectors are no longer matched."""
+        store = LocalVectorStore()
+        asyncio.run(store.upsert([record("a", [1.0, 0.0]), record("b", [0.0, 1.0])]))
+
+        asyncio.run(store.delete(["a", "unknown"], "file-1"))
+        assert [m.id for m in asyncio.run(store.query([1.0, 0.0], "file-1", 5))] == [
+            "b"
+        ]
+
+        asyncio.run(store.delete(["b"], "file-1"))
+        assert asyncio.run(store.query([1.0, 0.0], "file-1", 5)) == []
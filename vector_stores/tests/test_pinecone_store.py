@@ -0,0 +1,61 @@
+"""Test Pinecone vector store module."""
+
+import asyncio
+from unittest.mock import Mock
+
+from vector_stores import PineconeVectorStore
+from vector_stores.ids import file_prefix
+
+
+class TestPineconeVectorStore:
+    """Test PineconeVectorStore class."""
+
+    def test_list_ids_by_file_prefix(self):
+        """Test ids of a file are listed page by page under its id prefix."""
+        index = Mock()
+        index.list.return_value = iter([["a", "b"], ["c"]])
+        store = PineconeVectorStore(index, "namespace")
+
+        assert asyncio.run(store.list_ids("file.json")) == ["a", "b", "c"]
+        index.list.assert_called_once_with(
+            prefix=file_prefix("file.json"), namespace="namespace"
+        )
+
+    def test_delete_in_request_sized_batches(self):
+        """Test deletes are split into batches Pinecone accepts."""
+        index = Mock()
+        store = PineconeVectorStore(index, "namespace")
+
+        asyncio.run(store.delete([str(idx) for idx in range(2500)], "file.json"))
+
+        assert [len(call.kwargs["ids"]) for call in index.delete.call_args_list] == [
+            1000,
+            1000,
+            500,
+        ]
+
+    def test_fetch_in_request_sized_batches(self):
+        """Test fetched vectors are returned as records, batch by batch."""
+        index = Mock()
+        index.fetch.side_effect = lambda ids, namespace: Mock(
+            vectors={
+                vid: Mock(values=[1.0], metadata={"file_id": "file.json"})
+                for vid in ids
+            }
+        )
+        store = PineconeVectorStore(index, "namespace")
+
+        records = asyncio.run(
+            store.fetch([str(idx) for idx in range(1500)], "file.json")
+        )
+
+        assert len(records) == 1500
+        assert records[0] == {
+            "id": "0",
+            "values": [1.0],
+            "metadata": {"file_id": "file.json"},
+        }
+        assert [len(call.kwargs["ids"]) for call in index.fetch.call_args_list] == [
+            1000,
+            500,
+        ]
@@ -0,0 +1,63 @@
+"""Test vector quantization module."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from vector_stores import ShardVectorStore
+from vector_stores.local_store import normalize_rows, rank_matches
+from vector_stores.quantization import approximate_scores, quantize, rescored_matches
+from vector_stores.tests.test_local_store import record
+
+
+class TestQuantization:
+    """Test scalar quantization and rescoring."""
+
+    def test_quantized_scores_close_to_exact(self):
+        """Test int8 scores approximate float32 dot products."""
+        rng = np.random.default_rng(0)
+        matrix = normalize_rows(rng.normal(size=(50, 64)).astype(np.float32))
+        query = matrix[0]
+
+        quantized = quantize(matrix, "int8")
+        scores = approximate_scores(quantized, query)
+
+        assert quantized.data.itemsize == 1
+        assert np.allclose(scores, matrix @ query, atol=0.02)
+
+    def test_float16_not_offered(self):
+        """Test float16 quantization is refused."""
+        with pytest.raises(ValueError):
+            quantize(np.ones((1, 2), dtype=np.float32), "float16")
+
+    def test_rescored_matches_equal_exact_ranking(self):
+        """Test rescoring returns exact scores of the exact top k."""
+        rng = np.random.default_rng(1)
+        matrix = normalize_rows(rng.normal(size=(500, 32)).astype(np.float32))
+        vector = list(matrix[7] + rng.normal(scale=0.1, size=32))
+
+        expected = rank_matches(matrix, vector, top_k=5)
+        ranked = rescored_matches(
+            matrix, quantize(matrix, "int8"), vector, top_k=5, rescore_factor=4
+        )
+
+        assert [row for row, _ in ranked] == [row for row, _ in expected]
+        assert np.allclose([s for _, s in ranked], [s for _, s in expected])
+
+    def test_int8_shard_store(self, tmp_path):
+        """
+        Test int8 shards are queried with exact scores and budgeted quantized.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = ShardVectorStore(str(tmp_path), 1 << 20, quantization="int8")
+        asyncio.run(store.upsert([record("a", [1.0, 0.0]), record("b", [1.0, 1.0])]))
+
+        matches = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=1))
+
+        assert matches[0].id == "b"
+        assert matches[0].score == pytest.approx(np.sqrt(0.5))
+        shard = store._resident["file-1"]
+        assert shard.quantized.data.dtype == np.int8
+        assert shard.nbytes == 2 * 2 + 2 * 4 + 2
@@ -0,0 +1,161 @@
+"""Test memory-mapped shard vector store module."""
+
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+
+from vector_stores import ShardVectorStore
+from vector_stores.storage import manifest_version
+from vector_stores.tests.test_local_store import record
+
+
+class TestShardVectorStore:
+    """Test ShardVectorStore class."""
+
+    def test_query_mapped_shard(self, tmp_path):
+        """
+        Test vectors and texts written to disk are queried from a mapped shard.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        asyncio.run(
+            store.upsert(
+                [
+                    record("a", [1.0, 0.0]),
+                    record("建物", [1.0, 1.0]),
+                    record("c", [1.0, 0.0], file_id="file-2"),
+                ]
+            )
+        )
+
+        matches = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=1))
+        again = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=1))
+
+        assert matches == again
+        assert matches[0].id == "建物"
+        assert matches[0].metadata == {"text": "建物", "file_id": "file-1"}
+        assert isinstance(store._resident["file-1"].matrix, np.memmap)
+        assert store.metrics()["loads"] == 1 and store.metrics()["hits"] == 1
+        assert asyncio.run(store.list_ids("file-1")) == ["a", "建物"]
+        assert asyncio.run(store.list_ids("unknown")) == []
+
+    def test_writes_visible_to_other_process_stores(self, tmp_path):
+        """
+        Test a store notices shards rewritten by another store on the same files.
+
+        :param tmp_path: temporary directory fixture
+        """
+        writer = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        reader = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        asyncio.run(writer.upsert([record("a", [1.0, 0.0]), record("b", [0.0, 1.0])]))
+        assert len(asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))) == 2
+
+        asyncio.run(writer.delete(["a"], "file-1"))
+        matches = asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))
+
+        assert [match.id for match in matches] == ["b"]
+        assert sorted(path.name for path in tmp_path.glob("*/*-*")) == [
+            "ids-2.json",
+            "metadata-2.json",
+            "text-2.bin",
+            "vectors-2.npy",
+        ]
+
+        asyncio.run(writer.delete(["b"], "file-1"))
+        assert asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5)) == []
+
+    def test_buffered_upserts_written_once(self, tmp_path):
+        """
+        Test buffered upsert batches are written as one generation on flush.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        buffered = store.buffered()
+
+        asyncio.run(buffered.upsert([record("a", [1.0, 0.0]), record("b", [0.0, 1.0])]))
+        asyncio.run(buffered.upsert([record("c", [1.0, 1.0]), record("a", [0.0, 1.0])]))
+        asyncio.run(buffered.delete(["b"], "file-1"))
+        assert asyncio.run(store.list_ids("file-1")) == []
+
+        asyncio.run(buffered.flush())
+        matches = asyncio.run(store.query([0.0, 1.0], "file-1", top_k=1))
+
+        assert asyncio.run(store.list_ids("file-1")) == ["a", "c"]
+        assert matches[0].id == "a"
+        assert [path.name for path in tmp_path.glob("*/vectors-*")] == ["vectors-1.npy"]
+
+    def test_metadata_round_trip(self, tmp_path):
+        """
+        Test metadata besides the text and file id is kept per vector.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        spanned = record("a", [1.0, 0.0])
+        spanned["metadata"].update(paragraph_start=3, paragraph_end=5)
+        asyncio.run(store.upsert([spanned, record("b", [0.0, 1.0])]))
+        asyncio.run(store.upsert([record("c", [1.0, 1.0])]))
+
+        matches = asyncio.run(store.query([1.0, 0.0], "file-1", top_k=3))
+        fetched = asyncio.run(store.fetch(["a", "unknown"], "file-1"))
+
+        assert {match.id: match.metadata for match in matches} == {
+            "a": {
+                "text": "a",
+                "file_id": "file-1",
+                "paragraph_start": 3,
+                "paragraph_end": 5,
+            },
+            "b": {"text": "b", "file_id": "file-1"},
+            "c": {"text": "c", "file_id": "file-1"},
+        }
+        assert fetched[0]["metadata"] == matches[0].metadata
+        assert [record["id"] for record in fetched] == ["a"]
+
+    def test_manifest_checked_only_after_writes(self, tmp_path):
+        """
+        Test resident shards skip the manifest check until a store writes.
+
+        :param tmp_path: temporary directory fixture
+        """
+        writer = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        reader = ShardVectorStore(str(tmp_path), residency_bytes=1 << 20)
+        asyncio.run(writer.upsert([record("a", [1.0, 0.0])]))
+        asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))
+
+        with patch(
+            "vector_stores.shard_store.manifest_version", wraps=manifest_version
+        ) as checked:
+            asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))
+            assert checked.call_count == 0
+
+            asyncio.run(writer.upsert([record("b", [0.0, 1.0], file_id="file-2")]))
+            asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))
+            asyncio.run(reader.query([1.0, 0.0], "file-1", top_k=5))
+            assert checked.call_count == 1
+
+        assert reader.metrics()["loads"] == 1
+
+    def test_residency_budget_evicts_least_recently_used(self, tmp_path):
+        """
+        Test cold shards are unmapped once the byte budget is exceeded.
+
+        :param tmp_path: temporary directory fixture
+        """
+        store = ShardVectorStore(str(tmp_path), residency_bytes=40)
+        asyncio.run(
+            store.upsert(
+                [record("a", [1.0] * 4, file_id=f"file-{idx}") for idx in range(3)]
+            )
+        )
+
+        for file_id in ["file-0", "file-1", "file-0", "file-2"]:
+            asyncio.run(store.query([1.0] * 4, file_id, top_k=1))
+
+        assert list(store._resident) == ["file-0", "file-2"]
+        metrics = store.metrics()
+        assert metrics["evictions"] == 1
+        assert metrics["resident_bytes"] == 2 * (16 + 1)
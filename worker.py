@@ -0,0 +1,253 @@
+"""
+Ingestion worker module.
+
+Runs the ingestion jobs queued by the OCR endpoint, separately from the API
+workers::
+
+    python -m worker --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+from contextlib import contextmanager
+from typing import Awaitable, Callable
+
+import redis.asyncio as aioredis  # type: ignore[import-untyped]
+from loguru import logger
+from redis.exceptions import RedisError  # type: ignore[import-untyped]
+
+from dependencies import (
+    get_document_embedding_store,
+    get_embedding_batcher,
+    get_embedding_scheduler,
+    get_job_status_store,
+    get_llm_embedding_client,
+    get_search_cache,
+    get_vector_store,
+)
+from operations.ingest_queue import Delivery, IngestConsumer
+from operations.ingest_service import IngestProgress, IngestService
+from pinecone_client import get_pinecone_registry
+from redis_client import get_async_redis_pool
+from settings import Settings, get_settings
+
+JobHandler = Callable[[dict, IngestProgress], Awaitable[None]]
+
+
+class IngestWorker:
+    """
+    Run queued ingestion jobs, up to `concurrency` at a time.
+
+    New jobs are only received while a slot is free. Running jobs keep
+    their queue entries visible until they finish and are acknowledged,
+    failed jobs are handed back to the queue for another attempt. The
+    progress of running jobs is written to their status every
+    `ingest_job_progress_interval` seconds.
+    """
+
+    def __init__(self, consumer: IngestConsumer, handler: JobHandler, concurrency: int):
+        """
+        Inject class dependencies.
+
+        :param consumer: ingestion job queue consumer
+        :param handler: coroutine function running a job and updating its progress
+        :param concurrency: maximum number of jobs running at once
+        """
+        self.consumer = consumer
+        self.status_store = consumer.status_store
+        self.handler = handler
+        self.concurrency = concurrency
+        self.heartbeat = consumer.settings.ingest_visibility_timeout / 3
+        self.progress_interval = consumer.settings.ingest_job_progress_interval
+
+    async def run(self, stop: asyncio.Event):
+        """
+        Receive and run jobs until `stop` is set, then finish running jobs.
+
+        :param stop: event set to shut the worker down
+        :return: None
+        """
+        await self.consumer.ensure_group()
+        running: set[asyncio.Task] = set()
+
+        while not stop.is_set():
+            if len(running) >= self.concurrency:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                deliveries = await self.consumer.receive(
+                    self.concurrency - len(running)
+                )
+            except RedisError as exc:
+                logger.warning(f"Ingestion queue unavailable: {exc}")
+                await asyncio.sleep(1)
+                continue
+
+            for delivery in deliveries:
+                task = asyncio.create_task(self._process(delivery))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+        if running:
+            logger.info(f"Waiting for {len(running)} running ingestion jobs...")
+            await asyncio.gather(*running)
+
+    async def _process(self, delivery: Delivery):
+        """
+        Run a job, then acknowledge it or hand it back for a retry.
+
+        :param delivery: delivered job
+        :return: None
+        """
+        job_id = delivery.job["job_id"]
+        progress = IngestProgress()
+        await self.status_store.update(
+            job_id, state="running", attempt=delivery.job["attempt"]
+        )
+        background = [
+            asyncio.create_task(self._keep_visible(delivery.message_id)),
+            asyncio.create_task(self._report_progress(job_id, progress)),
+        ]
+        error: str | None = None
+        try:
+            logger.info(
+                f"Running ingestion job {job_id}, attempt {delivery.job['attempt']}"
+            )
+            await self.handler(delivery.job, progress)
+        except Exception as exc:
+            logger.exception(f"Ingestion job {job_id} failed")
+            error = repr(exc)
+        finally:
+            # Awaited so no progress report lands after the final status.
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+        if error is not None:
+            await self.status_store.update(job_id, progress=progress.snapshot())
+            await self.consumer.retry(delivery, error)
+            return
+
+        await self.consumer.ack(delivery.message_id)
+        await self.status_store.update(
+            job_id, state="done", error=None, progress=progress.snapshot()
+        )
+        logger.info(f"Ingestion job {job_id} done")
+
+    async def _keep_visible(self, message_id: str):
+        """
+        Periodically extend the visibility of a running job.
+
+        :param message_id: stream entry id
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            try:
+                await self.consumer.extend(message_id)
+            except RedisError as exc:
+                logger.warning(f"Ingestion job visibility not extended: {exc}")
+
+    async def _report_progress(self, job_id: str, progress: IngestProgress):
+        """
+        Periodically write the progress of a running job to its status.
+
+        :param job_id: ingestion job id
+        :param progress: progress of the running job
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self.status_store.update(job_id, progress=progress.snapshot())
+
+
+def build_handler(settings: Settings, redis_client: aioredis.Redis) -> JobHandler:
+    """
+    Build the handler ingesting the file of a job.
+
+    :param settings: Application settings
+    :param redis_client: asyncio Redis client
+    :return: coroutine function running a job
+    """
+    embedding_client = get_embedding_batcher(
+        settings,
+        get_embedding_scheduler(
+            settings, redis_client, get_llm_embedding_client(settings)
+        ),
+    )
+    embedding_store = get_document_embedding_store(settings, redis_client)
+    search_cache = get_search_cache(settings, redis_client)
+
+    async def handle(job: dict, progress: IngestProgress):
+        with contextmanager(get_vector_store)(settings) as vector_store:
+            await IngestService(
+                settings,
+                vector_store,
+                embedding_client,
+                embedding_store,
+                progress,
+                search_cache,
+            ).ingest(job["file_id"])
+
+    return handle
+
+
+async def serve(settings: Settings, concurrency: int, name: str):
+    """
+    Run the ingestion worker until SIGINT or SIGTERM.
+
+    :param settings: Application settings
+    :param concurrency: maximum number of jobs running at once
+    :param name: queue consumer name
+    :return: None
+    """
+    if settings.vector_store_backend == "local":
+        # Vectors upserted here would stay in this process' memory, out of
+        # reach of the API processes serving searches.
+        raise SystemExit(
+            "The ingestion worker cannot run on the `local` vector store "
+            "backend, use `shard`, `ivf` or `pinecone`"
+        )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    use_pinecone = settings.vector_store_backend == "pinecone"
+    if use_pinecone:
+        await asyncio.to_thread(get_pinecone_registry(settings).start)
+    redis_client = aioredis.Redis(connection_pool=get_async_redis_pool(settings))
+
+    logger.info(f"Ingestion worker {name} running {concurrency} concurrent jobs")
+    try:
+        status_store = get_job_status_store(settings, redis_client)
+        consumer = IngestConsumer(settings, redis_client, name, status_store)
+        worker = IngestWorker(
+            consumer, build_handler(settings, redis_client), concurrency
+        )
+        await worker.run(stop)
+    finally:
+        if use_pinecone:
+            get_pinecone_registry(settings).close()
+        await get_async_redis_pool(settings).aclose()
+
+
+def main():
+    """Ingestion worker entry point."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run queued ingestion jobs.")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.ingest_worker_concurrency
+    )
+    parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+    asyncio.run(serve(settings, args.concurrency, args.name))
+
+
+if __name__ == "__main__":
+    main()